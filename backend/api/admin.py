@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Veterinarian, BlogPost, Appointment, ContactMessage, GalleryImage, PageContent, AboutPage, ServicesPage, SEOSettings, SiteSettings
+from .view_counter import unique_reader_counts
+from .models import Veterinarian, BlogPost, Tag, Appointment, ContactMessage, GalleryImage, PageContent, AboutPage, ServicesPage, SEOSettings, SiteSettings
 
 
 @admin.register(Veterinarian)
@@ -26,10 +27,10 @@ class VeterinarianAdmin(admin.ModelAdmin):
 
 @admin.register(BlogPost)
 class BlogPostAdmin(admin.ModelAdmin):
-    list_display = ['title', 'author', 'category', 'status', 'views', 'published_at', 'created_at']
+    list_display = ['title', 'author', 'category', 'status', 'views', 'unique_readers_week', 'unique_readers_month', 'published_at', 'created_at']
     list_filter = ['status', 'category', 'created_at', 'published_at']
     search_fields = ['title', 'content', 'excerpt', 'tags']
-    readonly_fields = ['slug', 'views', 'created_at', 'updated_at']
+    readonly_fields = ['slug', 'views', 'unique_readers_day', 'unique_readers_week', 'unique_readers_month', 'created_at', 'updated_at']
     date_hierarchy = 'published_at'
     fieldsets = (
         ('İçerik', {
@@ -41,17 +42,48 @@ class BlogPostAdmin(admin.ModelAdmin):
         ('Yayın', {
             'fields': ('status', 'published_at', 'views')
         }),
+        ('Tekil Okuyucular', {
+            'fields': ('unique_readers_day', 'unique_readers_week', 'unique_readers_month')
+        }),
         ('Tarihler', {
             'fields': ('created_at', 'updated_at')
         }),
     )
 
+    def _unique_readers(self, obj, window):
+        # Estimates merged from the daily HyperLogLog sketches, cached a few minutes
+        return unique_reader_counts([obj.pk])[obj.pk][window]
+
+    @admin.display(description='Tekil Okuyucu (Bugün)')
+    def unique_readers_day(self, obj):
+        return self._unique_readers(obj, 'day')
+
+    @admin.display(description='Tekil Okuyucu (7 Gün)')
+    def unique_readers_week(self, obj):
+        return self._unique_readers(obj, 'week')
+
+    @admin.display(description='Tekil Okuyucu (30 Gün)')
+    def unique_readers_month(self, obj):
+        return self._unique_readers(obj, 'month')
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug', 'published_count', 'created_at']
+    search_fields = ['name', 'slug']
+    readonly_fields = ['slug', 'published_count', 'created_at']
+
+    def has_add_permission(self, request):
+        # Tags are created from the comma separated BlogPost.tags field
+        return False
+
 
 @admin.register(Appointment)
 class AppointmentAdmin(admin.ModelAdmin):
     list_display = ['pet_name', 'owner_name', 'veterinarian', 'date', 'time', 'service', 'status', 'created_at']
-    list_filter = ['status', 'date', 'veterinarian', 'created_at']
-    search_fields = ['pet_name', 'owner_name', 'owner_email', 'owner_phone', 'service']
+    list_filter = ['status', 'date', 'veterinarian', 'service', 'created_at']
+    list_select_related = ['veterinarian', 'service']
+    search_fields = ['pet_name', 'owner_name', 'owner_email', 'owner_phone', 'service__title']
     readonly_fields = ['created_at', 'updated_at']
     date_hierarchy = 'date'
     fieldsets = (
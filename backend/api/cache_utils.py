@@ -0,0 +1,316 @@
+"""
+Cache helpers shared by the API views and models
+"""
+import hashlib
+import math
+import pickle
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+VERSION_KEY_PREFIX = 'petkey:version'
+
+
+def _version_key(model):
+    # A plain string names a stamp that is not tied to one model (e.g. a feed)
+    label = model if isinstance(model, str) else model._meta.label_lower
+    return f'{VERSION_KEY_PREFIX}:{label}'
+
+
+def get_model_version(model):
+    """
+    Return the shared version stamp of a model
+
+    The stamp lives in the shared Django cache so that every gunicorn worker
+    sees the same value. A missing stamp (cold or evicted cache) is replaced
+    with a fresh one, which makes every worker reload once.
+    """
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_model_version(model):
+    """Invalidate everything cached for a model on every worker"""
+    cache.set(_version_key(model), uuid.uuid4().hex, None)
+
+
+def get_models_version(models):
+    """Combined version stamp of several models"""
+    return ':'.join(get_model_version(model) for model in models)
+
+
+def response_cache_key(request, prefix='response'):
+    """Cache key of a GET request: host, path and query string"""
+    raw = f'{request.get_host()}{request.get_full_path()}'
+    return f'petkey:{prefix}:{hashlib.md5(raw.encode("utf-8")).hexdigest()}'
+
+
+def single_flight(key, builder, version, timeout=300, stale_timeout=3600,
+                  beta=1.0, lock_timeout=10, wait=2.0):
+    """
+    Return a cached payload, rebuilding it in exactly one worker at a time
+
+    The entry stores the payload with the version it was built under, its
+    build time (delta) and its logical expiry. Refreshing follows the
+    probabilistic early expiration scheme (XFetch): a request recomputes when
+    now - delta * beta * log(random()) passes the expiry, so hot keys are
+    rebuilt shortly before they expire instead of all at once afterwards.
+
+    Only the worker that wins the lock rebuilds. Others return the stale
+    payload when there is one, otherwise poll briefly for the new entry.
+
+    Args:
+        key: Cache key of the payload
+        builder: Callable computing the payload (must be picklable)
+        version: Version stamp the payload must match (see get_models_version)
+        timeout: Logical lifetime of a payload in seconds
+        stale_timeout: Extra seconds a stale payload is kept to be served during rebuilds
+        beta: Early refresh aggressiveness (1.0 is the usual value)
+        lock_timeout: Upper bound of a rebuild, after which the lock is released
+        wait: Seconds to wait for another worker's rebuild when nothing is cached
+    """
+    entry = cache.get(key)
+    now = time.time()
+    if entry is not None and entry['version'] == version:
+        early = entry['delta'] * beta * math.log(1.0 - random.random())
+        if now - early < entry['expires']:
+            return entry['value']
+
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, lock_timeout):
+        try:
+            started = time.time()
+            value = builder()
+            finished = time.time()
+            cache.set(key, {
+                'value': value,
+                'version': version,
+                'delta': finished - started,
+                'expires': finished + timeout,
+            }, timeout + stale_timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        return entry['value']
+
+    deadline = now + wait
+    while time.time() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None and entry['version'] == version:
+            return entry['value']
+    # The rebuilding worker is too slow or died; do not keep the client waiting
+    return builder()
+
+
+class SingletonCache:
+    """
+    Per-process cache for the singleton page models (HomePage, SiteSettings...)
+
+    The serialized instance is kept in process memory together with the
+    version stamp it was loaded under. A lookup only reads the shared version
+    stamp; the database is hit again only after save() bumps the stamp.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, model, loader):
+        """
+        Return a fresh copy of the cached singleton
+
+        Args:
+            model: Singleton model class
+            loader: Callable returning the instance from the database
+
+        Returns:
+            Model instance (a private copy, safe to modify and save)
+        """
+        label = model._meta.label_lower
+        # Read the stamp before loading so a concurrent save() can never be
+        # recorded under the newer stamp with older data.
+        version = get_model_version(model)
+        entry = self._entries.get(label)
+        if entry is None or entry[0] != version:
+            payload = pickle.dumps(loader(), pickle.HIGHEST_PROTOCOL)
+            entry = (version, payload)
+            with self._lock:
+                self._entries[label] = entry
+        return pickle.loads(entry[1])
+
+    def drop_local(self, model):
+        """Forget this worker's copy of a singleton"""
+        with self._lock:
+            self._entries.pop(model._meta.label_lower, None)
+
+    def invalidate(self, model):
+        """Drop the local copy and bump the shared stamp once the write commits"""
+        def _invalidate():
+            self.drop_local(model)
+            bump_model_version(model)
+        transaction.on_commit(_invalidate)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+singleton_cache = SingletonCache()
+
+
+# Seconds a process keeps its hit/miss counts before adding them to the shared cache
+STATS_FLUSH_SECONDS = 10
+
+
+class StatsCounter:
+    """
+    Hit/miss counters kept per process, added to the shared cache every few seconds
+
+    An increment of the shared counter on every hit would rewrite a file per
+    request on FileBasedCache, and concurrent get/set increments lose counts.
+    Each process adds its own totals once per STATS_FLUSH_SECONDS instead.
+    """
+
+    def __init__(self, prefix, interval=STATS_FLUSH_SECONDS):
+        self.prefix = prefix
+        self.interval = interval
+        self._counts = Counter()
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _key(self, kind):
+        return f'{self.prefix}:{kind}'
+
+    def incr(self, kind):
+        with self._lock:
+            self._counts[kind] += 1
+            if time.monotonic() - self._flushed_at < self.interval:
+                return
+        self.flush()
+
+    def flush(self):
+        """Add this process's counts to the shared counters"""
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self._flushed_at = time.monotonic()
+        for kind, count in counts.items():
+            key = self._key(kind)
+            try:
+                cache.incr(key, count)
+            except ValueError:
+                # First flush since the counter expired or was never created
+                if not cache.add(key, count, None):
+                    cache.incr(key, count)
+
+    def get(self, kind):
+        """Shared total, including this process's counts not flushed yet"""
+        with self._lock:
+            pending = self._counts[kind]
+        return (cache.get(self._key(kind)) or 0) + pending
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+        cache.delete_many([self._key('hits'), self._key('misses')])
+
+
+class CollectionCache:
+    """
+    Shared query result cache for a public collection endpoint
+
+    Entries are keyed by host, path and query string, and carry the combined
+    version stamp of the models the endpoint reads. A save or delete on one
+    of those models bumps its stamp (see signals.py), which invalidates the
+    collections owning it and nothing else. Rebuilds go through single_flight.
+
+    Hits and misses are counted per process and added up in the shared
+    cache, see stats().
+    """
+    registry = {}
+
+    def __init__(self, name, models, timeout=600):
+        self.name = name
+        self.models = models
+        self.timeout = timeout
+        self.counter = StatsCounter(f'petkey:stats:collection:{name}')
+        CollectionCache.registry[name] = self
+
+    def get(self, request, builder):
+        """Return the cached payload of a request, building it on a miss"""
+        built = []
+
+        def build():
+            built.append(True)
+            return builder()
+
+        key = response_cache_key(request, prefix=f'collection:{self.name}')
+        value = single_flight(key, build, get_models_version(self.models), timeout=self.timeout)
+        self.counter.incr('misses' if built else 'hits')
+        return value
+
+    def stats(self):
+        hits = self.counter.get('hits')
+        misses = self.counter.get('misses')
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 3) if total else None,
+        }
+
+    def reset_stats(self):
+        self.counter.reset()
+
+
+class NegativeCache:
+    """
+    Remembers lookups that found nothing (e.g. bots probing unknown blog slugs)
+
+    Keys are cleared by signals.py as soon as a matching row is saved.
+    """
+
+    def __init__(self, name, timeout=300):
+        self.name = name
+        self.timeout = timeout
+        self.counter = StatsCounter(f'petkey:stats:missing:{name}')
+
+    def _key(self, lookup):
+        digest = hashlib.md5(str(lookup).encode('utf-8')).hexdigest()
+        return f'petkey:missing:{self.name}:{digest}'
+
+    def is_missing(self, lookup):
+        missing = cache.get(self._key(lookup)) is not None
+        self.counter.incr('hits' if missing else 'misses')
+        return missing
+
+    def mark_missing(self, lookup):
+        cache.set(self._key(lookup), 1, self.timeout)
+
+    def clear(self, lookup):
+        cache.delete(self._key(lookup))
+
+    def stats(self):
+        return {'hits': self.counter.get('hits'), 'misses': self.counter.get('misses')}
+
+
+missing_blog_slugs = NegativeCache('blogpost-slug')
+
+
+def flush_stats_counters():
+    """Add this process's pending hit/miss counts to the shared counters (on worker exit)"""
+    for collection in CollectionCache.registry.values():
+        collection.counter.flush()
+    missing_blog_slugs.counter.flush()
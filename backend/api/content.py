@@ -0,0 +1,173 @@
+"""
+Blog post content processing
+
+Values derived from the HTML `content` of a post (word count, reading time,
+heading outline, plain-text excerpt, content hash) are computed once when
+the post is saved, instead of by every client on every read.
+
+Images pasted into the rich-text editor arrive as data: URIs inside the
+HTML. extract_inline_images() moves them to media storage and rewrites the
+src attributes, so rows and responses stop carrying megabytes of base64.
+"""
+import base64
+import binascii
+import hashlib
+import re
+from html.parser import HTMLParser
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils.text import Truncator, slugify
+
+WORDS_PER_MINUTE = 200
+PLAIN_EXCERPT_LENGTH = 300
+OUTLINE_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4}
+BLOCK_TAGS = {'p', 'div', 'br', 'li', 'ul', 'ol', 'blockquote', 'pre', 'tr', 'table', 'section', 'article', *OUTLINE_TAGS}
+SKIPPED_TAGS = {'script', 'style', 'noscript', 'iframe'}
+
+
+class ContentParser(HTMLParser):
+    """Collects the visible text and the headings of an HTML fragment"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.outline = []
+        self._heading = None
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append('\n')
+        if tag in OUTLINE_TAGS:
+            self._heading = (OUTLINE_TAGS[tag], [])
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag in BLOCK_TAGS:
+            self.parts.append('\n')
+        if tag in OUTLINE_TAGS and self._heading is not None:
+            level, words = self._heading
+            text = ' '.join(''.join(words).split())
+            if text:
+                self.outline.append({'level': level, 'text': text})
+            self._heading = None
+
+    def handle_data(self, data):
+        if self._skipping:
+            return
+        self.parts.append(data)
+        if self._heading is not None:
+            self._heading[1].append(data)
+
+    @property
+    def text(self):
+        return ''.join(self.parts)
+
+
+def _parse(html):
+    parser = ContentParser()
+    parser.feed(html or '')
+    parser.close()
+    lines = (' '.join(line.split()) for line in parser.text.splitlines())
+    return '\n'.join(line for line in lines if line), parser.outline
+
+
+def plain_text(html):
+    """Visible text of an HTML fragment, one line per block"""
+    return _parse(html)[0]
+
+
+def content_hash(html):
+    return hashlib.sha256((html or '').encode('utf-8')).hexdigest()
+
+
+def analyze_content(html):
+    """
+    Derived fields of a post body
+
+    Returns:
+        dict: word_count, reading_time (minutes), outline ([{level, text, anchor}]),
+        plain_excerpt and content_hash
+    """
+    text, headings = _parse(html)
+    word_count = len(text.split())
+
+    anchors = {}
+    outline = []
+    for heading in headings:
+        anchor = slugify(heading['text'], allow_unicode=True) or 'bolum'
+        # Repeated headings get -2, -3... like most TOC generators
+        anchors[anchor] = anchors.get(anchor, 0) + 1
+        if anchors[anchor] > 1:
+            anchor = f"{anchor}-{anchors[anchor]}"
+        outline.append({**heading, 'anchor': anchor})
+
+    return {
+        'word_count': word_count,
+        'reading_time': max(1, round(word_count / WORDS_PER_MINUTE)) if word_count else 0,
+        'outline': outline,
+        'plain_excerpt': Truncator(' '.join(text.split())).chars(PLAIN_EXCERPT_LENGTH),
+        'content_hash': content_hash(html),
+    }
+
+
+INLINE_IMAGE_DIR = 'blog/inline'
+INLINE_IMAGE_TYPES = {'png': 'png', 'jpeg': 'jpg', 'jpg': 'jpg', 'gif': 'gif', 'webp': 'webp'}
+INLINE_IMAGE = re.compile(
+    r'(?P<attr>src\s*=\s*)(?P<quote>["\'])data:image/(?P<type>[a-zA-Z0-9.+-]+);base64,(?P<data>[A-Za-z0-9+/=\s]+)(?P=quote)',
+    re.IGNORECASE,
+)
+
+
+def extract_inline_images(html):
+    """
+    Store data: URI images of an HTML fragment as media files
+
+    Files are named after the hash of their bytes, so the same image pasted
+    twice (or a backfill interrupted and run again) is stored once. SVG and
+    unknown types are left inline.
+
+    Returns:
+        tuple: (html with src rewritten to MEDIA_URL paths, number of images extracted)
+    """
+    if not html or 'data:image' not in html:
+        return html, 0
+    extracted = 0
+
+    def store(match):
+        nonlocal extracted
+        ext = INLINE_IMAGE_TYPES.get(match.group('type').lower())
+        if ext is None:
+            return match.group(0)
+        try:
+            data = base64.b64decode(''.join(match.group('data').split()), validate=True)
+        except (binascii.Error, ValueError):
+            return match.group(0)
+        name = f'{INLINE_IMAGE_DIR}/{hashlib.sha256(data).hexdigest()[:32]}.{ext}'
+        if not default_storage.exists(name):
+            name = default_storage.save(name, ContentFile(data))
+        extracted += 1
+        quote = match.group('quote')
+        return f"{match.group('attr')}{quote}{default_storage.url(name)}{quote}"
+
+    return INLINE_IMAGE.sub(store, html), extracted
+
+
+def absolutize_media_urls(html, request):
+    """Point relative media src attributes at the API host (the frontend is served elsewhere)"""
+    if not html or request is None:
+        return html
+    media_url = settings.MEDIA_URL
+    if not media_url.startswith('/'):
+        return html
+    absolute = request.build_absolute_uri(media_url)
+    return re.sub(
+        r'(src\s*=\s*["\'])' + re.escape(media_url),
+        lambda match: match.group(1) + absolute,
+        html,
+    )
@@ -0,0 +1,91 @@
+"""
+Last-known-good store for public GET payloads (degraded read mode)
+
+When Postgres restarts or runs out of connections the public pages would
+all return 500, although their content rarely changes. Successful public
+responses are copied to a small SQLite file next to the app, and served from
+there while the database is unreachable (see DegradedModeMiddleware).
+
+The store keeps the max_entries most recently stored payloads; the digests
+of unchanged bodies are remembered in a bounded LRU map of the same size.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LastGoodStore:
+    """Durable key/value store of response bodies backed by a SQLite file"""
+
+    def __init__(self, path, max_entries=500):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._digests = OrderedDict()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS last_good ('
+                'key TEXT PRIMARY KEY, content_type TEXT, body BLOB, stored_at REAL)'
+            )
+            self._local.conn = conn
+        return conn
+
+    def save(self, key, body, content_type):
+        """Persist a body, skipping the write when it did not change"""
+        digest = hashlib.md5(body).hexdigest()
+        with self._lock:
+            if self._digests.get(key) == digest:
+                self._digests.move_to_end(key)
+                return
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO last_good (key, content_type, body, stored_at) VALUES (?, ?, ?, ?)',
+                    (key, content_type, body, time.time())
+                )
+                conn.execute(
+                    'DELETE FROM last_good WHERE key NOT IN '
+                    '(SELECT key FROM last_good ORDER BY stored_at DESC LIMIT ?)',
+                    (self.max_entries,)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f'Could not store last-known-good payload for {key}: {str(e)}')
+            return
+        with self._lock:
+            self._digests[key] = digest
+            self._digests.move_to_end(key)
+            while len(self._digests) > self.max_entries:
+                self._digests.popitem(last=False)
+
+    def load(self, key):
+        """
+        Return the stored payload of a key
+
+        Returns:
+            tuple: (body, content_type, stored_at) or None
+        """
+        try:
+            row = self._connection().execute(
+                'SELECT body, content_type, stored_at FROM last_good WHERE key = ?', (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f'Could not read last-known-good payload for {key}: {str(e)}')
+            return None
+        return row
+
+
+last_good_store = LastGoodStore(settings.LAST_GOOD_STORE_PATH, settings.DEGRADED_MODE_MAX_ENTRIES)
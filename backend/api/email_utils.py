@@ -23,14 +23,14 @@ def send_appointment_confirmation(appointment):
     try:
         # Prepare context for email template
         context = {
-            'name': appointment.name,
+            'name': appointment.owner_name,
             'pet_name': appointment.pet_name,
-            'pet_type': appointment.get_pet_type_display(),
+            'pet_type': appointment.pet_type,
             'appointment_date': appointment.date.strftime('%d.%m.%Y'),
             'appointment_time': appointment.time.strftime('%H:%M'),
             'service': appointment.service.title if appointment.service else 'Genel Muayene',
-            'email': appointment.email,
-            'phone': appointment.phone,
+            'email': appointment.owner_email,
+            'phone': appointment.owner_phone,
             'notes': appointment.notes or '',
         }
 
@@ -41,7 +41,7 @@ def send_appointment_confirmation(appointment):
         # Create email
         subject = f'Randevu Onayı - {appointment.pet_name} - PetKey Veteriner'
         from_email = settings.DEFAULT_FROM_EMAIL
-        to_email = [appointment.email]
+        to_email = [appointment.owner_email]
 
         # Create multipart email (HTML + plain text)
         email = EmailMultiAlternatives(
@@ -55,7 +55,7 @@ def send_appointment_confirmation(appointment):
         # Send email
         email.send(fail_silently=False)
 
-        logger.info(f'Appointment confirmation email sent to {appointment.email} for appointment #{appointment.id}')
+        logger.info(f'Appointment confirmation email sent to {appointment.owner_email} for appointment #{appointment.id}')
         return True
 
     except Exception as e:
@@ -0,0 +1,91 @@
+"""
+Blog post filters and facet counts
+
+filter_blog_posts() applies the ?category=, ?tag=, ?author= and ?month=
+filters shared by the blog list endpoints. blog_facets() counts the
+published posts per category, tag, author and month with one grouped query
+per facet. Each facet is counted with every active filter except its own,
+so the sidebar keeps showing the alternatives of the selected value.
+"""
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+from .models import BlogPost, Tag
+from .search import SEARCH_PARAM, get_blog_search, search_terms
+
+FACETS = ('category', 'tag', 'author', 'month')
+
+
+def filter_blog_posts(queryset, params, skip=None):
+    """Apply the blog list filters of a query dict, except the one named skip"""
+    category = params.get('category')
+    if category and skip != 'category':
+        queryset = queryset.filter(category__iexact=category)
+
+    tag = params.get('tag')
+    if tag and skip != 'tag':
+        queryset = queryset.filter(normalized_tags__slug=Tag.make_slug(tag))
+
+    author_id = params.get('author')
+    if author_id and skip != 'author':
+        queryset = queryset.filter(author_id=author_id)
+
+    month = params.get('month')
+    if month and skip != 'month':
+        try:
+            year, month_number = (int(part) for part in month.split('-', 1))
+        except ValueError:
+            pass
+        else:
+            queryset = queryset.filter(published_at__year=year, published_at__month=month_number)
+
+    return queryset
+
+
+def blog_facets(params):
+    """
+    Category, tag, author and month counts of the published posts
+
+    Returns:
+        dict: {'total': n, 'categories': [...], 'tags': [...], 'authors': [...], 'months': [...]}
+    """
+    published = BlogPost.objects.filter(status='published')
+    query = params.get(SEARCH_PARAM, '').strip()
+    if search_terms(query):
+        published = published.filter(pk__in=get_blog_search().filter(BlogPost.objects.all(), query).values('pk'))
+
+    def facet_base(name):
+        return filter_blog_posts(published, params, skip=name).order_by()
+
+    categories = (
+        facet_base('category').values('category')
+        .annotate(count=Count('pk')).order_by('-count', 'category')
+    )
+    tags = (
+        facet_base('tag').filter(normalized_tags__isnull=False)
+        .values('normalized_tags__name', 'normalized_tags__slug')
+        .annotate(count=Count('pk')).order_by('-count', 'normalized_tags__name')
+    )
+    authors = (
+        facet_base('author').values('author_id', 'author__name', 'author__slug')
+        .annotate(count=Count('pk')).order_by('-count', 'author__name')
+    )
+    months = (
+        facet_base('month').filter(published_at__isnull=False)
+        .annotate(month=TruncMonth('published_at')).values('month')
+        .annotate(count=Count('pk')).order_by('-month')
+    )
+
+    return {
+        'total': filter_blog_posts(published, params).count(),
+        'categories': [{'name': row['category'], 'count': row['count']} for row in categories],
+        'tags': [
+            {'name': row['normalized_tags__name'], 'slug': row['normalized_tags__slug'], 'count': row['count']}
+            for row in tags
+        ],
+        'authors': [
+            {'id': row['author_id'], 'name': row['author__name'], 'slug': row['author__slug'], 'count': row['count']}
+            for row in authors
+        ],
+        'months': [{'month': row['month'].strftime('%Y-%m'), 'count': row['count']} for row in months],
+    }
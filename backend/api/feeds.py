@@ -0,0 +1,121 @@
+"""
+RSS 2.0 and Atom feeds of the published blog posts
+
+/api/blog/feed.rss and /api/blog/feed.atom list the latest BLOG_FEED_SIZE
+posts, ?category= narrows them to one category. The XML is generated once
+per feed and kept in the shared cache under the BLOG_FEED version stamp,
+which signals.py bumps when a post or an author is saved or deleted. View
+counter flushes do not touch it, so the XML and its ETag stay the same
+between two edits and polling feed readers get 304 Not Modified without a
+database query.
+"""
+import hashlib
+from io import StringIO
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .cache_utils import get_model_version, single_flight
+from .http_cache import PUBLIC_CONTENT_POLICY, make_etag
+from .models import BlogPost
+
+# Version stamp of the feeds, bumped by signals.py
+BLOG_FEED = 'blog-feed'
+FEED_TYPES = {'rss': Rss201rev2Feed, 'atom': Atom1Feed}
+FEED_TIMEOUT = 24 * 3600
+STREAM_CHUNK_SIZE = 8192
+
+
+def build_blog_feed(kind, category, base_url):
+    """
+    Generate one feed
+
+    The category is matched case-insensitively and shown in its stored
+    form, so the cached XML does not depend on the first requester's casing.
+
+    Returns:
+        dict: xml, content_type, etag and last_modified (timestamp or None)
+    """
+    site_url = getattr(settings, 'SITE_URL', 'https://petkey.com').rstrip('/')
+    posts = BlogPost.objects.filter(status='published')
+    feed_url = base_url
+    if category:
+        posts = posts.filter(category__iexact=category)
+        stored = posts.order_by('category').values_list('category', flat=True).first()
+        category = stored or category.lower()
+        feed_url += f'?{urlencode({"category": category})}'
+    posts = (
+        posts.select_related('author').prefetch_related('normalized_tags').defer('content')
+        .order_by('-published_at', '-created_at')[:getattr(settings, 'BLOG_FEED_SIZE', 20)]
+    )
+
+    feed = FEED_TYPES[kind](
+        title=f'PetKey Blog - {category}' if category else 'PetKey Blog',
+        link=f'{site_url}/blog',
+        description='PetKey veteriner hekimlerinden evcil hayvan sağlığı yazıları',
+        language='tr',
+        feed_url=feed_url,
+    )
+    last_modified = None
+    for post in posts:
+        link = f'{site_url}/blog/{post.slug}'
+        feed.add_item(
+            title=post.title,
+            link=link,
+            unique_id=link,
+            description=post.excerpt or post.plain_excerpt,
+            author_name=post.author.name,
+            pubdate=post.published_at or post.created_at,
+            updateddate=post.updated_at,
+            categories=[post.category, *(tag.name for tag in post.normalized_tags.all())],
+        )
+        if last_modified is None or post.updated_at > last_modified:
+            last_modified = post.updated_at
+
+    output = StringIO()
+    feed.write(output, 'utf-8')
+    xml = output.getvalue()
+    return {
+        'xml': xml,
+        'content_type': feed.content_type,
+        'etag': make_etag(BLOG_FEED, kind, hashlib.md5(xml.encode('utf-8')).hexdigest()),
+        'last_modified': last_modified.timestamp() if last_modified else None,
+    }
+
+
+def _chunks(text):
+    data = text.encode('utf-8')
+    for start in range(0, len(data), STREAM_CHUNK_SIZE):
+        yield data[start:start + STREAM_CHUNK_SIZE]
+
+
+@require_safe
+def blog_feed(request, kind):
+    """Serve a cached blog feed, or 304 when the reader's copy is current"""
+    if kind not in FEED_TYPES:
+        raise Http404
+    category = ' '.join(request.GET.get('category', '').split())
+    digest = hashlib.md5(f'{request.get_host()}:{category.lower()}'.encode('utf-8')).hexdigest()
+    base_url = request.build_absolute_uri(request.path)
+    entry = single_flight(
+        f'petkey:feed:{kind}:{digest}',
+        lambda: build_blog_feed(kind, category, base_url),
+        get_model_version(BLOG_FEED),
+        timeout=FEED_TIMEOUT,
+    )
+
+    last_modified = int(entry['last_modified']) if entry['last_modified'] else None
+    response = get_conditional_response(request, etag=entry['etag'], last_modified=last_modified)
+    if response is None:
+        response = StreamingHttpResponse(_chunks(entry['xml']), content_type=entry['content_type'])
+    response['ETag'] = entry['etag']
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    PUBLIC_CONTENT_POLICY.apply(response)
+    response['Surrogate-Key'] = 'blog'
+    return response
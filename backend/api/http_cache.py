@@ -0,0 +1,206 @@
+"""
+HTTP caching helpers for the public API (validators, conditional GET, Cache-Control)
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+class NotModified(Exception):
+    """Raised from ViewSet.initial() to short-circuit a request with 304"""
+
+    def __init__(self, response):
+        super().__init__('Not modified')
+        self.response = response
+
+
+def make_etag(*parts):
+    """Build a quoted, strong ETag from arbitrary values"""
+    raw = ':'.join('' if part is None else str(part) for part in parts)
+    return quote_etag(hashlib.md5(raw.encode('utf-8')).hexdigest())
+
+
+def instance_validators(instance):
+    """
+    Validators of a single model instance, derived from updated_at
+
+    Returns:
+        tuple: (etag, last_modified)
+    """
+    updated_at = instance.updated_at
+    etag = make_etag(instance._meta.label_lower, instance.pk, updated_at.isoformat() if updated_at else None)
+    return etag, updated_at
+
+
+def queryset_validators(queryset, **aggregates):
+    """
+    Validators of a collection from one aggregate query: max(updated_at) and count
+
+    Extra aggregates (e.g. views=Sum('views')) are folded into the ETag for
+    collections whose body depends on more than updated_at.
+
+    Returns:
+        tuple: (etag, last_modified)
+    """
+    result = queryset.order_by().aggregate(
+        _last_modified=Max('updated_at'),
+        _count=Count('pk'),
+        **aggregates
+    )
+    last_modified = result.pop('_last_modified')
+    count = result.pop('_count')
+    etag = make_etag(
+        queryset.model._meta.label_lower,
+        count,
+        last_modified.isoformat() if last_modified else None,
+        *(result[key] for key in sorted(result))
+    )
+    return etag, last_modified
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin adding ETag / Last-Modified and 304 responses to GET/HEAD
+
+    The check runs in initial(), after authentication and permissions but
+    before the handler, so a matching request never reaches the serializer.
+    Viewsets override get_validators() for their custom actions; list and
+    retrieve are covered by default.
+    """
+
+    def get_validators(self):
+        """Return (etag, last_modified) for the current action, or None to opt out"""
+        if self.action == 'list':
+            return queryset_validators(self.filter_queryset(self.get_queryset()))
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = self.get_queryset().filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            return queryset_validators(queryset)
+        return None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._validators = None
+        if request.method not in ('GET', 'HEAD'):
+            return
+
+        validators = self.get_validators()
+        if not validators:
+            return
+
+        self._validators = validators
+        etag, last_modified = validators
+        response = get_conditional_response(
+            request._request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, '_validators', None)
+        if validators and response.status_code in (200, 304):
+            etag, last_modified = validators
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+
+class CachePolicy:
+    """
+    Declarative Cache-Control / Vary policy for a viewset or one of its actions
+
+    Args:
+        max_age: Browser freshness lifetime in seconds (0 means revalidate every time)
+        s_maxage: Freshness lifetime for shared caches (CDN, nginx), purged on saves
+        stale_while_revalidate: Seconds a stale copy may be served while refetching
+        stale_if_error: Seconds a stale copy may be served when the origin fails
+        public: Whether shared caches may store the response
+        vary: Request headers the body depends on (e.g. 'Cookie')
+        no_store: Forbid storing the response anywhere (private data)
+    """
+
+    def __init__(self, max_age=0, s_maxage=None, stale_while_revalidate=None,
+                 stale_if_error=None, public=True, vary=(), no_store=False):
+        self.max_age = max_age
+        self.s_maxage = s_maxage
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        self.public = public
+        self.vary = tuple(vary)
+        self.no_store = no_store
+
+    def directives(self):
+        if self.no_store:
+            return {'no_store': True, 'private': True}
+
+        directives = {'public': True} if self.public else {'private': True}
+        if self.max_age:
+            directives['max_age'] = self.max_age
+        else:
+            directives['no_cache'] = True
+        if self.public and self.s_maxage is not None:
+            directives['s_maxage'] = self.s_maxage
+        if self.stale_while_revalidate:
+            directives['stale_while_revalidate'] = self.stale_while_revalidate
+        if self.stale_if_error:
+            directives['stale_if_error'] = self.stale_if_error
+        return directives
+
+    def apply(self, response):
+        patch_cache_control(response, **self.directives())
+        if self.vary:
+            patch_vary_headers(response, self.vary)
+        return response
+
+
+# Content that only changes from the admin panel; shared caches are purged on save
+PUBLIC_CONTENT_POLICY = CachePolicy(max_age=0, s_maxage=300, stale_while_revalidate=60, stale_if_error=86400)
+# Anonymous read-only namespace, safe to cache anywhere
+PUBLIC_READ_POLICY = CachePolicy(max_age=60, s_maxage=600, stale_while_revalidate=300, stale_if_error=86400)
+# Anonymous reads that count something on every request (blog post views)
+PUBLIC_UNCACHED_POLICY = CachePolicy(max_age=0)
+# Bodies that differ for logged-in admins
+SESSION_DEPENDENT_POLICY = CachePolicy(public=False, vary=('Cookie',))
+# Personal data (appointments, contact messages)
+NO_STORE_POLICY = CachePolicy(no_store=True)
+
+
+class CacheControlMixin:
+    """
+    ViewSet mixin applying a CachePolicy to successful GET/HEAD responses
+
+    Set cache_policy for the whole viewset and cache_policies to override it
+    for individual actions. Public responses also carry a Surrogate-Key header.
+    """
+    cache_policy = None
+    cache_policies = {}
+
+    def get_cache_policy(self):
+        return self.cache_policies.get(self.action, self.cache_policy)
+
+    def get_surrogate_keys(self):
+        """Model-wide surrogate keys (see api/invalidation.py), used by the edge to purge"""
+        model = self.get_queryset().model
+        return [key for key in getattr(model, 'surrogate_keys', []) if '{' not in key]
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        policy = self.get_cache_policy()
+        if policy and request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+            policy.apply(response)
+            if policy.public:
+                keys = self.get_surrogate_keys()
+                if keys:
+                    response['Surrogate-Key'] = ' '.join(keys)
+        return response
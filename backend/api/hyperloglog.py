@@ -0,0 +1,66 @@
+"""
+HyperLogLog cardinality sketch
+
+A fixed array of 2**precision one-byte registers estimates the number of
+distinct values added to it (about 1.04 / sqrt(2**precision) standard
+error), however many there are. Two sketches merge by taking the register
+wise maximum, so daily sketches of unique readers add up to weekly and
+monthly ones without double counting returning visitors.
+"""
+import hashlib
+import math
+
+
+class HyperLogLog:
+    """Mergeable distinct-count estimator with constant memory"""
+
+    def __init__(self, precision=11, registers=None):
+        if not 4 <= precision <= 16:
+            raise ValueError('precision must be between 4 and 16')
+        self.precision = precision
+        self.size = 1 << precision
+        if registers is None:
+            self.registers = bytearray(self.size)
+        else:
+            if len(registers) != self.size:
+                raise ValueError(f'Expected {self.size} registers, got {len(registers)}')
+            self.registers = bytearray(registers)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Rebuild a sketch from to_bytes() output; the precision follows from its length"""
+        return cls(precision=len(data).bit_length() - 1, registers=data)
+
+    def to_bytes(self):
+        return bytes(self.registers)
+
+    def add(self, value):
+        """Add a value (str or bytes) to the sketch"""
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        hashed = int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), 'big')
+        index = hashed >> (64 - self.precision)
+        remainder_bits = 64 - self.precision
+        remainder = hashed & ((1 << remainder_bits) - 1)
+        # Position of the leftmost 1 bit in the remaining bits
+        rank = remainder_bits - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """Fold another sketch of the same precision into this one"""
+        if other.precision != self.precision:
+            raise ValueError('Cannot merge sketches of different precision')
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        """Estimated number of distinct values added"""
+        m = self.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small range correction: linear counting is more accurate here
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
@@ -0,0 +1,224 @@
+"""
+Cache invalidation bus
+
+Models declare the API paths (cache_paths) and surrogate keys
+(surrogate_keys) a change to them affects. post_save/post_delete publish the
+formatted values to the bus, which coalesces them and hands one purge wave
+per batch to every backend listed in settings.CACHE_PURGERS:
+
+    LocalMemoryPurger   per-worker memory (singleton copies)
+    DjangoCachePurger   shared Django cache (model version stamps)
+    HttpPurger          edge / reverse proxy cache via HTTP PURGE
+
+A batch is one transaction, one unsafe request (InvalidationBatchMiddleware)
+or an explicit `with invalidation_bus.batch():` block, so a bulk edit
+produces a single purge wave instead of hundreds.
+"""
+import logging
+import threading
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from functools import partial
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .cache_utils import bump_model_version, singleton_cache
+
+logger = logging.getLogger(__name__)
+
+
+class PurgeEvent:
+    """Coalesced set of things to purge"""
+
+    def __init__(self):
+        self.paths = set()
+        self.keys = set()
+        self.models = set()
+
+    def add(self, instance):
+        model = type(instance)
+        self.models.add(model)
+        for template in getattr(model, 'cache_paths', []):
+            self.paths.add(self._format(template, instance))
+        for template in getattr(model, 'surrogate_keys', []):
+            self.keys.add(self._format(template, instance))
+
+    @staticmethod
+    def _format(template, instance):
+        try:
+            return template.format(obj=instance)
+        except (AttributeError, KeyError, IndexError, ObjectDoesNotExist):
+            # e.g. {obj.author.slug} of a post whose author row is already gone
+            logger.warning(f'Cannot format cache template {template!r} for {instance!r}')
+            return template
+
+    def merge(self, other):
+        """Move everything of another event into this one"""
+        self.paths |= other.paths
+        self.keys |= other.keys
+        self.models |= other.models
+        other.paths, other.keys, other.models = set(), set(), set()
+
+    def __bool__(self):
+        return bool(self.paths or self.keys or self.models)
+
+
+class LocalMemoryPurger:
+    """Drops this worker's in-memory copies; other workers follow the version stamps"""
+
+    def purge(self, event):
+        for model in event.models:
+            singleton_cache.drop_local(model)
+
+
+class DjangoCachePurger:
+    """Bumps the shared version stamps, invalidating every cached payload of the models"""
+
+    def purge(self, event):
+        for model in event.models:
+            bump_model_version(model)
+
+
+class HttpPurger:
+    """
+    Sends HTTP PURGE requests to a reverse proxy or CDN (settings.CACHE_PURGE_URL)
+
+    One request per path, plus one request carrying every surrogate key in a
+    Surrogate-Key header. Requests are sent from a background thread so the
+    admin save never waits on the edge.
+    """
+
+    def __init__(self, base_url=None, timeout=None):
+        self.base_url = base_url if base_url is not None else getattr(settings, 'CACHE_PURGE_URL', '')
+        self.timeout = timeout if timeout is not None else getattr(settings, 'CACHE_PURGE_TIMEOUT', 2)
+
+    def purge(self, event):
+        if not self.base_url:
+            return
+        thread = threading.Thread(target=self.send, args=(sorted(event.paths), sorted(event.keys)), daemon=True)
+        thread.start()
+        return thread
+
+    def send(self, paths, keys):
+        for path in paths:
+            self._request(urljoin(self.base_url, path))
+        if keys:
+            self._request(urljoin(self.base_url, '/'), {'Surrogate-Key': ' '.join(keys)})
+
+    def _request(self, url, headers=None):
+        request = urllib.request.Request(url, method='PURGE', headers=headers or {})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except (urllib.error.URLError, OSError) as e:
+            logger.warning(f'Cache purge failed for {url}: {str(e)}')
+
+
+class InvalidationBus:
+    """
+    Collects purge events per thread and flushes them in batches
+
+    Changes made inside a transaction are collected in an event of that
+    transaction, sent (or added to the enclosing batch) by its on_commit
+    callback. A rolled-back transaction drops the callback and the event
+    with it, so its changes are never purged.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._purgers = None
+
+    @property
+    def purgers(self):
+        if self._purgers is None:
+            self._purgers = [import_string(path)() for path in settings.CACHE_PURGERS]
+        return self._purgers
+
+    def _state(self):
+        state = self._local
+        if not hasattr(state, 'event'):
+            state.event = PurgeEvent()
+            state.depth = 0
+            state.transaction = None
+        return state
+
+    def _transaction_event(self):
+        """Event of the open transaction, flushed by whichever of its on_commit callbacks runs first"""
+        state = self._state()
+        event = None
+        if state.transaction is not None:
+            previous, callback = state.transaction
+            # Django drops the callbacks of rolled-back transactions and savepoints
+            if any(entry[1] is callback for entry in transaction.get_connection().run_on_commit):
+                event = previous
+        if event is None:
+            event = PurgeEvent()
+        callback = partial(self._committed, event)
+        state.transaction = (event, callback)
+        transaction.on_commit(callback)
+        return event
+
+    def publish(self, instance):
+        state = self._state()
+        if transaction.get_connection().in_atomic_block:
+            self._transaction_event().add(instance)
+        else:
+            state.event.add(instance)
+            self.flush()
+
+    def _committed(self, event):
+        state = self._state()
+        if state.transaction is not None and state.transaction[0] is event:
+            state.transaction = None
+        # Later callbacks of the same transaction find the event empty
+        state.event.merge(event)
+        self.flush()
+
+    @contextmanager
+    def batch(self):
+        state = self._state()
+        state.depth += 1
+        try:
+            yield
+        finally:
+            state.depth -= 1
+            if state.depth == 0:
+                if transaction.get_connection().in_atomic_block:
+                    # Opened inside a transaction: its commit ends the batch
+                    self._transaction_event().merge(state.event)
+                else:
+                    self.flush()
+
+    def flush(self):
+        state = self._state()
+        if state.depth:
+            return
+        event, state.event = state.event, PurgeEvent()
+        if not event:
+            return
+        for purger in self.purgers:
+            try:
+                purger.purge(event)
+            except Exception as e:
+                logger.error(f'{type(purger).__name__} failed: {str(e)}')
+
+
+invalidation_bus = InvalidationBus()
+
+
+class InvalidationBatchMiddleware:
+    """Coalesce every purge of an unsafe request into one wave"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return self.get_response(request)
+        with invalidation_bus.batch():
+            return self.get_response(request)
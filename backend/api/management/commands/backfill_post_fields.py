@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from api.cache_utils import bump_model_version
+from api.models import BlogPost
+
+
+class Command(BaseCommand):
+    help = 'Compute word count, reading time, outline, plain excerpt and content hash of existing blog posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Posts loaded per query')
+        parser.add_argument('--force', action='store_true', help='Recompute posts whose content hash is up to date')
+
+    def handle(self, *args, **options):
+        updated = skipped = 0
+        for post in BlogPost.objects.order_by('pk').iterator(chunk_size=options['batch_size']):
+            if options['force']:
+                post.content_hash = ''
+            if not post.update_derived_fields():
+                skipped += 1
+                continue
+            # queryset.update: updated_at and the per-post purges stay untouched
+            BlogPost.objects.filter(pk=post.pk).update(**{field: getattr(post, field) for field in BlogPost.DERIVED_FIELDS})
+            updated += 1
+
+        if updated:
+            # Refresh every cached blog payload once
+            bump_model_version(BlogPost)
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} posts, {skipped} already up to date.'))
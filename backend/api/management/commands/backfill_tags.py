@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models import BlogPost, Tag
+
+
+class Command(BaseCommand):
+    help = 'Build the normalized Tag index from the comma separated BlogPost.tags of existing posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prune', action='store_true', help='Delete tags no longer used by any post')
+
+    def handle(self, *args, **options):
+        count = 0
+        with transaction.atomic():
+            for post in BlogPost.objects.prefetch_related('normalized_tags').iterator(chunk_size=200):
+                post.sync_tags()
+                count += 1
+            if options['prune']:
+                deleted, _ = Tag.objects.filter(posts=None).delete()
+                self.stdout.write(f'Pruned {deleted} unused tags.')
+            Tag.refresh_counts(list(Tag.objects.values_list('pk', flat=True)))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed tags of {count} posts: {Tag.objects.count()} tags, '
+            f'{Tag.objects.filter(published_count__gt=0).count()} with published posts.'
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.related import related_posts
+
+
+class Command(BaseCommand):
+    help = 'Recompute the TF-IDF related posts of every published blog post'
+
+    def handle(self, *args, **options):
+        count = related_posts.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Related posts computed for {count} published posts.'))
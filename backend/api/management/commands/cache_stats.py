@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from api import views  # noqa: F401  (registers the collection caches)
+from api.cache_utils import CollectionCache, missing_blog_slugs
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counters of the API query result caches (each worker reports its counts every few seconds)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        for name, collection in sorted(CollectionCache.registry.items()):
+            stats = collection.stats()
+            ratio = f"{stats['hit_ratio']:.1%}" if stats['hit_ratio'] is not None else '-'
+            self.stdout.write(f"{name:<24} hits={stats['hits']:<8} misses={stats['misses']:<8} ratio={ratio}")
+            if options['reset']:
+                collection.reset_stats()
+
+        stats = missing_blog_slugs.stats()
+        self.stdout.write(f"{'blog 404 (negative)':<24} hits={stats['hits']:<8} misses={stats['misses']:<8}")
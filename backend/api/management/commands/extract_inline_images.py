@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.content import extract_inline_images
+from api.models import BlogPost
+
+
+class Command(BaseCommand):
+    help = 'Move data: URI images out of blog post content into media storage (safe to interrupt and rerun)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Process at most this many posts')
+        parser.add_argument('--start-pk', type=int, default=None, help='Skip the posts with a lower id')
+        parser.add_argument('--dry-run', action='store_true', help='Only report the posts that carry inline images')
+
+    def handle(self, *args, **options):
+        # Processed posts no longer match, but posts with only unsupported images
+        # (SVG, broken base64) still do: --start-pk moves a limited run past them
+        pending = BlogPost.objects.filter(content__contains='data:image').order_by('pk')
+        if options['start_pk'] is not None:
+            pending = pending.filter(pk__gte=options['start_pk'])
+        ids = list(pending.values_list('pk', flat=True)[:options['limit']])
+        self.stdout.write(f'{len(ids)} posts with inline images.')
+        if options['dry_run']:
+            return
+
+        total_images = total_saved = 0
+        for pk in ids:
+            with transaction.atomic():
+                post = BlogPost.objects.select_for_update().get(pk=pk)
+                before = len(post.content.encode('utf-8'))
+                post.content, extracted = extract_inline_images(post.content)
+                if not extracted:
+                    continue
+                post.save(update_fields=['content', 'updated_at'])
+            saved = before - len(post.content.encode('utf-8'))
+            total_images += extracted
+            total_saved += saved
+            self.stdout.write(f'  #{pk} {post.title}: {extracted} images, {saved / 1024:.0f} KB smaller')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Extracted {total_images} images, content is {total_saved / 1024 / 1024:.1f} MB smaller.'
+        ))
+        if ids and options['limit'] is not None and len(ids) == options['limit']:
+            self.stdout.write(f'Continue with --start-pk {ids[-1] + 1}')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api.models import BlogPost
+from api.search import get_blog_search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the blog full-text search index (SQLite FTS5 table; Postgres indexes itself)'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write(f'{connection.vendor}: the search index is maintained by the database, nothing to do.')
+            return
+        with transaction.atomic():
+            count = get_blog_search().rebuild(BlogPost.objects.all().iterator())
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} blog posts.'))
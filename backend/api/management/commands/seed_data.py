@@ -2,7 +2,7 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
-from api.models import Veterinarian, BlogPost, Appointment, ContactMessage, PageContent, GalleryImage
+from api.models import Veterinarian, BlogPost, Appointment, ContactMessage, PageContent, GalleryImage, Service
 
 
 class Command(BaseCommand):
@@ -169,6 +169,13 @@ Tedavi: Ilac tedavisi, fizik tedavi, beslenme desteği ve gerekirse cerrahi muda
         # Appointments
         self.stdout.write("Creating appointments...")
         today = timezone.now().date()
+
+        def service(slug, title, duration=30):
+            # Appointments point at a Service; reuse the loaded ones when present
+            return Service.objects.get_or_create(
+                slug=slug, defaults={"title": title, "short_description": "", "duration_minutes": duration}
+            )[0]
+
         Appointment.objects.create(
             veterinarian=vet1,
             pet_name="Pamuk",
@@ -180,7 +187,7 @@ Tedavi: Ilac tedavisi, fizik tedavi, beslenme desteği ve gerekirse cerrahi muda
             owner_phone="+90 532 123 4567",
             date=today + timedelta(days=2),
             time="10:00",
-            service="Genel Muayene",
+            service=service("genel-muayene", "Genel Muayene"),
             notes="Aylik kontrol randevusu",
             status="confirmed"
         )
@@ -196,7 +203,7 @@ Tedavi: Ilac tedavisi, fizik tedavi, beslenme desteği ve gerekirse cerrahi muda
             owner_phone="+90 532 234 5678",
             date=today + timedelta(days=1),
             time="14:30",
-            service="Asi",
+            service=service("asilama", "Asi", 15),
             notes="Yillik kuduz asisi",
             status="confirmed"
         )
@@ -212,7 +219,7 @@ Tedavi: Ilac tedavisi, fizik tedavi, beslenme desteği ve gerekirse cerrahi muda
             owner_phone="+90 532 345 6789",
             date=today + timedelta(days=3),
             time="11:00",
-            service="Cerrahi Operasyon",
+            service=service("cerrahi-operasyonlar", "Cerrahi Operasyon", 120),
             notes="Kisirlastirma operasyonu",
             status="pending"
         )
@@ -228,7 +235,7 @@ Tedavi: Ilac tedavisi, fizik tedavi, beslenme desteği ve gerekirse cerrahi muda
             owner_phone="+90 532 456 7891",
             date=today + timedelta(days=5),
             time="15:00",
-            service="Ortopedi Muayenesi",
+            service=service("ortopedi-muayenesi", "Ortopedi Muayenesi", 45),
             status="pending"
         )
 
@@ -243,7 +250,7 @@ Tedavi: Ilac tedavisi, fizik tedavi, beslenme desteği ve gerekirse cerrahi muda
             owner_phone="+90 532 567 8902",
             date=today - timedelta(days=2),
             time="09:30",
-            service="Genel Muayene",
+            service=service("genel-muayene", "Genel Muayene"),
             status="completed"
         )
 
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.scheduling import sweep_expired_holds
+
+
+class Command(BaseCommand):
+    help = 'Delete the expired appointment slot holds'
+
+    def handle(self, *args, **options):
+        count = sweep_expired_holds(force=True)
+        self.stdout.write(self.style.SUCCESS(f'{count} expired slot holds deleted.'))
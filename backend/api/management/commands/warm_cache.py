@@ -0,0 +1,122 @@
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+
+from api.models import BlogPost, Service, Veterinarian
+from api.urls import public_router, router
+
+
+# Public URLs the frontend requests that are not plain router endpoints
+EXTRA_URLS = [
+    '/api/google-reviews/?active_only=true',
+    '/api/sitemap.xml',
+]
+
+
+class Command(BaseCommand):
+    help = 'Fetch every public API endpoint in-process to fill the response caches after a deploy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default=None, help='Host header to use (defaults to WARM_CACHE_HOST or the first ALLOWED_HOSTS entry)')
+        parser.add_argument('--concurrency', type=int, default=4, help='Number of requests in flight')
+        parser.add_argument('--quick', action='store_true', help='Only collection endpoints, skip per-post/service/vet pages')
+
+    def handle(self, *args, **options):
+        host = options['host'] or self.default_host()
+        urls = self.collect_urls(quick=options['quick'])
+
+        self.stdout.write(f'Warming {len(urls)} URLs on {host} with concurrency {options["concurrency"]}...')
+        started = time.perf_counter()
+
+        if options['concurrency'] > 1:
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+                results = list(executor.map(lambda url: self.fetch(url, host, close_connection=True), urls))
+        else:
+            results = [self.fetch(url, host) for url in urls]
+
+        elapsed = time.perf_counter() - started
+        self.report(results, elapsed)
+
+    def default_host(self):
+        host = os.environ.get('WARM_CACHE_HOST')
+        if host:
+            return host
+        # '.onrender.com' style wildcards are not valid Host headers
+        for allowed in settings.ALLOWED_HOSTS:
+            if allowed and not allowed.startswith('.') and allowed != '*':
+                return allowed
+        return 'localhost'
+
+    def collect_urls(self, quick=False):
+        urls = []
+        for registry in (router.registry, public_router.registry):
+            base = '/api/public/' if registry is public_router.registry else '/api/'
+            for prefix, viewset, basename in registry:
+                policy = getattr(viewset, 'cache_policy', None)
+                if policy is None or policy.no_store:
+                    continue
+                if hasattr(viewset, 'list'):
+                    urls.append(f'{base}{prefix}/')
+                for extra_action in viewset.get_extra_actions():
+                    if extra_action.detail or 'get' not in extra_action.mapping:
+                        continue
+                    if '(' in extra_action.url_path:
+                        continue
+                    urls.append(f'{base}{prefix}/{extra_action.url_path}/')
+
+        urls.extend(EXTRA_URLS)
+
+        if not quick:
+            # Post details count a view on every read and are never cached; only their related lists are
+            for slug in BlogPost.objects.filter(status='published').values_list('slug', flat=True):
+                urls.append(f'/api/public/blog/{slug}/related/')
+            for slug in Service.objects.filter(is_active=True).values_list('slug', flat=True):
+                urls.append(f'/api/public/services/{slug}/')
+                urls.append(f'/api/pages/by-name/{slug}/')
+                urls.append(f'/api/page-bundle/service/{slug}/')
+            for slug in Veterinarian.objects.filter(is_active=True).exclude(slug=None).values_list('slug', flat=True):
+                urls.append(f'/api/veterinarians/{slug}/')
+                urls.append(f'/api/page-bundle/vet/{slug}/')
+
+        return list(dict.fromkeys(urls))
+
+    def fetch(self, url, host, close_connection=False):
+        client = Client(HTTP_HOST=host)
+        started = time.perf_counter()
+        try:
+            status = client.get(url).status_code
+        except Exception as e:
+            status = f'error: {e}'
+        finally:
+            if close_connection:
+                connection.close()
+        return url, status, (time.perf_counter() - started) * 1000
+
+    def report(self, results, elapsed):
+        timings = []
+        failed = 0
+        for url, status, ms in results:
+            timings.append(ms)
+            if status == 200 or status == 404:
+                self.stdout.write(f'  {status}  {ms:8.1f} ms  {url}')
+            else:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f'  {status}  {ms:8.1f} ms  {url}'))
+
+        if not timings:
+            self.stdout.write(self.style.WARNING('Nothing to warm.'))
+            return
+
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        summary = (
+            f'Warmed {len(results) - failed}/{len(results)} URLs in {elapsed:.2f}s '
+            f'(median {statistics.median(timings):.1f} ms, p95 {p95:.1f} ms, max {timings[-1]:.1f} ms)'
+        )
+        self.stdout.write(self.style.SUCCESS(summary) if not failed else self.style.WARNING(summary))
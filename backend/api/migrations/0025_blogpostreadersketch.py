@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_servicespage_hero_phone_servicespage_hero_phone_link'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogPostReaderSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Tarih')),
+                ('registers', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reader_sketches', to='api.blogpost', verbose_name='Blog Yazısı')),
+            ],
+            options={
+                'verbose_name': 'Okuyucu Özeti',
+                'verbose_name_plural': 'Okuyucu Özetleri',
+                'unique_together': {('post', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_blogpostreadersketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogPostDailyViews',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Tarih')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='Görüntülenme')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_views', to='api.blogpost', verbose_name='Blog Yazısı')),
+            ],
+            options={
+                'verbose_name': 'Günlük Görüntülenme',
+                'verbose_name_plural': 'Günlük Görüntülenmeler',
+                'indexes': [models.Index(fields=['date'], name='api_blogpos_date_3a034f_idx')],
+                'unique_together': {('post', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+from django.db import migrations
+
+from api.content import plain_text
+
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE api_blogpost ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('turkish', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('turkish', coalesce(excerpt, '')), 'B') ||
+        setweight(to_tsvector('turkish', replace(coalesce(tags, ''), ',', ' ')), 'C') ||
+        setweight(to_tsvector('turkish', regexp_replace(coalesce(content, ''), '<[^>]+>', ' ', 'g')), 'D')
+    ) STORED
+    """,
+    'CREATE INDEX api_blogpost_search_vector_gin ON api_blogpost USING GIN (search_vector)',
+]
+POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS api_blogpost_search_vector_gin',
+    'ALTER TABLE api_blogpost DROP COLUMN IF EXISTS search_vector',
+]
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS api_blogpost_fts USING fts5("
+    "title, excerpt, tags, content, tokenize = 'unicode61 remove_diacritics 2')",
+]
+SQLITE_BACKWARD = ['DROP TABLE IF EXISTS api_blogpost_fts']
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for sql in POSTGRES_FORWARD:
+            schema_editor.execute(sql)
+    elif vendor == 'sqlite':
+        for sql in SQLITE_FORWARD:
+            schema_editor.execute(sql)
+        BlogPost = apps.get_model('api', 'BlogPost')
+        rows = [
+            (post.pk, post.title, post.excerpt, post.tags.replace(',', ' '), plain_text(post.content))
+            for post in BlogPost.objects.all()
+        ]
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO api_blogpost_fts (rowid, title, excerpt, tags, content) VALUES (%s, %s, %s, %s, %s)',
+                rows
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}.get(vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_blogpostdailyviews'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
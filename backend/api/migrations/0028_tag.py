@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_blogpost_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Etiket')),
+                ('slug', models.SlugField(allow_unicode=True, max_length=120, unique=True, verbose_name='URL Slug')),
+                ('published_count', models.PositiveIntegerField(default=0, verbose_name='Yayındaki Yazı Sayısı')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Etiket',
+                'verbose_name_plural': 'Etiketler',
+                'ordering': ['-published_count', 'name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='normalized_tags',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='posts', to='api.tag', verbose_name='Etiket Dizini'),
+        ),
+    ]
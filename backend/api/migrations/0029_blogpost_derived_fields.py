@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_tag'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='outline',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Başlıklar'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='plain_excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Düz Metin Özeti'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Okuma Süresi (dk)'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Kelime Sayısı'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_blogpost_derived_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogPostRelated',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Benzerlik')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='Sıra')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='api.blogpost', verbose_name='Blog Yazısı')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='incoming_related_links', to='api.blogpost', verbose_name='İlgili Yazı')),
+            ],
+            options={
+                'verbose_name': 'İlgili Yazı',
+                'verbose_name_plural': 'İlgili Yazılar',
+                'ordering': ['post', 'rank'],
+                'unique_together': {('post', 'rank')},
+            },
+        ),
+    ]
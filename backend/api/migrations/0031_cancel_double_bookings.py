@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+ACTIVE_STATUSES = ['pending', 'confirmed']
+CANCEL_NOTE = 'Aynı veteriner ve saat için çift kayıt olduğundan otomatik olarak iptal edildi.'
+
+
+def cancel_double_bookings(apps, schema_editor):
+    """Keep one active appointment per vet and start time (confirmed first, then the oldest)"""
+    Appointment = apps.get_model('api', 'Appointment')
+    seen = set()
+    appointments = (
+        Appointment.objects.filter(status__in=ACTIVE_STATUSES)
+        .order_by('veterinarian_id', 'date', 'time', 'status', 'created_at', 'pk')
+    )
+    for appointment in appointments.iterator():
+        slot = (appointment.veterinarian_id, appointment.date, appointment.time)
+        if slot not in seen:
+            seen.add(slot)
+            continue
+        appointment.status = 'cancelled'
+        appointment.admin_notes = '\n'.join(filter(None, [appointment.admin_notes, CANCEL_NOTE]))
+        appointment.save(update_fields=['status', 'admin_notes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0030_blogpostrelated'),
+    ]
+
+    operations = [
+        migrations.RunPython(cancel_double_bookings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0031_cancel_double_bookings'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=('veterinarian', 'date', 'time'), name='unique_active_appointment_slot'),
+        ),
+    ]
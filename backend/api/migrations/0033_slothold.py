@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:56
+
+import api.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0032_appointment_unique_active_slot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Tarih')),
+                ('time', models.TimeField(verbose_name='Saat')),
+                ('token', models.CharField(default=api.models.new_hold_token, editable=False, max_length=64, unique=True, verbose_name='Anahtar')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Son Geçerlilik')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('veterinarian', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_holds', to='api.veterinarian', verbose_name='Veteriner')),
+            ],
+            options={
+                'verbose_name': 'Saat Ayırma',
+                'verbose_name_plural': 'Saat Ayırmaları',
+                'indexes': [models.Index(fields=['veterinarian', 'date'], name='api_slothol_veterin_629636_idx')],
+            },
+        ),
+    ]
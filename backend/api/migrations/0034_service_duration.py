@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0033_slothold'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='duration_minutes',
+            field=models.PositiveSmallIntegerField(default=30, verbose_name='Süre (dk)'),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='buffer_minutes',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Randevudan sonra temizlik ve hazırlık için boş bırakılan süre', verbose_name='Ara Süre (dk)'),
+        ),
+        migrations.AddField(
+            model_name='slothold',
+            name='service',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='slot_holds', to='api.service', verbose_name='Hizmet'),
+        ),
+        # Filled from the free text service by the next migration, then renamed to service
+        migrations.AddField(
+            model_name='appointment',
+            name='service_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='appointments', to='api.service', verbose_name='Hizmet'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations
+from django.utils.text import slugify
+
+ASCII = str.maketrans('çğıöşüÇĞİÖŞÜ', 'cgiosuCGIOSU')
+
+
+def service_key(text):
+    # "Aşılama" and the slug "asilama" give the same key
+    return slugify(text.replace('I', 'ı').replace('İ', 'i').lower().translate(ASCII))
+
+
+def link_services(apps, schema_editor):
+    """
+    Point every appointment at the Service its free text names
+
+    The text is matched against the slugs and titles of the services. Names
+    no service matches get an inactive Service of their own, so no booking
+    loses its service; an empty text leaves the appointment without one.
+    """
+    Appointment = apps.get_model('api', 'Appointment')
+    Service = apps.get_model('api', 'Service')
+
+    services = {}
+    for service in Service.objects.order_by('-is_active', 'order', 'pk'):
+        services.setdefault(service_key(service.slug), service)
+        services.setdefault(service_key(service.title), service)
+
+    names = Appointment.objects.exclude(service='').values_list('service', flat=True).distinct()
+    for name in names:
+        key = service_key(name)
+        if not key:
+            continue
+        service = services.get(key)
+        if service is None:
+            slug, counter = key, 1
+            while Service.objects.filter(slug=slug).exists():
+                slug = f'{key}-{counter}'
+                counter += 1
+            service = services[key] = Service.objects.create(
+                slug=slug, title=name.strip()[:200], short_description='', is_active=False,
+            )
+        Appointment.objects.filter(service=name).update(service_ref=service)
+
+
+def unlink_services(apps, schema_editor):
+    Appointment = apps.get_model('api', 'Appointment')
+    for appointment in Appointment.objects.exclude(service_ref=None).select_related('service_ref'):
+        appointment.service = appointment.service_ref.title
+        appointment.save(update_fields=['service'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0034_service_duration'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_services, unlink_services),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0035_link_appointment_services'),
+    ]
+
+    operations = [
+        # Lets the text column be added back empty when migrating backwards
+        migrations.AlterField(
+            model_name='appointment',
+            name='service',
+            field=models.CharField(default='', max_length=200, verbose_name='Hizmet'),
+        ),
+        migrations.RemoveField(
+            model_name='appointment',
+            name='service',
+        ),
+        migrations.RenameField(
+            model_name='appointment',
+            old_name='service_ref',
+            new_name='service',
+        ),
+    ]
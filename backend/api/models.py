@@ -1,6 +1,11 @@
+import secrets
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.functions import Coalesce
 from django.utils.text import slugify
+from .cache_utils import singleton_cache
+from .content import analyze_content, content_hash
 
 class Veterinarian(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="veterinarian_profile", null=True, blank=True)
@@ -33,6 +38,18 @@ class Veterinarian(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Cache invalidation (see api/invalidation.py)
+    cache_paths = [
+        '/api/veterinarians/',
+        '/api/veterinarians/active/',
+        '/api/veterinarians/{obj.slug}/',
+        '/api/public/veterinarians/',
+        '/api/public/veterinarians/{obj.slug}/',
+        '/api/page-bundle/home/',
+        '/api/page-bundle/vet/{obj.slug}/',
+    ]
+    surrogate_keys = ['veterinarians', 'veterinarian-{obj.pk}', 'blog']
+
     class Meta:
         verbose_name = "Veteriner Hekim"
         verbose_name_plural = "Veteriner Hekimler"
@@ -53,6 +70,60 @@ class Veterinarian(models.Model):
         super().save(*args, **kwargs)
 
 
+def turkish_lower(value):
+    """lower() that maps I/İ the Turkish way (I -> ı, İ -> i)"""
+    return value.replace("I", "ı").replace("İ", "i").lower()
+
+
+class Tag(models.Model):
+    """Normalized blog tag; BlogPost.tags (comma separated) stays the editable source"""
+    name = models.CharField(max_length=100, verbose_name="Etiket")
+    slug = models.SlugField(max_length=120, unique=True, allow_unicode=True, verbose_name="URL Slug")
+    published_count = models.PositiveIntegerField(default=0, verbose_name="Yayındaki Yazı Sayısı")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Cache invalidation (see api/invalidation.py)
+    cache_paths = ['/api/blog/tags/', '/api/public/blog/tags/']
+    surrogate_keys = ['blog']
+
+    class Meta:
+        verbose_name = "Etiket"
+        verbose_name_plural = "Etiketler"
+        ordering = ["-published_count", "name"]
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def make_slug(name):
+        return slugify(turkish_lower(name.strip()), allow_unicode=True)
+
+    @classmethod
+    def parse(cls, csv):
+        """Unique (slug, name) pairs of a comma separated tag string, in order"""
+        tags = {}
+        for name in (csv or "").split(","):
+            name = " ".join(name.split())
+            slug = cls.make_slug(name)
+            if slug and slug not in tags:
+                tags[slug] = name[:100]
+        return list(tags.items())
+
+    @classmethod
+    def refresh_counts(cls, tag_ids):
+        """Recompute published_count of some tags with one UPDATE"""
+        if not tag_ids:
+            return
+        published = (
+            BlogPost.normalized_tags.through.objects
+            .filter(tag_id=models.OuterRef("pk"), blogpost__status="published")
+            .order_by().values("tag_id").annotate(count=models.Count("pk")).values("count")
+        )
+        cls.objects.filter(pk__in=tag_ids).update(
+            published_count=Coalesce(models.Subquery(published), 0)
+        )
+
+
 class BlogPost(models.Model):
     STATUS_CHOICES = [
         ("draft", "Taslak"),
@@ -67,25 +138,132 @@ class BlogPost(models.Model):
     featured_image = models.ImageField(upload_to="blog/", verbose_name="Öne Çıkan Görsel", blank=True, null=True)
     category = models.CharField(max_length=100, verbose_name="Kategori", default="Genel")
     tags = models.CharField(max_length=500, verbose_name="Etiketler", blank=True)
+    normalized_tags = models.ManyToManyField(Tag, related_name="posts", blank=True, editable=False, verbose_name="Etiket Dizini")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="draft", verbose_name="Durum")
     views = models.IntegerField(default=0, verbose_name="Görüntülenme")
     published_at = models.DateTimeField(null=True, blank=True, verbose_name="Yayın Tarihi")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Derived from content on save (see api/content.py)
+    word_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Kelime Sayısı")
+    reading_time = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name="Okuma Süresi (dk)")
+    outline = models.JSONField(default=list, blank=True, editable=False, verbose_name="Başlıklar")
+    plain_excerpt = models.TextField(blank=True, editable=False, verbose_name="Düz Metin Özeti")
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+
+    # Cache invalidation (see api/invalidation.py)
+    cache_paths = [
+        '/api/blog/',
+        '/api/blog/featured/',
+        '/api/blog/trending/',
+        '/api/blog/categories/',
+        '/api/blog/tags/',
+        '/api/blog/facets/',
+        '/api/blog/{obj.slug}/',
+        '/api/blog/{obj.slug}/related/',
+        '/api/blog/feed.rss',
+        '/api/blog/feed.atom',
+        '/api/public/blog/',
+        '/api/public/blog/categories/',
+        '/api/public/blog/tags/',
+        '/api/public/blog/facets/',
+        '/api/public/blog/{obj.slug}/',
+        '/api/public/blog/{obj.slug}/related/',
+        '/api/page-bundle/home/',
+        '/api/page-bundle/vet/{obj.author.slug}/',
+        '/api/sitemap.xml',
+    ]
+    surrogate_keys = ['blog', 'blogpost-{obj.pk}']
+
     class Meta:
         verbose_name = "Blog Yazısı"
         verbose_name_plural = "Blog Yazıları"
         ordering = ["-published_at", "-created_at"]
 
+    DERIVED_FIELDS = ["word_count", "reading_time", "outline", "plain_excerpt", "content_hash"]
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title, allow_unicode=True)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "content" in update_fields:
+            if self.update_derived_fields() and update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, *self.DERIVED_FIELDS}
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
 
+    def update_derived_fields(self):
+        """Recompute the fields derived from content; returns False when it did not change"""
+        if self.content_hash and self.content_hash == content_hash(self.content):
+            return False
+        for field, value in analyze_content(self.content).items():
+            setattr(self, field, value)
+        return True
+
+    def sync_tags(self):
+        """Mirror the comma separated tags into normalized_tags and refresh the tag counts"""
+        parsed = Tag.parse(self.tags)
+        existing = {tag.slug: tag for tag in Tag.objects.filter(slug__in=[slug for slug, name in parsed])}
+        for slug, name in parsed:
+            if slug not in existing:
+                existing[slug], created = Tag.objects.get_or_create(slug=slug, defaults={"name": name})
+        previous = set(self.normalized_tags.values_list("pk", flat=True))
+        current = {existing[slug].pk for slug, name in parsed}
+        self.normalized_tags.set(current)
+        Tag.refresh_counts(previous | current)
+
+
+class BlogPostDailyViews(models.Model):
+    """Views of a post on one day, written by the view counter flush (see api/view_counter.py)"""
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name="daily_views", verbose_name="Blog Yazısı")
+    date = models.DateField(verbose_name="Tarih")
+    views = models.PositiveIntegerField(default=0, verbose_name="Görüntülenme")
+
+    class Meta:
+        verbose_name = "Günlük Görüntülenme"
+        verbose_name_plural = "Günlük Görüntülenmeler"
+        unique_together = [("post", "date")]
+        indexes = [models.Index(fields=["date"])]
+
+    def __str__(self):
+        return f"{self.post} - {self.date}: {self.views}"
+
+
+class BlogPostReaderSketch(models.Model):
+    """Unique readers of a post on one day, as a HyperLogLog sketch (see api/hyperloglog.py)"""
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name="reader_sketches", verbose_name="Blog Yazısı")
+    date = models.DateField(verbose_name="Tarih")
+    registers = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Okuyucu Özeti"
+        verbose_name_plural = "Okuyucu Özetleri"
+        unique_together = [("post", "date")]
+
+    def __str__(self):
+        return f"{self.post} - {self.date}"
+
+
+class BlogPostRelated(models.Model):
+    """A precomputed related post and its TF-IDF similarity (see api/related.py)"""
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name="related_links", verbose_name="Blog Yazısı")
+    related = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name="incoming_related_links", verbose_name="İlgili Yazı")
+    score = models.FloatField(verbose_name="Benzerlik")
+    rank = models.PositiveSmallIntegerField(verbose_name="Sıra")
+
+    class Meta:
+        verbose_name = "İlgili Yazı"
+        verbose_name_plural = "İlgili Yazılar"
+        ordering = ["post", "rank"]
+        unique_together = [("post", "rank")]
+
+    def __str__(self):
+        return f"{self.post} -> {self.related} ({self.score:.2f})"
+
 
 class Appointment(models.Model):
     STATUS_CHOICES = [
@@ -105,7 +283,7 @@ class Appointment(models.Model):
     owner_phone = models.CharField(max_length=20, verbose_name="Telefon")
     date = models.DateField(verbose_name="Tarih")
     time = models.TimeField(verbose_name="Saat")
-    service = models.CharField(max_length=200, verbose_name="Hizmet")
+    service = models.ForeignKey("Service", on_delete=models.SET_NULL, null=True, blank=True, related_name="appointments", verbose_name="Hizmet")
     notes = models.TextField(verbose_name="Notlar", blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending", verbose_name="Durum")
     admin_notes = models.TextField(verbose_name="Admin Notları", blank=True)
@@ -116,11 +294,48 @@ class Appointment(models.Model):
         verbose_name = "Randevu"
         verbose_name_plural = "Randevular"
         ordering = ["date", "time"]
+        constraints = [
+            # One active booking per vet and start time, whatever the request path (see api/scheduling.py)
+            models.UniqueConstraint(
+                fields=["veterinarian", "date", "time"],
+                condition=models.Q(status__in=["pending", "confirmed"]),
+                name="unique_active_appointment_slot",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.pet_name} - {self.date} {self.time}"
 
 
+def new_hold_token():
+    return secrets.token_urlsafe(24)
+
+
+class SlotHold(models.Model):
+    """
+    A slot kept for a visitor while they fill in the booking form
+
+    Holds count as taken until expires_at; booking with the token redeems
+    the hold (see api/scheduling.py).
+    """
+    veterinarian = models.ForeignKey(Veterinarian, on_delete=models.CASCADE, related_name="slot_holds", verbose_name="Veteriner")
+    date = models.DateField(verbose_name="Tarih")
+    time = models.TimeField(verbose_name="Saat")
+    # The length of the held booking
+    service = models.ForeignKey("Service", on_delete=models.SET_NULL, null=True, blank=True, related_name="slot_holds", verbose_name="Hizmet")
+    token = models.CharField(max_length=64, unique=True, default=new_hold_token, editable=False, verbose_name="Anahtar")
+    expires_at = models.DateTimeField(db_index=True, verbose_name="Son Geçerlilik")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Saat Ayırma"
+        verbose_name_plural = "Saat Ayırmaları"
+        indexes = [models.Index(fields=["veterinarian", "date"])]
+
+    def __str__(self):
+        return f"{self.veterinarian} - {self.date} {self.time}"
+
+
 class ContactMessage(models.Model):
     STATUS_CHOICES = [
         ("new", "Yeni"),
@@ -167,6 +382,15 @@ class GalleryImage(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Cache invalidation (see api/invalidation.py)
+    cache_paths = [
+        '/api/gallery/',
+        '/api/gallery/categories/',
+        '/api/public/gallery/',
+        '/api/public/gallery/categories/',
+    ]
+    surrogate_keys = ['gallery']
+
     class Meta:
         verbose_name = "Galeri Görseli"
         verbose_name_plural = "Galeri Görselleri"
@@ -192,6 +416,10 @@ class PageContent(models.Model):
 
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Cache invalidation (see api/invalidation.py)
+    cache_paths = ['/api/pages/', '/api/pages/by-name/{obj.page_name}/', '/api/page-bundle/service/{obj.page_name}/']
+    surrogate_keys = ['pages', 'page-{obj.page_name}']
+
     class Meta:
         verbose_name = "Sayfa İçeriği"
         verbose_name_plural = "Sayfa İçerikleri"
@@ -207,6 +435,9 @@ class Service(models.Model):
     short_description = models.TextField(max_length=500, verbose_name="Kısa Açıklama")
     is_active = models.BooleanField(default=True, verbose_name="Aktif")
     order = models.IntegerField(default=0, verbose_name="Sıra")
+    # Time an appointment for this service takes in the vet's day (see api/scheduling.py)
+    duration_minutes = models.PositiveSmallIntegerField(default=30, verbose_name="Süre (dk)")
+    buffer_minutes = models.PositiveSmallIntegerField(default=0, verbose_name="Ara Süre (dk)", help_text="Randevudan sonra temizlik ve hazırlık için boş bırakılan süre")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -216,6 +447,18 @@ class Service(models.Model):
     meta_keywords = models.CharField(max_length=255, verbose_name="Anahtar Kelimeler", blank=True)
     og_image = models.CharField(max_length=255, verbose_name="OG Görsel URL", blank=True, default="/og-service.jpg")
 
+    # Cache invalidation (see api/invalidation.py)
+    cache_paths = [
+        '/api/services/',
+        '/api/services/active/',
+        '/api/services/all/',
+        '/api/public/services/',
+        '/api/public/services/{obj.slug}/',
+        '/api/page-bundle/service/{obj.slug}/',
+        '/api/sitemap.xml',
+    ]
+    surrogate_keys = ['services']
+
     class Meta:
         verbose_name = "Hizmet"
         verbose_name_plural = "Hizmetler"
@@ -250,6 +493,10 @@ class AboutPage(models.Model):
 
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Cache invalidation (see api/invalidation.py)
+    cache_paths = ['/api/about-page/']
+    surrogate_keys = ['about-page']
+
     class Meta:
         verbose_name = "Hakkımızda Sayfası"
         verbose_name_plural = "Hakkımızda Sayfası"
@@ -261,9 +508,19 @@ class AboutPage(models.Model):
         # Only allow one instance
         self.pk = 1
         super().save(*args, **kwargs)
+        singleton_cache.invalidate(self.__class__)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        singleton_cache.invalidate(self.__class__)
+        return result
 
     @classmethod
     def get_instance(cls):
+        return singleton_cache.get(cls, cls._load_instance)
+
+    @classmethod
+    def _load_instance(cls):
         obj, created = cls.objects.get_or_create(
             pk=1,
             defaults={
@@ -330,6 +587,10 @@ class ContactPage(models.Model):
 
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Cache invalidation (see api/invalidation.py)
+    cache_paths = ['/api/contact-page/']
+    surrogate_keys = ['contact-page']
+
     class Meta:
         verbose_name = "İletişim Sayfası"
         verbose_name_plural = "İletişim Sayfası"
@@ -341,9 +602,19 @@ class ContactPage(models.Model):
         # Only allow one instance
         self.pk = 1
         super().save(*args, **kwargs)
+        singleton_cache.invalidate(self.__class__)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        singleton_cache.invalidate(self.__class__)
+        return result
 
     @classmethod
     def get_instance(cls):
+        return singleton_cache.get(cls, cls._load_instance)
+
+    @classmethod
+    def _load_instance(cls):
         obj, created = cls.objects.get_or_create(
             pk=1,
             defaults={
@@ -410,6 +681,10 @@ class ServicesPage(models.Model):
 
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Cache invalidation (see api/invalidation.py)
+    cache_paths = ['/api/services-page/']
+    surrogate_keys = ['services-page']
+
     class Meta:
         verbose_name = "Hizmetler Sayfası"
         verbose_name_plural = "Hizmetler Sayfası"
@@ -421,9 +696,19 @@ class ServicesPage(models.Model):
         # Only allow one instance
         self.pk = 1
         super().save(*args, **kwargs)
+        singleton_cache.invalidate(self.__class__)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        singleton_cache.invalidate(self.__class__)
+        return result
 
     @classmethod
     def get_instance(cls):
+        return singleton_cache.get(cls, cls._load_instance)
+
+    @classmethod
+    def _load_instance(cls):
         obj, created = cls.objects.get_or_create(
             pk=1,
             defaults={
@@ -552,6 +837,14 @@ class SEOSettings(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Cache invalidation (see api/invalidation.py)
+    cache_paths = [
+        '/api/seo-settings/',
+        '/api/seo-settings/all_settings/',
+        '/api/seo-settings/{obj.page_name}/',
+    ]
+    surrogate_keys = ['seo']
+
     class Meta:
         verbose_name = "SEO Ayarı"
         verbose_name_plural = "SEO Ayarları"
@@ -576,6 +869,10 @@ class GoogleReview(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Cache invalidation (see api/invalidation.py)
+    cache_paths = ['/api/google-reviews/', '/api/public/google-reviews/', '/api/page-bundle/home/']
+    surrogate_keys = ['google-reviews']
+
     class Meta:
         verbose_name = "Google Yorumu"
         verbose_name_plural = "Google Yorumları"
@@ -677,6 +974,10 @@ class HomePage(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Cache invalidation (see api/invalidation.py)
+    cache_paths = ['/api/homepage/content/', '/api/page-bundle/home/']
+    surrogate_keys = ['homepage']
+
     class Meta:
         verbose_name = "Anasayfa"
         verbose_name_plural = "Anasayfa"
@@ -688,9 +989,19 @@ class HomePage(models.Model):
         # Only allow one instance
         self.pk = 1
         super().save(*args, **kwargs)
+        singleton_cache.invalidate(self.__class__)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        singleton_cache.invalidate(self.__class__)
+        return result
 
     @classmethod
     def get_instance(cls):
+        return singleton_cache.get(cls, cls._load_instance)
+
+    @classmethod
+    def _load_instance(cls):
         obj, created = cls.objects.get_or_create(pk=1)
         return obj
 
@@ -728,6 +1039,10 @@ class SiteSettings(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Cache invalidation (see api/invalidation.py)
+    cache_paths = ['/api/site-settings/get_settings/']
+    surrogate_keys = ['site-settings']
+
     class Meta:
         verbose_name = "Site Ayarları"
         verbose_name_plural = "Site Ayarları"
@@ -739,8 +1054,18 @@ class SiteSettings(models.Model):
         # Only allow one instance (Singleton pattern)
         self.pk = 1
         super().save(*args, **kwargs)
+        singleton_cache.invalidate(self.__class__)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        singleton_cache.invalidate(self.__class__)
+        return result
 
     @classmethod
     def get_instance(cls):
+        return singleton_cache.get(cls, cls._load_instance)
+
+    @classmethod
+    def _load_instance(cls):
         obj, created = cls.objects.get_or_create(pk=1)
         return obj
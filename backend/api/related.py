@@ -0,0 +1,281 @@
+"""
+Related blog posts from TF-IDF similarity
+
+Every published post is a sparse TF-IDF vector over the words of its title,
+tags, excerpt and body text, title and tags weighing the most. Two posts are
+as similar as the cosine of their vectors, i.e. the dot product of the
+normalised vectors, accumulated through an inverted index: a post is only
+ever compared with the posts sharing one of its terms, and the cost grows
+with the overlap instead of with the square of the number of posts.
+
+The best RELATED_POSTS_SIZE neighbours of every post are stored in
+BlogPostRelated, so the `related` action is one indexed query.
+build_related_posts recomputes the whole table (run on deploy). Saving a
+post refreshes its own list and the lists it enters or leaves; the document
+frequencies of the other posts drift slightly until the next full rebuild.
+Those refreshes are debounced into a background thread of the worker (see
+RelatedRefresher): the admin save never waits on the TF-IDF pass, and a bulk
+edit costs one pass instead of one per post.
+
+Term counts are cached per post under a signature of the indexed fields, so
+an incremental refresh only parses the HTML of posts that changed.
+"""
+import hashlib
+import heapq
+import logging
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count, Min
+
+from .cache_utils import bump_model_version
+from .content import plain_text
+from .models import BlogPost, BlogPostRelated, turkish_lower
+
+logger = logging.getLogger(__name__)
+
+# Fields of a post feeding its vector, with the weight of one occurrence
+FIELD_WEIGHTS = {'title': 3, 'tags': 3, 'excerpt': 2, 'content': 1}
+# Saving any of these can change the related lists
+INDEXED_FIELDS = {'title', 'tags', 'excerpt', 'content', 'status'}
+# Only the strongest terms of a post are kept, the long tail adds noise and postings
+MAX_TERMS = 100
+MIN_SCORE = 0.05
+TERMS_TIMEOUT = 7 * 24 * 3600
+
+WORD = re.compile(r'[^\W\d_]{3,}', re.UNICODE)
+STOPWORDS = frozenset("""
+    acaba ama ancak artık aslında bazı belki ben beni bile bir biraz birçok birkaç biz bize bizi bizim bu buna
+    bunda bundan bunlar bunları bunların bunu bunun çok çünkü daha dahi değil diğer diye eğer en gibi göre hem
+    henüz hep hepsi her herhangi hiç için ile ilgili ise işte kadar kendi kendine ki kim mı mi mu mü nasıl ne
+    neden nerede niçin olan olarak olduğu olduğunu olmak olması olur onlar onları onların onu onun öyle sadece
+    şey siz size sizi sizin şu şöyle tüm üzere var veya yani yine yok zaten the and for with
+""".split())
+
+
+def tokenize(text):
+    return [word for word in WORD.findall(turkish_lower(text or '')) if word not in STOPWORDS]
+
+
+class RelatedPosts:
+    """Builds and refreshes the BlogPostRelated table"""
+
+    def __init__(self, size=None):
+        self._size = size
+
+    @property
+    def size(self):
+        return self._size or getattr(settings, 'RELATED_POSTS_SIZE', 6)
+
+    @staticmethod
+    def _signature(title, excerpt, tags, digest):
+        raw = '\x00'.join((title, excerpt, tags, digest))
+        return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _count_terms(title, excerpt, tags, content):
+        counts = Counter()
+        for field, text in (('title', title), ('tags', tags.replace(',', ' ')),
+                            ('excerpt', excerpt), ('content', plain_text(content))):
+            for word in tokenize(text):
+                counts[word] += FIELD_WEIGHTS[field]
+        return counts
+
+    def term_counts(self):
+        """Weighted term counts of every published post: {pk: Counter}"""
+        rows = BlogPost.objects.filter(status='published').values_list('pk', 'title', 'excerpt', 'tags', 'content_hash')
+        keys = {
+            pk: f'petkey:related:terms:{pk}:{self._signature(title, excerpt, tags, digest)}'
+            for pk, title, excerpt, tags, digest in rows
+        }
+        cached = cache.get_many(list(keys.values()))
+        counts = {pk: cached[key] for pk, key in keys.items() if key in cached}
+
+        missing = [pk for pk in keys if pk not in counts]
+        fresh = {}
+        # Only the posts whose indexed fields changed are loaded with their body
+        for start in range(0, len(missing), 200):
+            posts = BlogPost.objects.filter(pk__in=missing[start:start + 200]).only('title', 'excerpt', 'tags', 'content')
+            for post in posts:
+                counts[post.pk] = self._count_terms(post.title, post.excerpt, post.tags, post.content)
+                fresh[keys[post.pk]] = counts[post.pk]
+        if fresh:
+            cache.set_many(fresh, TERMS_TIMEOUT)
+        return counts
+
+    @staticmethod
+    def vectors(counts):
+        """
+        Normalised TF-IDF vectors and their inverted index
+
+        Returns:
+            tuple: ({pk: {term: weight}}, {term: [(pk, weight), ...]})
+        """
+        total = len(counts)
+        frequencies = Counter()
+        for terms in counts.values():
+            frequencies.update(terms.keys())
+        # Smoothed idf: a term of every post still weighs a little, a rare one a lot
+        idf = {term: math.log((1 + total) / (1 + frequency)) + 1 for term, frequency in frequencies.items()}
+
+        vectors = {}
+        index = defaultdict(list)
+        for pk, terms in counts.items():
+            weights = {term: (1 + math.log(count)) * idf[term] for term, count in terms.items()}
+            if len(weights) > MAX_TERMS:
+                weights = dict(heapq.nlargest(MAX_TERMS, weights.items(), key=lambda item: item[1]))
+            norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+            if not norm:
+                continue
+            vector = {term: weight / norm for term, weight in weights.items()}
+            vectors[pk] = vector
+            for term, weight in vector.items():
+                index[term].append((pk, weight))
+        return vectors, index
+
+    @staticmethod
+    def similarities(pk, vectors, index):
+        """Cosine similarity of a post with every post sharing a term: {pk: score}"""
+        scores = defaultdict(float)
+        for term, weight in vectors.get(pk, {}).items():
+            for other, other_weight in index[term]:
+                scores[other] += weight * other_weight
+        scores.pop(pk, None)
+        return scores
+
+    def _top(self, scores):
+        ranked = heapq.nlargest(self.size, scores.items(), key=lambda item: item[1])
+        return [(other, score) for other, score in ranked if score >= MIN_SCORE]
+
+    def _write(self, lists):
+        """Replace the stored lists of some posts ({pk: [(related_pk, score), ...]})"""
+        with transaction.atomic():
+            BlogPostRelated.objects.filter(post_id__in=list(lists)).delete()
+            BlogPostRelated.objects.bulk_create([
+                BlogPostRelated(post_id=pk, related_id=other, score=score, rank=rank)
+                for pk, neighbours in lists.items()
+                for rank, (other, score) in enumerate(neighbours, start=1)
+            ])
+        # Rows are written in bulk, without the signals feeding the invalidation bus
+        bump_model_version(BlogPostRelated)
+
+    def rebuild(self):
+        """Recompute the lists of every post; returns the number of published posts"""
+        vectors, index = self.vectors(self.term_counts())
+        lists = {pk: self._top(self.similarities(pk, vectors, index)) for pk in vectors}
+        with transaction.atomic():
+            # Drafts and posts without words lose their lists too
+            BlogPostRelated.objects.exclude(post_id__in=list(lists)).delete()
+            self._write(lists)
+        return len(vectors)
+
+    def refresh(self, changes):
+        """
+        Update the lists after some posts were saved, unpublished or deleted
+
+        changes maps each post to the ids of the posts that listed it before
+        a delete, whose rows the cascade already removed. Recomputes the
+        lists of the changed posts and of the posts that either list one of
+        them (its score changed or it is gone) or would now rank it above
+        their weakest entry, from one set of vectors.
+        """
+        vectors, index = self.vectors(self.term_counts())
+        affected = set(
+            BlogPostRelated.objects.filter(related_id__in=list(changes)).values_list('post_id', flat=True)
+        )
+        own = {}
+        for pk, referrers in changes.items():
+            affected.update(referrers)
+            scores = self.similarities(pk, vectors, index)
+            own[pk] = self._top(scores) if pk in vectors else []
+            candidates = {other: score for other, score in scores.items() if score >= MIN_SCORE}
+            if not candidates:
+                continue
+            stored = (
+                BlogPostRelated.objects.filter(post_id__in=list(candidates)).values('post_id')
+                .annotate(entries=Count('pk'), weakest=Min('score'))
+            )
+            stored = {row['post_id']: row for row in stored}
+            for other, score in candidates.items():
+                row = stored.get(other)
+                if row is None or row['entries'] < self.size or score > row['weakest']:
+                    affected.add(other)
+
+        lists = {
+            other: self._top(self.similarities(other, vectors, index))
+            for other in affected - set(changes) if other in vectors
+        }
+        lists.update(own)
+        self._write(lists)
+        return lists
+
+
+related_posts = RelatedPosts()
+
+
+class RelatedRefresher:
+    """
+    Debounced refresh of the related lists, off the request thread
+
+    schedule() only queues the post. RELATED_POSTS_REFRESH_DELAY seconds
+    after the first queued post, a background thread refreshes everything
+    queued by then in one pass. Posts still queued when the worker exits are
+    refreshed by the gunicorn worker_exit hook; build_related_posts catches
+    up on anything a crashed worker lost. A delay of 0 refreshes synchronously.
+    """
+
+    def __init__(self, related, delay=None):
+        self.related = related
+        self._delay = delay
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+
+    @property
+    def delay(self):
+        return self._delay if self._delay is not None else getattr(settings, 'RELATED_POSTS_REFRESH_DELAY', 5)
+
+    def schedule(self, pk, referrers=()):
+        if self.delay <= 0:
+            self.run({pk: set(referrers)})
+            return
+        with self._lock:
+            self._pending.setdefault(pk, set()).update(referrers)
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self._run_in_thread)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Refresh everything queued now"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if pending:
+            self.run(pending)
+
+    def _run_in_thread(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+    def run(self, changes):
+        try:
+            self.related.refresh(changes)
+        except DatabaseError as e:
+            logger.error(f'Could not refresh the related posts of blog posts {sorted(changes)}: {str(e)}')
+
+
+related_refresher = RelatedRefresher(related_posts)
+
+
+def refresh_related_posts(pk, referrers=()):
+    related_refresher.schedule(pk, referrers)
@@ -0,0 +1,553 @@
+"""
+Veterinarian working hours and appointment slots
+
+Every Veterinarian has one free text hours field per weekday (monday_hours
+... sunday_hours): "09:00-18:00", "09:00-12:30, 14:00-18:00", "7/24", or
+empty / "Kapalı" for a day off. parse_hours() turns such a string into
+sorted, merged (start, end) minute intervals.
+
+A day is handled as a bitmap: an int whose bit m is set when minute m of
+the day is free. Working hours are OR-ed in, each booking is cleared with
+one AND NOT, and a slot fits when all of its bits are still set, so a day is
+computed in time linear in its slots and bookings.
+
+A booking takes the duration of its Service plus the service's buffer (the
+slot length when it has no service). Slots are offered on the slot grid of
+each working interval and right where a booking ends, so bookings of any
+length pack into the day without gaps.
+
+Parsed schedules are cached per vet in the shared cache and dropped by
+signals.py when the vet is saved. The booked minutes of every (vet, day)
+are indexed the same way (BookingIndex), refreshed by signals.py after each
+appointment change, so availability over many vets and days is answered
+from bitmaps: available_slots(), search_availability() and earliest_slot()
+serve the booking views. check_slot() and reserve_slot(), which book an
+appointment, always read the database.
+
+While a visitor fills in the booking form, their slot is held for
+SLOT_HOLD_MINUTES (SlotHold, see hold_slot()). Unexpired holds count as
+booked minutes everywhere; a cached index entry lives until its first hold
+expires. Booking with the hold's token redeems it in the same transaction.
+Expired holds are ignored by every query, so deleting them is only
+housekeeping (sweep_expired_holds()).
+"""
+import logging
+import re
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .cache_utils import get_model_version
+from .models import Appointment, SlotHold, Veterinarian, turkish_lower
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+# Indexed by date.weekday()
+DAY_FIELDS = (
+    'monday_hours', 'tuesday_hours', 'wednesday_hours', 'thursday_hours',
+    'friday_hours', 'saturday_hours', 'sunday_hours',
+)
+# Appointments holding their slot
+ACTIVE_STATUSES = ('pending', 'confirmed')
+SCHEDULE_TIMEOUT = 24 * 3600
+HOLD_SWEEP_SECONDS = 60
+# Version stamp of the service durations, bumped by signals.py
+BOOKING_LENGTHS = 'booking-lengths'
+
+CLOSED_WORDS = {'', '-', 'kapalı', 'kapali', 'yok', 'tatil', 'izinli'}
+ALL_DAY = re.compile(r'7\s*/\s*24|24\s*saat', re.IGNORECASE)
+TIME_RANGE = re.compile(r'(\d{1,2})(?:[:.](\d{2}))?\s*[-–—]\s*(\d{1,2})(?:[:.](\d{2}))?')
+
+
+class SlotUnavailable(Exception):
+    """The requested appointment time cannot be booked"""
+
+    def __init__(self, message, code, vet_id=None, day=None, time=None, service=None):
+        super().__init__(message)
+        self.code = code
+        self.vet_id = vet_id
+        self.day = day
+        self.time = time
+        self.service = service
+
+
+def slot_minutes():
+    return getattr(settings, 'APPOINTMENT_SLOT_MINUTES', 30)
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def format_minutes(minutes):
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+
+def span_mask(start, end):
+    """Bitmap with the minutes [start, end) set"""
+    return ((1 << (end - start)) - 1) << start
+
+
+def booking_length(service=None):
+    """(duration, buffer) in minutes of an appointment for a Service, or of a plain slot"""
+    if service is None:
+        return slot_minutes(), 0
+    return service.duration_minutes or slot_minutes(), service.buffer_minutes
+
+
+def booking_span(start, duration=None, buffer=None):
+    """Bitmap of the minutes a booking starting at minute start takes, its buffer included"""
+    end = start + (duration or slot_minutes()) + (buffer or 0)
+    return span_mask(start, min(end, MINUTES_PER_DAY))
+
+
+def merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return tuple(merged)
+
+
+def parse_hours(text):
+    """
+    Working intervals of one day
+
+    "09:00-12:30, 14:00-18:00" -> ((540, 750), (840, 1080)). A range ending
+    at or before its start runs until midnight. Unrecognised text is logged
+    and treated as a day off.
+    """
+    text = ' '.join((text or '').split())
+    if turkish_lower(text) in CLOSED_WORDS:
+        return ()
+    if ALL_DAY.search(text):
+        return ((0, MINUTES_PER_DAY),)
+
+    intervals = []
+    for start_hour, start_minute, end_hour, end_minute in TIME_RANGE.findall(text):
+        start_minute, end_minute = int(start_minute or 0), int(end_minute or 0)
+        start = int(start_hour) * 60 + start_minute
+        end = int(end_hour) * 60 + end_minute
+        if start_minute >= 60 or end_minute >= 60 or start >= MINUTES_PER_DAY or end > MINUTES_PER_DAY:
+            continue
+        intervals.append((start, end if end > start else MINUTES_PER_DAY))
+    if not intervals:
+        logger.warning(f'Unrecognised working hours {text!r}, treated as closed')
+    return merge_intervals(intervals)
+
+
+class WeeklySchedule:
+    """Working intervals of the seven weekdays, Monday first"""
+
+    def __init__(self, days):
+        self.days = tuple(tuple(intervals) for intervals in days)
+
+    @classmethod
+    def from_veterinarian(cls, veterinarian):
+        days = [parse_hours(getattr(veterinarian, field)) for field in DAY_FIELDS]
+        if not any(getattr(veterinarian, field).strip() for field in DAY_FIELDS):
+            # Nothing entered at all: the clinic hours, not a vet who never works
+            default = parse_hours(getattr(settings, 'DEFAULT_WORKING_HOURS', '09:00-18:00'))
+            days = [default] * len(DAY_FIELDS)
+        return cls(days)
+
+    def intervals(self, day):
+        return self.days[day.weekday()]
+
+    def mask(self, day):
+        mask = 0
+        for start, end in self.intervals(day):
+            mask |= span_mask(start, end)
+        return mask
+
+    def slot_starts(self, day, length, booked=0):
+        """
+        Start minutes a booking of length minutes can take on a day
+
+        The slot grid stepping from the start of each interval, plus the
+        minutes right after each booked run, in order.
+        """
+        # Bit m is set when minute m - 1 is booked and minute m is not
+        ends = (booked << 1) & ~booked
+        step = slot_minutes()
+        for start, end in self.intervals(day):
+            last = end - length
+            if last < start:
+                continue
+            starts = set(range(start, last + 1, step))
+            window = (ends >> start) & span_mask(0, last - start + 1)
+            while window:
+                lowest = window & -window
+                starts.add(start + lowest.bit_length() - 1)
+                window ^= lowest
+            yield from sorted(starts)
+
+
+def _schedule_key(vet_id):
+    return f'petkey:schedule:{vet_id}'
+
+
+def get_schedules(vet_ids):
+    """Parsed schedules of some vets from the shared cache: {vet_id: WeeklySchedule}, unknown ids left out"""
+    keys = {vet_id: _schedule_key(vet_id) for vet_id in vet_ids}
+    cached = cache.get_many(list(keys.values()))
+    days = {vet_id: cached[key] for vet_id, key in keys.items() if key in cached}
+    missing = [vet_id for vet_id in keys if vet_id not in days]
+    if missing:
+        fresh = {
+            veterinarian.pk: WeeklySchedule.from_veterinarian(veterinarian).days
+            for veterinarian in Veterinarian.objects.filter(pk__in=missing).only(*DAY_FIELDS)
+        }
+        cache.set_many({keys[vet_id]: value for vet_id, value in fresh.items()}, SCHEDULE_TIMEOUT)
+        days.update(fresh)
+    return {vet_id: WeeklySchedule(days[vet_id]) for vet_id in keys if vet_id in days}
+
+
+def get_schedule(vet_id):
+    """Parsed schedule of a vet (Veterinarian.DoesNotExist if unknown)"""
+    schedule = get_schedules([vet_id]).get(vet_id)
+    if schedule is None:
+        raise Veterinarian.DoesNotExist(f'Veterinarian {vet_id} does not exist')
+    return schedule
+
+
+def invalidate_schedule(vet_id):
+    cache.delete(_schedule_key(vet_id))
+
+
+BOOKING_FIELDS = ('veterinarian_id', 'date', 'time', 'service__duration_minutes', 'service__buffer_minutes')
+
+
+def booking_masks(appointments):
+    """Bitmaps of the minutes taken by some appointments (or holds): {(vet_id, day): mask}"""
+    masks = defaultdict(int)
+    for vet_id, day, booked, duration, buffer in appointments.values_list(*BOOKING_FIELDS):
+        masks[(vet_id, day)] |= booking_span(to_minutes(booked), duration, buffer)
+    return masks
+
+
+def active_appointments():
+    return Appointment.objects.filter(status__in=ACTIVE_STATUSES)
+
+
+def active_holds():
+    return SlotHold.objects.filter(expires_at__gt=timezone.now())
+
+
+def booked_mask(vet_id, day, exclude=None, hold=None):
+    """
+    Bitmap of the minutes taken by the active appointments and holds of a vet on a day, from the database
+
+    Args:
+        exclude: Appointment id to ignore, when an existing appointment is moved
+        hold: Token of a hold to ignore, the one being redeemed or replaced
+    """
+    appointments = active_appointments().filter(veterinarian_id=vet_id, date=day)
+    if exclude is not None:
+        appointments = appointments.exclude(pk=exclude)
+    holds = active_holds().filter(veterinarian_id=vet_id, date=day)
+    if hold:
+        holds = holds.exclude(token=hold)
+    return booking_masks(appointments)[(vet_id, day)] | booking_masks(holds)[(vet_id, day)]
+
+
+def taken_masks(vet_ids, first_day, last_day):
+    """
+    Minutes taken by appointments and unexpired holds over a date range
+
+    Returns:
+        dict: {(vet_id, day): (mask, valid_until)}, valid_until being the
+        timestamp at which the first hold of the day expires, or None
+    """
+    lookup = {'veterinarian_id__in': vet_ids, 'date__range': (first_day, last_day)}
+    masks = booking_masks(active_appointments().filter(**lookup))
+    taken = {pair: (mask, None) for pair, mask in masks.items()}
+    for vet_id, day, held, duration, buffer, expires_at in active_holds().filter(**lookup).values_list(*BOOKING_FIELDS, 'expires_at'):
+        mask, valid_until = taken.get((vet_id, day), (0, None))
+        expiry = expires_at.timestamp()
+        taken[(vet_id, day)] = (
+            mask | booking_span(to_minutes(held), duration, buffer),
+            expiry if valid_until is None else min(valid_until, expiry),
+        )
+    return taken
+
+
+class BookingIndex:
+    """
+    Booked-minute bitmap of every (vet, day), kept in the shared cache
+
+    signals.py refreshes the entries an appointment or a hold touches after
+    each change. An entry holding a hold is stale once the hold expires and
+    is then reloaded like a missing one; changing the length of a service
+    moves every entry under a new version stamp. Missing entries of a
+    lookup are loaded together, with two queries over the vets and the
+    date range.
+    """
+    timeout = 3600
+
+    def _key(self, vet_id, day, version):
+        return f'petkey:taken:{version}:{vet_id}:{day.isoformat()}'
+
+    def masks(self, vet_ids, days):
+        """{(vet_id, day): booked bitmap} of every combination"""
+        version = get_model_version(BOOKING_LENGTHS)
+        keys = {(vet_id, day): self._key(vet_id, day, version) for vet_id in vet_ids for day in days}
+        cached = cache.get_many(list(keys.values()))
+        now = timezone.now().timestamp()
+        masks = {
+            pair: cached[key][0] for pair, key in keys.items()
+            if key in cached and (cached[key][1] is None or cached[key][1] > now)
+        }
+        missing = [pair for pair in keys if pair not in masks]
+        if missing:
+            loaded = taken_masks(
+                {vet_id for vet_id, day in missing},
+                min(day for vet_id, day in missing), max(day for vet_id, day in missing),
+            )
+            fresh = {pair: loaded.get(pair, (0, None)) for pair in missing}
+            cache.set_many({keys[pair]: entry for pair, entry in fresh.items()}, self.timeout)
+            masks.update((pair, entry[0]) for pair, entry in fresh.items())
+        return masks
+
+    def refresh(self, vet_id, day):
+        """Reload one entry from the database"""
+        if isinstance(day, str):
+            day = parse_date(day)
+        entry = taken_masks([vet_id], day, day).get((vet_id, day), (0, None))
+        cache.set(self._key(vet_id, day, get_model_version(BOOKING_LENGTHS)), entry, self.timeout)
+
+
+booking_index = BookingIndex()
+
+
+def free_slots(schedule, day, booked, length, earliest=0, buffer=0):
+    """
+    Start minutes of the free slots of a day, given its booked bitmap
+
+    The length minutes of a booking must lie within the working hours, its
+    buffer may run past closing time; neither may overlap another booking.
+    """
+    hours = schedule.mask(day)
+    duration = span_mask(0, length)
+    block = span_mask(0, length + buffer)
+    for start in schedule.slot_starts(day, length, booked):
+        if start >= earliest and (hours >> start) & duration == duration and not (booked >> start) & block:
+            yield start
+
+
+def _earliest_minute(day):
+    # Slots of today that already started are not offered
+    now = timezone.localtime()
+    return to_minutes(now) + 1 if day == now.date() else 0
+
+
+def available_slots(vet_id, day, service=None):
+    """Free start times ("HH:MM") of a vet on a day for a service; past times of today are left out"""
+    schedule = get_schedule(vet_id)
+    booked = booking_index.masks([vet_id], [day])[(vet_id, day)]
+    length, buffer = booking_length(service)
+    return [
+        format_minutes(start)
+        for start in free_slots(schedule, day, booked, length, _earliest_minute(day), buffer)
+    ]
+
+
+def search_availability(vet_ids, days, service=None):
+    """
+    Free slots of several vets over several days, for a service
+
+    Returns:
+        dict: {vet_id: {day: ["HH:MM", ...]}}, unknown vets left out
+    """
+    schedules = get_schedules(vet_ids)
+    masks = booking_index.masks(list(schedules), days)
+    length, buffer = booking_length(service)
+    return {
+        vet_id: {
+            day: [
+                format_minutes(start)
+                for start in free_slots(schedule, day, masks[(vet_id, day)], length, _earliest_minute(day), buffer)
+            ]
+            for day in days
+        }
+        for vet_id, schedule in schedules.items()
+    }
+
+
+def earliest_slot(vet_ids, days, service=None):
+    """
+    First free slot for a service with any of the vets, scanning the days in order
+
+    Returns:
+        tuple: (vet_id, day, "HH:MM"), or None when every slot is taken
+    """
+    schedules = get_schedules(vet_ids)
+    masks = booking_index.masks(list(schedules), days)
+    length, buffer = booking_length(service)
+    for day in sorted(days):
+        earliest = _earliest_minute(day)
+        best = None
+        for vet_id, schedule in schedules.items():
+            start = next(free_slots(schedule, day, masks[(vet_id, day)], length, earliest, buffer), None)
+            if start is not None and (best is None or start < best[0]):
+                best = (start, vet_id)
+        if best is not None:
+            return best[1], day, format_minutes(best[0])
+    return None
+
+
+OUTSIDE_HOURS_MESSAGE = 'Seçilen saat veterinerin çalışma saatleri dışında.'
+TAKEN_MESSAGE = 'Seçilen saat dolu, lütfen başka bir saat seçin.'
+
+
+def check_working_hours(vet_id, day, time, service=None):
+    """Raise SlotUnavailable unless a booking for the service starting at time is inside the vet's working hours"""
+    start = to_minutes(time)
+    end = start + booking_length(service)[0]
+    if end > MINUTES_PER_DAY or get_schedule(vet_id).mask(day) & span_mask(start, end) != span_mask(start, end):
+        raise SlotUnavailable(OUTSIDE_HOURS_MESSAGE, 'outside_hours', vet_id, day, time, service)
+
+
+def check_slot(vet_id, day, time, exclude=None, hold=None, service=None):
+    """
+    Raise SlotUnavailable unless a booking for the service starting at time fits
+
+    Args:
+        exclude: Appointment id to ignore, when an existing appointment is moved
+        hold: Token of a hold to ignore, the one being redeemed or replaced
+    """
+    check_working_hours(vet_id, day, time, service)
+    if booked_mask(vet_id, day, exclude=exclude, hold=hold) & booking_span(to_minutes(time), *booking_length(service)):
+        raise SlotUnavailable(TAKEN_MESSAGE, 'taken', vet_id, day, time, service)
+
+
+def _lock_veterinarian(vet_id):
+    # Bookings and holds of one vet run one after the other
+    list(Veterinarian.objects.select_for_update().filter(pk=vet_id).values_list('pk', flat=True))
+
+
+def reserve_slot(vet_id, day, time, save, exclude=None, hold=None, service=None):
+    """
+    Check that a slot is free and book it in one transaction
+
+    The vet's row is locked first, so concurrent bookings of the same vet
+    run one after the other and each sees the ones committed before it (on
+    SQLite, BEGIN IMMEDIATE serialises every writer instead). The partial
+    unique index of Appointment is the last line of defence.
+
+    Args:
+        save: Callable creating or updating the appointment, called under the lock
+        exclude: Appointment id to ignore, when an existing appointment is moved
+        hold: Token of the visitor's hold, deleted with the booking
+
+    Returns:
+        Whatever save() returns
+    """
+    try:
+        with transaction.atomic():
+            _lock_veterinarian(vet_id)
+            check_slot(vet_id, day, time, exclude=exclude, hold=hold, service=service)
+            result = save()
+            if hold:
+                SlotHold.objects.filter(token=hold).delete()
+            return result
+    except IntegrityError:
+        clashing = active_appointments().filter(veterinarian_id=vet_id, date=day, time=time)
+        if exclude is not None:
+            clashing = clashing.exclude(pk=exclude)
+        if clashing.exists():
+            raise SlotUnavailable(TAKEN_MESSAGE, 'taken', vet_id, day, time, service)
+        raise
+
+
+def hold_minutes():
+    return getattr(settings, 'SLOT_HOLD_MINUTES', 5)
+
+
+def hold_slot(vet_id, day, time, replace=None, service=None):
+    """
+    Hold a free slot for hold_minutes(), as long as the service takes
+
+    Args:
+        replace: Token of the visitor's previous hold, released in the same
+            transaction (and ignored when checking the slot)
+
+    Returns:
+        SlotHold
+    """
+    sweep_expired_holds()
+    with transaction.atomic():
+        _lock_veterinarian(vet_id)
+        check_slot(vet_id, day, time, hold=replace, service=service)
+        if replace:
+            SlotHold.objects.filter(token=replace).delete()
+        return SlotHold.objects.create(
+            veterinarian_id=vet_id, date=day, time=time, service=service,
+            expires_at=timezone.now() + timedelta(minutes=hold_minutes()),
+        )
+
+
+def release_hold(token):
+    """Give a held slot back; returns whether the hold existed"""
+    deleted, _ = SlotHold.objects.filter(token=token).delete()
+    return bool(deleted)
+
+
+def sweep_expired_holds(force=False):
+    """
+    Delete the expired holds, at most once per HOLD_SWEEP_SECONDS unless forced
+
+    Returns:
+        int: Number of holds deleted
+    """
+    if not force and not cache.add('petkey:holds:sweep', True, HOLD_SWEEP_SECONDS):
+        return 0
+    # One range delete on the expires_at index
+    deleted, _ = SlotHold.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+def alternative_slots(vet_id, day, time, limit=5, service=None):
+    """
+    Free slots to offer instead of a taken one
+
+    The same day's slots closest to the requested time, read from the
+    database since the index may not have caught up with the booking that
+    won; when the day is full, the first slots of the following week.
+
+    Returns:
+        list: [{'date': date, 'time': "HH:MM"}, ...]
+    """
+    schedule = get_schedule(vet_id)
+    length, buffer = booking_length(service)
+    wanted = to_minutes(time)
+    starts = sorted(
+        free_slots(schedule, day, booked_mask(vet_id, day), length, _earliest_minute(day), buffer),
+        key=lambda start: (abs(start - wanted), start),
+    )
+    if starts:
+        return [{'date': day, 'time': format_minutes(start)} for start in starts[:limit]]
+
+    days = [day + timedelta(days=offset) for offset in range(1, 8)]
+    alternatives = []
+    for next_day, slots in search_availability([vet_id], days, service).get(vet_id, {}).items():
+        alternatives.extend({'date': next_day, 'time': slot} for slot in slots[:limit - len(alternatives)])
+        if len(alternatives) >= limit:
+            break
+    return alternatives
+
+
+def working_hours(vet_id, day):
+    """The intervals of a day as ("HH:MM", "HH:MM") pairs"""
+    return [
+        (format_minutes(start), format_minutes(end) if end < MINUTES_PER_DAY else '24:00')
+        for start, end in get_schedule(vet_id).intervals(day)
+    ]
@@ -0,0 +1,220 @@
+"""
+Full-text search over blog posts
+
+Postgres: a generated, weighted tsvector column (api_blogpost.search_vector,
+turkish configuration) with a GIN index, created by migration 0027.
+
+SQLite: an FTS5 shadow table (api_blogpost_fts) keyed by the post id, kept in
+sync from the BlogPost signals rather than triggers, because SQLite table
+rebuilds in later migrations would silently drop triggers.
+
+Fields are weighted title (A) > excerpt (B) > tags (C) > content (D); content
+is indexed as its visible text, block elements separated by line breaks so
+that adjacent paragraphs don't merge into one word. SQLite searches return
+the SEARCH_MAX_RESULTS best matches. Other database vendors fall back to
+substring matching without ranking.
+"""
+import logging
+import re
+
+from django.db import DatabaseError, connection
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+from .content import plain_text
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PARAM = 'search'
+SNIPPET_START = '<mark>'
+SNIPPET_STOP = '</mark>'
+FTS_TABLE = 'api_blogpost_fts'
+# bm25() weights of the FTS5 columns, in table order
+FTS_WEIGHTS = (10.0, 4.0, 2.0, 1.0)
+# Matches ranked on SQLite; the rank is a CASE over the ids, so it is bounded
+SEARCH_MAX_RESULTS = 200
+
+WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    """Words of a user query, stripped of any search syntax"""
+    return WORD.findall(query or '')
+
+
+class PostgresBlogSearch:
+    """tsvector / GIN index search (see migration 0027)"""
+
+    def filter(self, queryset, query):
+        tsquery = "websearch_to_tsquery('turkish', %s)"
+        return (
+            queryset.extra(where=[f'api_blogpost.search_vector @@ {tsquery}'], params=[query])
+            .annotate(search_rank=RawSQL(f'ts_rank_cd(api_blogpost.search_vector, {tsquery}, 32)', [query]))
+        )
+
+    def snippets(self, ids, query):
+        if not ids:
+            return {}
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT id, ts_headline('turkish', regexp_replace(content, '<[^>]+>', ' ', 'g'), "
+                "websearch_to_tsquery('turkish', %s), "
+                "'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2') "
+                "FROM api_blogpost WHERE id = ANY(%s)",
+                [query, list(ids)]
+            )
+            return dict(cursor.fetchall())
+
+    def index(self, post):
+        """The generated column maintains itself"""
+
+    def remove(self, pk):
+        pass
+
+    def rebuild(self, posts):
+        return 0
+
+
+class SqliteBlogSearch:
+    """FTS5 shadow table search"""
+
+    def _match(self, query):
+        # Every word must match, as a prefix (no stemming in unicode61)
+        return ' '.join('"{}"*'.format(term.replace('"', '')) for term in search_terms(query))
+
+    def _ranked_ids(self, query):
+        match = self._match(query)
+        if not match:
+            return []
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s',
+                [match, SEARCH_MAX_RESULTS]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def filter(self, queryset, query):
+        ids = self._ranked_ids(query)
+        # bm25 is lower-is-better; turn the position into a descending rank
+        return queryset.filter(pk__in=ids).annotate(search_rank=Case(
+            *[When(pk=pk, then=Value(len(ids) - position)) for position, pk in enumerate(ids)],
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+
+    def snippets(self, ids, query):
+        match = self._match(query)
+        if not ids or not match:
+            return {}
+        placeholders = ', '.join(['%s'] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, snippet({FTS_TABLE}, 3, %s, %s, '…', 32) FROM {FTS_TABLE} "
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid IN ({placeholders})',
+                [SNIPPET_START, SNIPPET_STOP, match, *ids]
+            )
+            return dict(cursor.fetchall())
+
+    def index(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, excerpt, tags, content) VALUES (%s, %s, %s, %s, %s)',
+                [post.pk, post.title, post.excerpt, post.tags.replace(',', ' '), plain_text(post.content)]
+            )
+
+    def remove(self, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [pk])
+
+    def rebuild(self, posts):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        count = 0
+        for post in posts:
+            self.index(post)
+            count += 1
+        return count
+
+
+class SubstringBlogSearch:
+    """Unindexed fallback for other database vendors"""
+
+    def filter(self, queryset, query):
+        from django.db.models import Q
+        condition = Q()
+        for term in search_terms(query):
+            condition &= Q(title__icontains=term) | Q(excerpt__icontains=term) | Q(tags__icontains=term) | Q(content__icontains=term)
+        return queryset.filter(condition).annotate(search_rank=Value(0, output_field=IntegerField()))
+
+    def snippets(self, ids, query):
+        return {}
+
+    def index(self, post):
+        pass
+
+    def remove(self, pk):
+        pass
+
+    def rebuild(self, posts):
+        return 0
+
+
+BACKENDS = {
+    'postgresql': PostgresBlogSearch,
+    'sqlite': SqliteBlogSearch,
+}
+
+
+def get_blog_search():
+    """Search backend of the default database"""
+    return BACKENDS.get(connection.vendor, SubstringBlogSearch)()
+
+
+def index_blog_post(post):
+    try:
+        get_blog_search().index(post)
+    except DatabaseError as e:
+        logger.error(f'Could not index blog post {post.pk}: {str(e)}')
+
+
+def remove_blog_post(pk):
+    try:
+        get_blog_search().remove(pk)
+    except DatabaseError as e:
+        logger.error(f'Could not remove blog post {pk} from the search index: {str(e)}')
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    ?search= filter backend ranking blog posts by relevance
+
+    Results are ordered by rank unless ?ordering= is given. Place it after
+    OrderingFilter so that the rank ordering wins.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(SEARCH_PARAM, '').strip()
+        if not search_terms(query):
+            return queryset
+        queryset = get_blog_search().filter(queryset, query)
+        if not request.query_params.get('ordering'):
+            queryset = queryset.order_by('-search_rank', '-published_at')
+        return queryset
+
+
+class SearchSnippetMixin:
+    """List responses of a search carry a highlighted `snippet` per post"""
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        query = request.query_params.get(SEARCH_PARAM, '').strip()
+        if not search_terms(query):
+            return response
+        results = response.data['results'] if isinstance(response.data, dict) else response.data
+        snippets = get_blog_search().snippets([item['id'] for item in results], query)
+        for item in results:
+            item['snippet'] = snippets.get(item['id'], item.get('excerpt', ''))
+        return response
@@ -1,9 +1,14 @@
 from rest_framework import serializers
-from .models import Veterinarian, BlogPost, Appointment, ContactMessage, GalleryImage, PageContent, Service, AboutPage, ServicesPage, ContactPage, SEOSettings, GoogleReview, HomePage, SiteSettings
+from .models import Veterinarian, BlogPost, Appointment, SlotHold, ContactMessage, GalleryImage, PageContent, Service, AboutPage, ServicesPage, ContactPage, SEOSettings, GoogleReview, HomePage, SiteSettings
 from . import models
 import base64
 import uuid
+from functools import partial
 from django.core.files.base import ContentFile
+from django.db.models import Manager
+from .content import absolutize_media_urls, extract_inline_images
+from .scheduling import ACTIVE_STATUSES, SlotUnavailable, check_working_hours, hold_slot, reserve_slot
+from .view_counter import unique_reader_counts
 
 
 class VeterinarianSerializer(serializers.ModelSerializer):
@@ -33,16 +38,25 @@ class VeterinarianSerializer(serializers.ModelSerializer):
 class BlogPostSerializer(serializers.ModelSerializer):
     author_name = serializers.CharField(source="author.name", read_only=True)
     featured_image = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    tag_names = serializers.SlugRelatedField(source="normalized_tags", slug_field="name", many=True, read_only=True)
 
     class Meta:
         model = BlogPost
         fields = ["id", "author", "author_name", "title", "slug", "excerpt",
-                  "content", "featured_image", "category", "tags", "status",
-                  "views", "published_at", "created_at", "updated_at"]
-        read_only_fields = ["slug", "views", "created_at", "updated_at"]
+                  "content", "featured_image", "category", "tags", "tag_names", "status",
+                  "views", "word_count", "reading_time", "outline", "plain_excerpt", "content_hash",
+                  "published_at", "created_at", "updated_at"]
+        read_only_fields = ["slug", "views", "word_count", "reading_time", "outline", "plain_excerpt",
+                            "content_hash", "created_at", "updated_at"]
+
+    def process_content(self, validated_data):
+        """Store images pasted as data: URIs as media files instead of base64 inside the row"""
+        if validated_data.get('content'):
+            validated_data['content'], _ = extract_inline_images(validated_data['content'])
 
     def create(self, validated_data):
         featured_image_data = validated_data.pop('featured_image', None)
+        self.process_content(validated_data)
         blog_post = BlogPost.objects.create(**validated_data)
 
         if featured_image_data and featured_image_data.startswith('data:image'):
@@ -60,6 +74,7 @@ class BlogPostSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         featured_image_data = validated_data.pop('featured_image', None)
+        self.process_content(validated_data)
 
         # Update other fields
         for attr, value in validated_data.items():
@@ -87,17 +102,38 @@ class BlogPostSerializer(serializers.ModelSerializer):
             else:
                 # Fallback if no request in context
                 representation['featured_image'] = f'http://localhost:8000{instance.featured_image.url}' if instance.featured_image else None
+        if 'content' in representation:
+            representation['content'] = absolutize_media_urls(representation['content'], self.context.get('request'))
         return representation
 
 
+class ReaderCountsListSerializer(serializers.ListSerializer):
+    """Loads the unique reader counts of the whole page at once"""
+
+    def to_representation(self, data):
+        posts = list(data.all() if isinstance(data, Manager) else data)
+        self.child.reader_counts = unique_reader_counts([post.pk for post in posts])
+        return super().to_representation(posts)
+
+
 class BlogPostListSerializer(serializers.ModelSerializer):
     author_name = serializers.CharField(source="author.name", read_only=True)
+    unique_readers = serializers.SerializerMethodField()
+    tag_names = serializers.SlugRelatedField(source="normalized_tags", slug_field="name", many=True, read_only=True)
 
     class Meta:
         model = BlogPost
         fields = ["id", "author_name", "title", "slug", "excerpt",
-                  "featured_image", "category", "tags", "status",
-                  "views", "published_at", "created_at"]
+                  "featured_image", "category", "tags", "tag_names", "status",
+                  "views", "unique_readers", "word_count", "reading_time", "plain_excerpt",
+                  "published_at", "created_at"]
+        list_serializer_class = ReaderCountsListSerializer
+
+    def get_unique_readers(self, obj):
+        reader_counts = getattr(self, 'reader_counts', None)
+        if reader_counts is None or obj.pk not in reader_counts:
+            reader_counts = unique_reader_counts([obj.pk])
+        return reader_counts[obj.pk]
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
@@ -112,17 +148,101 @@ class BlogPostListSerializer(serializers.ModelSerializer):
         return representation
 
 
+class BlogPostCardSerializer(BlogPostListSerializer):
+    """
+    Post cards of the page bundles, without the view counters
+
+    The bundles are cached on the BlogPost version, which a view counter
+    flush does not bump, so the counts would go stale in them.
+    """
+    unique_readers = None
+
+    class Meta(BlogPostListSerializer.Meta):
+        fields = [field for field in BlogPostListSerializer.Meta.fields if field not in ("views", "unique_readers")]
+        list_serializer_class = serializers.ListSerializer
+
+
 class AppointmentSerializer(serializers.ModelSerializer):
     veterinarian_name = serializers.CharField(source="veterinarian.name", read_only=True)
+    service_title = serializers.CharField(source="service.title", read_only=True, default=None)
+    # Token of the visitor's slot hold, redeemed by the booking
+    hold_token = serializers.CharField(write_only=True, required=False, allow_blank=True)
     
     class Meta:
         model = Appointment
         fields = ["id", "veterinarian", "veterinarian_name", "pet_name", "pet_type", 
                   "pet_breed", "pet_age", "owner_name", "owner_email", "owner_phone", 
-                  "date", "time", "service", "notes", "status", "admin_notes", 
-                  "created_at", "updated_at"]
+                  "date", "time", "service", "service_title", "notes", "status", "admin_notes", 
+                  "hold_token", "created_at", "updated_at"]
         read_only_fields = ["created_at", "updated_at"]
 
+    def validate(self, attrs):
+        """
+        New and moved appointments must fit the vet's working hours, for as
+        long as their service takes
+
+        Whether the slot is still free is checked when saving, under a lock
+        (see reserve_slot); a taken slot raises SlotUnavailable, which the
+        view answers with 409 Conflict. The visitor's own hold does not count.
+        """
+        attrs = super().validate(attrs)
+        hold = attrs.pop("hold_token", "") or None
+        instance = self.instance
+        values = {
+            field: attrs.get(field, getattr(instance, field, None))
+            for field in ("veterinarian", "date", "time", "service", "status")
+        }
+        values["status"] = values["status"] or Appointment._meta.get_field("status").default
+        # A longer service may not fit where the old one did
+        moved = instance is None or instance.status not in ACTIVE_STATUSES or any(
+            field in attrs and attrs[field] != getattr(instance, field)
+            for field in ("veterinarian", "date", "time", "service")
+        )
+        self._slot = None
+        if moved and values["status"] in ACTIVE_STATUSES and values["veterinarian"] and values["date"] and values["time"]:
+            try:
+                check_working_hours(values["veterinarian"].pk, values["date"], values["time"], values["service"])
+            except SlotUnavailable as e:
+                raise serializers.ValidationError({"time": [str(e)]}, code=e.code)
+            self._slot = (
+                values["veterinarian"].pk, values["date"], values["time"], getattr(instance, "pk", None), hold, values["service"],
+            )
+        return attrs
+
+    def create(self, validated_data):
+        slot = getattr(self, "_slot", None)
+        if slot is None:
+            return super().create(validated_data)
+        vet_id, day, time, exclude, hold, service = slot
+        return reserve_slot(
+            vet_id, day, time, partial(super().create, validated_data), exclude=exclude, hold=hold, service=service
+        )
+
+    def update(self, instance, validated_data):
+        slot = getattr(self, "_slot", None)
+        if slot is None:
+            return super().update(instance, validated_data)
+        vet_id, day, time, exclude, hold, service = slot
+        return reserve_slot(
+            vet_id, day, time, partial(super().update, instance, validated_data), exclude=exclude, hold=hold, service=service
+        )
+
+
+class SlotHoldSerializer(serializers.ModelSerializer):
+    # Token of the visitor's previous hold, released when they pick another slot
+    replace = serializers.CharField(write_only=True, required=False, allow_blank=True)
+
+    class Meta:
+        model = SlotHold
+        fields = ["token", "veterinarian", "date", "time", "service", "expires_at", "replace"]
+        read_only_fields = ["token", "expires_at"]
+
+    def create(self, validated_data):
+        return hold_slot(
+            validated_data["veterinarian"].pk, validated_data["date"], validated_data["time"],
+            replace=validated_data.get("replace") or None, service=validated_data.get("service"),
+        )
+
 
 class ContactMessageSerializer(serializers.ModelSerializer):
     class Meta:
@@ -153,7 +273,7 @@ class PageContentSerializer(serializers.ModelSerializer):
 class ServiceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Service
-        fields = ["id", "slug", "icon", "title", "short_description", "is_active", "order", "meta_title", "meta_description", "meta_keywords", "og_image", "created_at", "updated_at"]
+        fields = ["id", "slug", "icon", "title", "short_description", "is_active", "order", "duration_minutes", "buffer_minutes", "meta_title", "meta_description", "meta_keywords", "og_image", "created_at", "updated_at"]
         read_only_fields = ["created_at", "updated_at"]
 
 
@@ -0,0 +1,133 @@
+"""
+Model signal handlers keeping the shared caches in sync with the database
+"""
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache_utils import bump_model_version, missing_blog_slugs
+from .feeds import BLOG_FEED
+from .invalidation import invalidation_bus
+from .related import INDEXED_FIELDS, refresh_related_posts
+from .scheduling import BOOKING_LENGTHS, booking_index, invalidate_schedule
+from .search import index_blog_post, remove_blog_post
+from .models import Appointment, BlogPost, Service, SlotHold, Tag, Veterinarian
+
+
+def publish_purge(sender, instance, **kwargs):
+    invalidation_bus.publish(instance)
+
+
+# Every model declaring cache_paths/surrogate_keys feeds the invalidation bus
+for model in apps.get_app_config('api').get_models():
+    if hasattr(model, 'cache_paths') or hasattr(model, 'surrogate_keys'):
+        post_save.connect(publish_purge, sender=model, dispatch_uid=f'purge_{model.__name__}')
+        post_delete.connect(publish_purge, sender=model, dispatch_uid=f'purge_delete_{model.__name__}')
+
+
+@receiver(post_save, sender=BlogPost)
+def clear_missing_blog_slug(sender, instance, **kwargs):
+    """A post now exists under this slug, forget the cached 404"""
+    transaction.on_commit(lambda: missing_blog_slugs.clear(instance.slug))
+
+
+@receiver(post_save, sender=BlogPost)
+def update_search_index(sender, instance, **kwargs):
+    """Keep the SQLite FTS5 table in sync (Postgres maintains its generated column)"""
+    transaction.on_commit(lambda: index_blog_post(instance))
+
+
+@receiver(post_delete, sender=BlogPost)
+def remove_from_search_index(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: remove_blog_post(pk))
+
+
+@receiver(post_save, sender=BlogPost)
+def sync_blog_post_tags(sender, instance, raw=False, **kwargs):
+    """Mirror the comma separated tags into the Tag index"""
+    if not raw:
+        instance.sync_tags()
+
+
+@receiver(pre_delete, sender=BlogPost)
+def remember_blog_post_tags(sender, instance, **kwargs):
+    instance._tag_ids = list(instance.normalized_tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=BlogPost)
+def refresh_deleted_post_tag_counts(sender, instance, **kwargs):
+    Tag.refresh_counts(getattr(instance, '_tag_ids', []))
+
+
+@receiver(post_save, sender=BlogPost)
+def update_related_posts(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Refresh the precomputed related posts when an indexed field may have changed"""
+    if raw or (update_fields is not None and not INDEXED_FIELDS & set(update_fields)):
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda: refresh_related_posts(pk))
+
+
+@receiver(pre_delete, sender=BlogPost)
+def remember_related_referrers(sender, instance, **kwargs):
+    # The cascade removes their rows, so the lists to refill are collected first
+    instance._related_referrers = list(instance.incoming_related_links.values_list('post_id', flat=True))
+
+
+@receiver(post_delete, sender=BlogPost)
+def refresh_related_after_delete(sender, instance, **kwargs):
+    pk, referrers = instance.pk, getattr(instance, '_related_referrers', [])
+    transaction.on_commit(lambda: refresh_related_posts(pk, referrers))
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+@receiver(post_save, sender=Veterinarian)
+def refresh_blog_feeds(sender, instance, **kwargs):
+    """Feeds only change on edits (not on view counter flushes), see feeds.py"""
+    transaction.on_commit(lambda: bump_model_version(BLOG_FEED))
+
+
+@receiver(post_save, sender=Veterinarian)
+@receiver(post_delete, sender=Veterinarian)
+def refresh_working_hours(sender, instance, **kwargs):
+    """Drop the parsed schedule, the hours may have changed"""
+    pk = instance.pk
+    transaction.on_commit(lambda: invalidate_schedule(pk))
+
+
+@receiver(post_init, sender=Appointment)
+def remember_booking_day(sender, instance, **kwargs):
+    # A move empties the day it was loaded with, not only the one it is saved to
+    instance._booking_day = (instance.veterinarian_id, instance.date)
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+@receiver(post_save, sender=SlotHold)
+@receiver(post_delete, sender=SlotHold)
+def refresh_booking_index(sender, instance, **kwargs):
+    """Reload the booked-minute bitmaps of the (vet, day) pairs the appointment or hold touched"""
+    pairs = {getattr(instance, '_booking_day', (None, None)), (instance.veterinarian_id, instance.date)}
+    for vet_id, day in pairs:
+        if vet_id is not None and day is not None:
+            transaction.on_commit(lambda vet_id=vet_id, day=day: booking_index.refresh(vet_id, day))
+    instance._booking_day = (instance.veterinarian_id, instance.date)
+
+
+@receiver(post_init, sender=Service)
+def remember_booking_length(sender, instance, **kwargs):
+    # Read from __dict__, a deferred field must not cost a query per instance
+    instance._booking_length = (instance.__dict__.get('duration_minutes'), instance.__dict__.get('buffer_minutes'))
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def refresh_booking_lengths(sender, instance, signal, **kwargs):
+    """The booked bitmaps were computed with the old duration and buffer, index every day anew"""
+    length = (instance.duration_minutes, instance.buffer_minutes)
+    if signal is post_delete or instance._booking_length != length:
+        transaction.on_commit(lambda: bump_model_version(BOOKING_LENGTHS))
+    instance._booking_length = length
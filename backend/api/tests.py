@@ -1,3 +1,1102 @@
-from django.test import TestCase
+import base64
+import hashlib
+import tempfile
+import threading
+import time as clock
+from datetime import date, time, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, InterfaceError, OperationalError, connection, transaction
+from django.http import JsonResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from petkey_api.middleware import DegradedModeMiddleware
+
+from .cache_utils import (
+    StatsCounter, bump_model_version, get_model_version, missing_blog_slugs, single_flight, singleton_cache,
+)
+from .content import extract_inline_images
+from .degraded import LastGoodStore
+from .facets import blog_facets
+from .hyperloglog import HyperLogLog
+from .invalidation import PurgeEvent, invalidation_bus
+from .models import (
+    AboutPage, Appointment, BlogPost, BlogPostDailyViews, BlogPostReaderSketch, BlogPostRelated, GoogleReview, Service,
+    SlotHold, Tag, Veterinarian, turkish_lower,
+)
+from .related import RelatedRefresher, related_posts
+from .scheduling import WeeklySchedule, earliest_slot, free_slots, parse_hours, search_availability, span_mask
+from .search import PostgresBlogSearch
+from .trending import SECONDS_PER_DAY, TrendingTracker
+from .view_counter import BLOG_VIEWS, ViewCounter, blog_view_counter, unique_reader_counts
+from .views import active_services_cache
+
+DAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+# Tests clear the cache; keep them off the file cache and the last-known-good store of the dev server,
+# and refresh related posts inline so that nothing is left queued for a later thread
+local_caches = override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    DEGRADED_MODE_PATHS=[],
+    RELATED_POSTS_REFRESH_DELAY=0,
+)
+
+
+@local_caches
+class SingletonCacheTests(TestCase):
+    """Singleton pages are loaded once per version stamp"""
+
+    def setUp(self):
+        cache.clear()
+        singleton_cache.clear()
+
+    def test_reads_skip_database_until_save(self):
+        AboutPage.get_instance()
+        with self.assertNumQueries(0):
+            page = AboutPage.get_instance()
+
+        page.hero_subtitle = "Yeni alt başlık"
+        # Every read returns a private copy
+        self.assertNotEqual(AboutPage.get_instance().hero_subtitle, "Yeni alt başlık")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            page.save()
+        self.assertEqual(AboutPage.get_instance().hero_subtitle, "Yeni alt başlık")
+
+    def test_other_worker_reloads_after_stamp_bump(self):
+        AboutPage.get_instance()
+        AboutPage.objects.filter(pk=1).update(hero_subtitle="Başka işçi")
+        self.assertNotEqual(AboutPage.get_instance().hero_subtitle, "Başka işçi")
+
+        # A save in another worker only reaches this one through the shared stamp
+        bump_model_version(AboutPage)
+        self.assertEqual(AboutPage.get_instance().hero_subtitle, "Başka işçi")
+
+
+@local_caches
+class ConditionalGetTests(TestCase):
+    """Public collections answer revalidations with 304 until they change"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.service = Service.objects.create(slug="asi", title="Aşı", short_description="")
+
+    def test_unchanged_collection_is_not_modified(self):
+        response = self.client.get("/api/services/active/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get("/api/services/active/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_edit_changes_etag(self):
+        etag = self.client.get("/api/services/active/")["ETag"]
+        self.service.title = "Aşılama"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.save()
+
+        response = self.client.get("/api/services/active/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data[0]["title"], "Aşılama")
+
+
+@local_caches
+class CachePolicyTests(TestCase):
+    """Cache-Control and Vary headers of each policy"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        vet = Veterinarian.objects.create(name="Dr. Test", specialty="Genel")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post = BlogPost.objects.create(
+                title="Aşı", slug="asi", tags="kedi", content="<p>Aşı</p>", author=vet, status="published"
+            )
+        self.addCleanup(blog_view_counter.clear)
+
+    def get(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        directives = {directive.strip() for directive in response["Cache-Control"].split(",")}
+        vary = {header.strip() for header in response.get("Vary", "").split(",")}
+        return response, directives, vary
+
+    def test_public_content_is_revalidated_by_browsers_and_cached_at_the_edge(self):
+        _, directives, vary = self.get("/api/about-page/")
+        self.assertLessEqual({"public", "no-cache", "s-maxage=300", "stale-while-revalidate=60"}, directives)
+        self.assertNotIn("Cookie", vary)
+
+    def test_public_namespace_is_cached_everywhere(self):
+        response, directives, vary = self.get("/api/public/blog/")
+        self.assertLessEqual({"public", "max-age=60", "s-maxage=600", "stale-if-error=86400"}, directives)
+        self.assertNotIn("Cookie", vary)
+        self.assertIn("ETag", response)
+        self.assertEqual(response["Surrogate-Key"], "blog")
+
+    def test_public_post_detail_reaches_the_origin_on_every_read(self):
+        response, directives, vary = self.get("/api/public/blog/asi/")
+        self.assertEqual({"public", "no-cache"}, directives)
+        self.assertNotIn("Cookie", vary)
+        self.assertNotIn("ETag", response)
+        self.assertEqual(blog_view_counter.pending(self.post.pk), 1)
+        self.assertEqual(self.get("/api/public/blog/asi/related/")[0].data, [])
+
+    def test_session_dependent_reads_are_private(self):
+        _, directives, vary = self.get("/api/blog/")
+        self.assertLessEqual({"private", "no-cache"}, directives)
+        self.assertIn("Cookie", vary)
+
+    def test_personal_data_is_never_stored(self):
+        _, directives, _ = self.get("/api/appointments/")
+        self.assertLessEqual({"private", "no-store"}, directives)
+
+
+@local_caches
+class SingleFlightTests(SimpleTestCase):
+    """One rebuild per key, early refresh before expiry, stale payloads during rebuilds"""
+
+    def setUp(self):
+        cache.clear()
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return {"build": self.builds}
+
+    def test_builds_once_per_version(self):
+        self.assertEqual(single_flight("test:key", self.build, "v1"), {"build": 1})
+        self.assertEqual(single_flight("test:key", self.build, "v1"), {"build": 1})
+        self.assertEqual(single_flight("test:key", self.build, "v2"), {"build": 2})
+        self.assertEqual(self.builds, 2)
+
+    def test_concurrent_misses_build_once(self):
+        def slow_build():
+            clock.sleep(0.2)
+            return self.build()
+
+        results = []
+        barrier = threading.Barrier(5)
+
+        def fetch():
+            barrier.wait()
+            results.append(single_flight("test:key", slow_build, "v1"))
+
+        workers = [threading.Thread(target=fetch) for _ in range(5)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(results, [{"build": 1}] * 5)
+
+    def test_early_refresh_near_expiry(self):
+        # Built in 10 s, expiring in 5 s
+        entry = {"value": "old", "version": "v1", "delta": 10.0, "expires": clock.time() + 5}
+        cache.set("test:key", entry)
+        with mock.patch("api.cache_utils.random.random", return_value=0.0):
+            self.assertEqual(single_flight("test:key", self.build, "v1"), "old")
+        with mock.patch("api.cache_utils.random.random", return_value=0.999):
+            # delta * -log(0.001) is about 69 s, well past the expiry
+            self.assertEqual(single_flight("test:key", self.build, "v1"), {"build": 1})
+
+    def test_stale_payload_while_another_worker_rebuilds(self):
+        cache.set("test:key", {"value": "stale", "version": "v1", "delta": 0.0, "expires": clock.time() + 60})
+        cache.add("test:key:lock", 1)
+        self.assertEqual(single_flight("test:key", self.build, "v2"), "stale")
+        self.assertEqual(self.builds, 0)
+
+    def test_builds_itself_when_the_rebuild_stalls(self):
+        cache.add("test:key:lock", 1)
+        self.assertEqual(single_flight("test:key", self.build, "v1", wait=0.1), {"build": 1})
+
+
+@local_caches
+class CollectionCacheTests(TestCase):
+    """Collections are rebuilt only when one of their models changes"""
+
+    def setUp(self):
+        cache.clear()
+        active_services_cache.reset_stats()
+        self.client = APIClient()
+        self.service = Service.objects.create(slug="asi", title="Aşı", short_description="")
+
+    def test_hits_until_a_model_of_the_collection_changes(self):
+        self.client.get("/api/services/active/")
+        # Only the ETag aggregate, the payload comes from the cache
+        with self.assertNumQueries(1):
+            self.client.get("/api/services/active/")
+        # Another model's stamp leaves the collection alone
+        bump_model_version(GoogleReview)
+        self.client.get("/api/services/active/")
+        self.assertEqual(active_services_cache.stats(), {"hits": 2, "misses": 1, "hit_ratio": 0.667})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(slug="kisirlastirma", title="Kısırlaştırma", short_description="")
+        response = self.client.get("/api/services/active/")
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(active_services_cache.stats()["misses"], 2)
+
+    def test_counts_reach_the_shared_cache_in_batches(self):
+        counter = StatsCounter("petkey:stats:test", interval=60)
+        for _ in range(3):
+            counter.incr("hits")
+        self.assertIsNone(cache.get("petkey:stats:test:hits"))
+        self.assertEqual(counter.get("hits"), 3)
+
+        counter.flush()
+        counter.incr("hits")
+        # Another process only sees the flushed counts
+        self.assertEqual(StatsCounter("petkey:stats:test").get("hits"), 3)
+        self.assertEqual(counter.get("hits"), 4)
+
+
+@local_caches
+class NegativeCacheTests(TestCase):
+    """Unknown blog slugs are answered from the cache until a post takes the slug"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.vet = Veterinarian.objects.create(name="Dr. Test", specialty="Genel")
+        # The read below is buffered by the shared counter; drop it with the test
+        self.addCleanup(blog_view_counter.clear)
+
+    def test_missing_slug_is_remembered_until_created(self):
+        self.assertEqual(self.client.get("/api/blog/yeni-yazi/").status_code, 404)
+        self.assertTrue(missing_blog_slugs.is_missing("yeni-yazi"))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/blog/yeni-yazi/").status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BlogPost.objects.create(
+                title="Yeni Yazı", slug="yeni-yazi", excerpt="", content="<p>Merhaba</p>", author=self.vet, status="published"
+            )
+        self.assertEqual(self.client.get("/api/blog/yeni-yazi/").status_code, 200)
+
+
+@override_settings(DEGRADED_MODE_PATHS=[r"^/api/blog/"], DEGRADED_MODE_QUERY_PARAMS=["category"])
+class DegradedModeTests(TestCase):
+    """Last-known-good payloads while the database connection is lost"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = LastGoodStore(f"{directory.name}/last_good.sqlite3", max_entries=2)
+        patcher = mock.patch("petkey_api.middleware.last_good_store", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.middleware = DegradedModeMiddleware(lambda request: JsonResponse({"path": request.get_full_path()}))
+        self.factory = RequestFactory()
+        connection.ensure_connection()
+
+    def stored_keys(self):
+        return [row[0] for row in self.store._connection().execute("SELECT key FROM last_good ORDER BY stored_at")]
+
+    def test_store_is_keyed_by_canonical_path_and_bounded(self):
+        for query in ("?category=Aşı", "?search=kedi", "?_=1", "?category=Kedi", ""):
+            self.middleware(self.factory.get(f"/api/blog/{query}"))
+        self.assertEqual(self.stored_keys(), ["/api/blog/?category=Kedi", "/api/blog/"])
+        self.assertEqual(len(self.store._digests), 2)
+
+    def test_only_lost_connections_open_the_breaker(self):
+        self.middleware(self.factory.get("/api/blog/"))
+        locked = OperationalError("database is locked")
+        self.assertIsNone(self.middleware.process_exception(self.factory.post("/api/auth/login/"), locked))
+        response = self.middleware.process_exception(self.factory.get("/api/blog/"), locked)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Warning", response)
+        self.assertEqual(self.middleware.degraded_until, 0)
+
+        with self.assertLogs("petkey_api.middleware", level="ERROR"):
+            self.middleware.process_exception(self.factory.get("/api/blog/"), InterfaceError("connection already closed"))
+        self.assertGreater(self.middleware.degraded_until, 0)
+        # Public reads come from the store, everything else still reaches its view
+        self.assertIn("Warning", self.middleware(self.factory.get("/api/blog/")))
+        self.assertNotIn("Warning", self.middleware(self.factory.post("/api/auth/login/")))
+
+
+class RecordingPurger:
+    def __init__(self):
+        self.events = []
+
+    def purge(self, event):
+        self.events.append(event)
+
+
+@local_caches
+class InvalidationBusTests(TestCase):
+    """Model changes reach the purgers as one coalesced wave per batch"""
+
+    def setUp(self):
+        cache.clear()
+        self.purger = RecordingPurger()
+        patcher = mock.patch.object(invalidation_bus, "_purgers", [self.purger])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batch_sends_one_wave(self):
+        with self.captureOnCommitCallbacks(execute=True), invalidation_bus.batch():
+            for slug in ("asi", "kuduz", "karma"):
+                Service.objects.create(slug=slug, title=slug, short_description="")
+        self.assertEqual(len(self.purger.events), 1)
+        event = self.purger.events[0]
+        self.assertEqual(event.models, {Service})
+        self.assertLessEqual({"/api/services/active/", "/api/public/services/kuduz/"}, event.paths)
+        self.assertEqual(event.keys, {"services"})
+
+    def test_transaction_is_the_batch(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(slug="asi", title="Aşı", short_description="")
+            Service.objects.create(slug="kuduz", title="Kuduz", short_description="")
+        self.assertEqual(len(self.purger.events), 1)
+
+    def test_rolled_back_changes_are_not_purged(self):
+        with self.assertRaises(ValueError), transaction.atomic():
+            Service.objects.create(slug="asi", title="Aşı", short_description="")
+            raise ValueError
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(slug="kuduz", title="Kuduz", short_description="")
+        self.assertEqual(len(self.purger.events), 1)
+        self.assertIn("/api/public/services/kuduz/", self.purger.events[0].paths)
+        self.assertNotIn("/api/public/services/asi/", self.purger.events[0].paths)
+
+    def test_unformattable_template_is_kept_verbatim(self):
+        # The author row is gone, e.g. a post deleted together with its author
+        post = BlogPost(slug="yetim", author_id=0)
+        with self.assertLogs("api.invalidation", level="WARNING"):
+            path = PurgeEvent._format("/api/page-bundle/vet/{obj.author.slug}/", post)
+        self.assertEqual(path, "/api/page-bundle/vet/{obj.author.slug}/")
+
+
+@local_caches
+class WarmCacheTests(TestCase):
+    """warm_cache fetches the public endpoints in-process after a deploy"""
+
+    def setUp(self):
+        cache.clear()
+        active_services_cache.reset_stats()
+        self.addCleanup(blog_view_counter.clear)
+        with self.captureOnCommitCallbacks(execute=True):
+            vet = Veterinarian.objects.create(name="Dr. Test", slug="dr-test", specialty="Genel")
+            Service.objects.create(slug="asi", title="Aşı", short_description="")
+            self.post = BlogPost.objects.create(title="Aşı", slug="asi", content="", author=vet, status="published")
+
+    def warm(self, **options):
+        output = StringIO()
+        # In the test's own thread and connection, which sees the uncommitted rows
+        call_command("warm_cache", host="testserver", concurrency=1, stdout=output, **options)
+        lines = output.getvalue().splitlines()
+        return {line.split()[-1]: line.split()[0] for line in lines if line.startswith("  ")}
+
+    def test_quick_run_fills_the_collection_caches(self):
+        warmed = self.warm(quick=True)
+        self.assertLessEqual({"/api/services/active/", "/api/public/blog/", "/api/bootstrap/", "/api/sitemap.xml"}, set(warmed))
+        self.assertEqual(set(warmed.values()), {"200"})
+        self.assertNotIn("/api/public/services/asi/", warmed)
+        self.assertEqual(active_services_cache.stats()["misses"], 1)
+
+        APIClient().get("/api/services/active/")
+        self.assertEqual(active_services_cache.stats()["hits"], 1)
+
+    def test_full_run_warms_detail_pages_without_counting_views(self):
+        warmed = self.warm()
+        self.assertLessEqual({
+            "/api/public/services/asi/", "/api/page-bundle/service/asi/", "/api/page-bundle/vet/dr-test/",
+            "/api/public/blog/asi/related/",
+        }, set(warmed))
+        self.assertNotIn("/api/public/blog/asi/", warmed)
+        self.assertEqual(blog_view_counter.pending(self.post.pk), 0)
+
+
+@local_caches
+class BootstrapTests(TestCase):
+    """The layout shell payload is one snapshot, revalidated from the version stamps"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service = Service.objects.create(slug="asi", title="Aşı", short_description="")
+            Service.objects.create(slug="eski", title="Eski", short_description="", is_active=False)
+
+    def test_payload_combines_the_shell_requests(self):
+        response = self.client.get("/api/bootstrap/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {"site_settings", "services", "seo"})
+        self.assertEqual([service["slug"] for service in response.data["services"]], ["asi"])
+        self.assertEqual(response["Surrogate-Key"], "site-settings services seo")
+
+    def test_revalidation_is_not_modified_without_queries(self):
+        etag = self.client.get("/api/bootstrap/")["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/bootstrap/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_service_edit_changes_etag(self):
+        etag = self.client.get("/api/bootstrap/")["ETag"]
+        self.service.title = "Aşılama"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.save()
+
+        response = self.client.get("/api/bootstrap/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data["services"][0]["title"], "Aşılama")
+
+
+@local_caches
+class PageBundleTests(TestCase):
+    """Route bundles are cached as one unit, unknown slugs included"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_unknown_vet_is_cached_until_created(self):
+        self.assertEqual(self.client.get("/api/page-bundle/vet/dr-yeni/").status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/page-bundle/vet/dr-yeni/").status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Veterinarian.objects.create(name="Dr. Yeni", slug="dr-yeni", specialty="Genel")
+        response = self.client.get("/api/page-bundle/vet/dr-yeni/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["veterinarian"]["slug"], "dr-yeni")
+        self.assertEqual(response.data["blog_posts"], [])
+
+
+@local_caches
+class ViewCounterTests(TestCase):
+    """Buffered views are written in batches without touching the BlogPost stamp"""
+
+    def setUp(self):
+        cache.clear()
+        vet = Veterinarian.objects.create(name="Dr. Test", specialty="Genel")
+        self.post = BlogPost.objects.create(title="Aşı", slug="asi", content="", author=vet, status="published")
+        self.counter = ViewCounter(
+            BlogPost, sketch_model=BlogPostReaderSketch, rollup_model=BlogPostDailyViews, trending=TrendingTracker("test")
+        )
+        patcher = mock.patch.object(self.counter, "_ensure_flusher")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_flush_writes_counts_rollups_and_readers(self):
+        for reader in ("okur-1", "okur-2", "okur-1"):
+            self.counter.record(self.post.pk, fingerprint=reader)
+        self.assertEqual(self.counter.pending(self.post.pk), 3)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 0)
+
+        blog_version, views_version = get_model_version(BlogPost), get_model_version(BLOG_VIEWS)
+        self.assertEqual(self.counter.flush(), 3)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 3)
+        self.assertEqual(BlogPostDailyViews.objects.get(post=self.post, date=timezone.localdate()).views, 3)
+        self.assertEqual(unique_reader_counts([self.post.pk])[self.post.pk]["day"], 2)
+        # Only the view-ranked payloads are invalidated
+        self.assertEqual(get_model_version(BlogPost), blog_version)
+        self.assertNotEqual(get_model_version(BLOG_VIEWS), views_version)
+
+    def test_counts_of_deleted_posts_are_dropped(self):
+        self.counter.record(self.post.pk)
+        self.post.delete()
+        self.assertEqual(self.counter.flush(), 0)
+        self.assertEqual(self.counter.pending(self.post.pk), 0)
+
+    def test_reader_counts_revalidate_the_lists(self):
+        client = APIClient()
+        for path in ("/api/blog/", "/api/public/blog/"):
+            response = client.get(path)
+            self.assertNotIn("Last-Modified", response)
+            # A flush that only adds unique readers leaves every row as it was
+            bump_model_version(BLOG_VIEWS)
+            self.assertEqual(client.get(path, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200)
+
+
+class HyperLogLogTests(SimpleTestCase):
+    """Distinct counts within the sketch's error, mergeable without double counting"""
+
+    def sketch(self, values):
+        sketch = HyperLogLog()
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    def assertClose(self, estimate, exact, tolerance):
+        self.assertLessEqual(abs(estimate - exact), exact * tolerance, f"{estimate} vs {exact}")
+
+    def test_count_accuracy(self):
+        # Standard error is 1.04 / sqrt(2048), about 2.3%
+        for exact in (100, 1000, 50000):
+            self.assertClose(self.sketch(f"okur-{i}" for i in range(exact)).count(), exact, 0.07)
+
+    def test_repeated_values_count_once(self):
+        sketch = self.sketch(f"okur-{i % 500}" for i in range(20000))
+        self.assertClose(sketch.count(), 500, 0.05)
+
+    def test_merge_counts_the_union(self):
+        monday = self.sketch(f"okur-{i}" for i in range(0, 6000))
+        tuesday = self.sketch(f"okur-{i}" for i in range(4000, 10000))
+        self.assertClose(monday.merge(tuesday).count(), 10000, 0.07)
+
+    def test_bytes_round_trip(self):
+        sketch = self.sketch(f"okur-{i}" for i in range(300))
+        restored = HyperLogLog.from_bytes(sketch.to_bytes())
+        self.assertEqual(restored.precision, sketch.precision)
+        self.assertEqual(restored.count(), sketch.count())
+        with self.assertRaises(ValueError):
+            sketch.merge(HyperLogLog(precision=10))
+
+
+@local_caches
+class TrendingTests(TestCase):
+    """Exponentially decayed view scores and the top-K table"""
+
+    def setUp(self):
+        cache.clear()
+        self.vet = Veterinarian.objects.create(name="Dr. Test", specialty="Genel")
+
+    def post(self, slug):
+        return BlogPost.objects.create(title=slug, slug=slug, content="", author=self.vet, status="published")
+
+    def test_recent_views_outweigh_older_ones(self):
+        tracker = TrendingTracker("test", size=2, half_life_days=0.25)
+        t0 = tracker.rebuild()["t0"]
+        tracker.add({1: 8}, timestamp=t0)
+        tracker.add({3: 1}, timestamp=t0)
+        # Two half lives later 3 views weigh 12
+        tracker.add({2: 3}, timestamp=t0 + SECONDS_PER_DAY / 2)
+        self.assertEqual(tracker.top(), [2, 1])
+        self.assertEqual(tracker.top(limit=3), [2, 1, 3])
+
+    def test_table_keeps_spare_candidates_only(self):
+        tracker = TrendingTracker("test", size=2)
+        t0 = tracker.rebuild()["t0"]
+        tracker.add({pk: pk for pk in range(1, 21)}, timestamp=t0)
+        self.assertEqual(len(cache.get(tracker.key)["scores"]), tracker.capacity)
+        self.assertEqual(tracker.top(), [20, 19])
+
+    def test_rebuild_decays_daily_rollups(self):
+        old, fresh, draft = self.post("eski"), self.post("yeni"), self.post("taslak")
+        draft.status = "draft"
+        draft.save()
+        today = timezone.localdate()
+        BlogPostDailyViews.objects.create(post=old, date=today - timedelta(days=10), views=100)
+        BlogPostDailyViews.objects.create(post=fresh, date=today, views=20)
+        BlogPostDailyViews.objects.create(post=draft, date=today, views=500)
+        # 100 views ten days ago decay to about 10 with a 3 day half life
+        self.assertEqual(TrendingTracker("test", half_life_days=3).top(), [fresh.pk, old.pk])
+
+    def test_endpoint_limit_is_clamped(self):
+        today = timezone.localdate()
+        for views, slug in enumerate(("bir", "iki", "uc"), start=1):
+            BlogPostDailyViews.objects.create(post=self.post(slug), date=today, views=views)
+        client = APIClient()
+        for limit, expected in (("-1", ["uc"]), ("0", ["uc"]), ("2", ["uc", "iki"]), ("x", ["uc", "iki", "bir"])):
+            response = client.get("/api/blog/trending/", {"limit": limit})
+            self.assertEqual([item["slug"] for item in response.data], expected, limit)
+
+
+@local_caches
+class BlogSearchTests(TestCase):
+    """Ranked full-text search with highlighted snippets"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        vet = Veterinarian.objects.create(name="Dr. Test", specialty="Genel")
+        posts = [
+            ("tuy-bakimi", "Tüy bakımı", "<h2>Giriş</h2><p>Kedi tüyleri haftada bir taranır.</p>"),
+            ("kedi-asilari", "Kedi aşıları", "<p>Karma aşı yılda bir yapılır.</p>"),
+            ("kopek-egitimi", "Köpek eğitimi", "<p>Tasma eğitimi sabır ister.</p>"),
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            for slug, title, content in posts:
+                BlogPost.objects.create(title=title, slug=slug, content=content, author=vet, status="published")
+
+    def search(self, query):
+        data = self.client.get("/api/blog/", {"search": query}).data
+        return data["results"] if isinstance(data, dict) else data
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual([item["slug"] for item in self.search("kedi")], ["kedi-asilari", "tuy-bakimi"])
+        # Words match as prefixes
+        self.assertEqual([item["slug"] for item in self.search("aşı")], ["kedi-asilari"])
+        self.assertEqual(self.search("kuş"), [])
+
+    def test_block_text_is_indexed_as_separate_words(self):
+        results = self.search("tüyleri")
+        self.assertEqual([item["slug"] for item in results], ["tuy-bakimi"])
+        self.assertIn("<mark>tüyleri</mark>", results[0]["snippet"])
+        self.assertEqual([item["slug"] for item in self.search("giriş kedi")], ["tuy-bakimi"])
+
+    def test_postgres_hands_the_raw_query_to_websearch_to_tsquery(self):
+        query = 'kedi -"köpek maması"'
+        sql, params = PostgresBlogSearch().filter(BlogPost.objects.all(), query).query.sql_with_params()
+        self.assertEqual(sql.count("websearch_to_tsquery('turkish', %s)"), 2)
+        self.assertEqual(params.count(query), 2)
+
+    @skipUnless(connection.vendor == "postgresql", "needs the search_vector column of migration 0027")
+    def test_websearch_syntax_on_postgres(self):
+        self.assertEqual([item["slug"] for item in self.search('"tasma eğitimi"')], ["kopek-egitimi"])
+        self.assertEqual({item["slug"] for item in self.search("tüy or köpek")}, {"tuy-bakimi", "kopek-egitimi"})
+        self.assertEqual([item["slug"] for item in self.search("kedi -karma")], ["tuy-bakimi"])
+        self.assertIn("<mark>", self.search("tasma")[0]["snippet"])
+
+
+@local_caches
+class TagIndexTests(TestCase):
+    """Comma separated tags mirrored into normalized Tag rows"""
+
+    def setUp(self):
+        cache.clear()
+        self.vet = Veterinarian.objects.create(name="Dr. Test", specialty="Genel")
+
+    def test_turkish_slugs(self):
+        self.assertEqual(turkish_lower("IŞIK İLAÇ"), "ışık ilaç")
+        self.assertEqual(Tag.make_slug(" İç Parazit "), "iç-parazit")
+        self.assertEqual(Tag.parse(" Kedi , kedi,KEDİ ,, Köpek  Bakımı "), [("kedi", "Kedi"), ("köpek-bakımı", "Köpek Bakımı")])
+
+    def test_posts_sync_tags_and_counts(self):
+        post = BlogPost.objects.create(
+            title="Aşı", slug="asi", tags="Kedi, Aşı", content="", author=self.vet, status="published"
+        )
+        BlogPost.objects.create(title="Taslak", slug="taslak", tags="kedi", content="", author=self.vet, status="draft")
+        self.assertEqual({tag.slug: tag.published_count for tag in Tag.objects.all()}, {"kedi": 1, "aşı": 1})
+
+        post.tags = "KEDİ"
+        post.save()
+        self.assertEqual(list(post.normalized_tags.values_list("slug", flat=True)), ["kedi"])
+        self.assertEqual(Tag.objects.get(slug="aşı").published_count, 0)
+
+        data = APIClient().get("/api/blog/", {"tag": "Kedi"}).data
+        results = data["results"] if isinstance(data, dict) else data
+        self.assertEqual([item["slug"] for item in results], ["asi"])
+
+
+@local_caches
+class BlogFacetTests(TestCase):
+    """Facet counts keep the alternatives of the selected value"""
+
+    def setUp(self):
+        cache.clear()
+        self.vet = Veterinarian.objects.create(name="Dr. Test", specialty="Genel")
+        self.other = Veterinarian.objects.create(name="Dr. Başka", specialty="Genel")
+        posts = [
+            ("a", "Aşı", "kedi", self.vet, "published"),
+            ("b", "Aşı", "köpek", self.vet, "published"),
+            ("c", "Beslenme", "kedi", self.other, "published"),
+            ("d", "Beslenme", "kedi", self.vet, "draft"),
+        ]
+        for slug, category, tags, author, status in posts:
+            BlogPost.objects.create(title=slug, slug=slug, category=category, tags=tags, content="", author=author, status=status)
+
+    def test_facets_skip_their_own_filter(self):
+        facets = blog_facets({"category": "Aşı"})
+        self.assertEqual(facets["total"], 2)
+        # The category facet ignores ?category=, the others apply it
+        self.assertEqual(facets["categories"], [{"name": "Aşı", "count": 2}, {"name": "Beslenme", "count": 1}])
+        self.assertEqual([(tag["slug"], tag["count"]) for tag in facets["tags"]], [("kedi", 1), ("köpek", 1)])
+        self.assertEqual([(author["id"], author["count"]) for author in facets["authors"]], [(self.vet.pk, 2)])
+
+    def test_facets_endpoint(self):
+        response = APIClient().get("/api/blog/facets/", {"tag": "kedi"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total"], 2)
+        self.assertEqual(
+            response.data["tags"], [{"name": "kedi", "slug": "kedi", "count": 2}, {"name": "köpek", "slug": "köpek", "count": 1}]
+        )
+
+
+@local_caches
+class DerivedFieldsTests(TestCase):
+    """Values derived from the post body are computed on save"""
+
+    def test_save_fills_derived_fields(self):
+        vet = Veterinarian.objects.create(name="Dr. Test", specialty="Genel")
+        words = " ".join(["kelime"] * 450)
+        post = BlogPost.objects.create(
+            title="Rehber", slug="rehber", author=vet,
+            content=f"<h2>Giriş</h2><p>{words}</p><h2>Giriş</h2><h3>Aşılar &amp; Bakım</h3><script>gizli()</script>",
+        )
+        self.assertEqual(post.word_count, 455)
+        self.assertEqual(post.reading_time, 2)
+        self.assertEqual(post.outline, [
+            {"level": 2, "text": "Giriş", "anchor": "giriş"},
+            {"level": 2, "text": "Giriş", "anchor": "giriş-2"},
+            {"level": 3, "text": "Aşılar & Bakım", "anchor": "aşılar-bakım"},
+        ])
+        self.assertTrue(post.plain_excerpt.startswith("Giriş kelime kelime"))
+        self.assertNotIn("gizli", post.plain_excerpt)
+
+        post.title = "Yeni başlık"
+        with mock.patch("api.models.analyze_content") as analyze:
+            post.save()
+        analyze.assert_not_called()
+
+
+@local_caches
+class InlineImageTests(TestCase):
+    """data: URI images move out of the post body into media storage"""
+
+    image = b"\x89PNG\r\n\x1a\n piksel"
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.inline_dir = Path(media.name) / "blog" / "inline"
+        self.data_uri = f"data:image/png;base64,{base64.b64encode(self.image).decode()}"
+
+    def test_identical_images_share_one_file(self):
+        html, extracted = extract_inline_images(f'<p><img src="{self.data_uri}"><img src=\'{self.data_uri}\'></p>')
+        self.assertEqual(extracted, 2)
+        name = f"{hashlib.sha256(self.image).hexdigest()[:32]}.png"
+        self.assertEqual([path.name for path in self.inline_dir.iterdir()], [name])
+        self.assertEqual((self.inline_dir / name).read_bytes(), self.image)
+        self.assertEqual(html, f'<p><img src="/media/blog/inline/{name}"><img src=\'/media/blog/inline/{name}\'></p>')
+
+    def test_svg_and_broken_base64_stay_inline(self):
+        html = '<img src="data:image/svg+xml;base64,PHN2Zy8+"><img src="data:image/png;base64,abc">'
+        self.assertEqual(extract_inline_images(html), (html, 0))
+        self.assertFalse(self.inline_dir.exists())
+
+    def test_command_moves_past_unprocessable_posts(self):
+        vet = Veterinarian.objects.create(name="Dr. Test", specialty="Genel")
+        svg = BlogPost.objects.create(
+            title="Çizim", slug="cizim", author=vet, content='<img src="data:image/svg+xml;base64,PHN2Zy8+">'
+        )
+        photo = BlogPost.objects.create(title="Foto", slug="foto", author=vet, content=f'<img src="{self.data_uri}">')
+
+        output = StringIO()
+        call_command("extract_inline_images", limit=1, stdout=output)
+        self.assertIn(f"Continue with --start-pk {svg.pk + 1}", output.getvalue())
+        photo.refresh_from_db()
+        self.assertIn("data:image", photo.content)
+
+        call_command("extract_inline_images", limit=1, start_pk=svg.pk + 1, stdout=StringIO())
+        photo.refresh_from_db()
+        self.assertNotIn("data:image", photo.content)
+        svg.refresh_from_db()
+        self.assertIn("data:image/svg+xml", svg.content)
+
+
+@local_caches
+class RelatedPostsTests(TestCase):
+    """TF-IDF neighbours, refreshed incrementally on save"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.vet = Veterinarian.objects.create(name="Dr. Test", specialty="Genel")
+
+    def post(self, slug, title, content, tags=""):
+        with self.captureOnCommitCallbacks(execute=True):
+            return BlogPost.objects.create(
+                title=title, slug=slug, tags=tags, content=f"<p>{content}</p>", author=self.vet, status="published"
+            )
+
+    def related(self, slug):
+        return [item["slug"] for item in self.client.get(f"/api/blog/{slug}/related/").data]
+
+    def test_similar_posts_rank_first(self):
+        self.post("kedi-asilari", "Kedi aşıları", "Yavru kedi aşı takvimi ve karma aşı", "kedi,aşı")
+        self.post("kopek-egitimi", "Köpek eğitimi", "Tasma eğitimi ve ödül maması", "köpek,eğitim")
+        self.post("yavru-kedi", "Yavru kedi bakımı", "Yavru kedi aşı takvimi, mama ve kum", "kedi")
+        self.assertEqual(self.related("kedi-asilari")[0], "yavru-kedi")
+        self.assertNotIn("kedi-asilari", self.related("kopek-egitimi"))
+
+        # Unpublishing removes the post from the lists it was in
+        with self.captureOnCommitCallbacks(execute=True):
+            post = BlogPost.objects.get(slug="yavru-kedi")
+            post.status = "draft"
+            post.save()
+        self.assertNotIn("yavru-kedi", self.related("kedi-asilari"))
+
+    def test_rebuild_matches_incremental_refresh(self):
+        self.post("kedi-asilari", "Kedi aşıları", "Yavru kedi aşı takvimi", "kedi,aşı")
+        self.post("yavru-kedi", "Yavru kedi bakımı", "Yavru kedi aşı takvimi, mama", "kedi")
+        incremental = set(BlogPostRelated.objects.values_list("post_id", "related_id", "rank"))
+        self.assertEqual(related_posts.rebuild(), 2)
+        self.assertEqual(set(BlogPostRelated.objects.values_list("post_id", "related_id", "rank")), incremental)
+
+    def test_saves_are_debounced_into_one_refresh(self):
+        refresher = RelatedRefresher(related_posts, delay=60)
+        with mock.patch.object(related_posts, "refresh") as refresh:
+            refresher.schedule(1)
+            refresher.schedule(2, [5])
+            refresher.schedule(1)
+            refresh.assert_not_called()
+            refresher.flush()
+        refresh.assert_called_once_with({1: set(), 2: {5}})
+        self.assertIsNone(refresher._timer)
+
+
+@local_caches
+class BlogFeedTests(TestCase):
+    """Cached RSS/Atom feeds"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        vet = Veterinarian.objects.create(name="Dr. Test", specialty="Genel")
+        with self.captureOnCommitCallbacks(execute=True):
+            BlogPost.objects.create(
+                title="Kedi Maması", slug="kedi-mamasi", category="Beslenme", excerpt="Mama seçimi",
+                content="<p>Mama</p>", author=vet, status="published",
+            )
+            BlogPost.objects.create(
+                title="Aşı Takvimi", slug="asi-takvimi", category="Aşı", content="<p>Aşı</p>", author=vet, status="published"
+            )
+
+    def feed(self, url, **headers):
+        response = self.client.get(url, **headers)
+        return response, b"".join(response.streaming_content).decode() if response.status_code == 200 else ""
+
+    def test_category_keeps_its_stored_form(self):
+        _, shouted = self.feed("/api/blog/feed.rss?category=BESLENME")
+        response, xml = self.feed("/api/blog/feed.rss?category=beslenme")
+        self.assertEqual(xml, shouted)
+        self.assertIn("PetKey Blog - Beslenme", xml)
+        self.assertIn("category=Beslenme", xml)
+        self.assertIn("Kedi Maması", xml)
+        self.assertNotIn("Aşı Takvimi", xml)
+
+    def test_unchanged_feed_is_not_modified(self):
+        response, xml = self.feed("/api/blog/feed.atom")
+        self.assertIn("Aşı Takvimi", xml)
+        # A view counter flush leaves the feed alone
+        bump_model_version(BLOG_VIEWS)
+        response, _ = self.feed("/api/blog/feed.atom", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+
+class WorkingHoursTests(SimpleTestCase):
+    """Free-text working hours parsed into minute intervals"""
+
+    def test_parse_hours(self):
+        cases = {
+            "09:00-12:30, 14:00-18:00": ((540, 750), (840, 1080)),
+            "9-17": ((540, 1020),),
+            "09.00 – 18.00": ((540, 1080),),
+            "09:00-13:00 / 12:00-15:00": ((540, 900),),
+            "22:00-02:00": ((1320, 1440),),
+            "7/24": ((0, 1440),),
+            "24 Saat": ((0, 1440),),
+            "KAPALI": (),
+            "İzinli": (),
+            "": (),
+            "-": (),
+        }
+        for text, intervals in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(parse_hours(text), intervals)
+
+    def test_unrecognised_hours_are_a_day_off(self):
+        with self.assertLogs("api.scheduling", level="WARNING"):
+            self.assertEqual(parse_hours("öğleden sonra"), ())
+        with self.assertLogs("api.scheduling", level="WARNING"):
+            self.assertEqual(parse_hours("25:00-26:00"), ())
+
+    def test_weekly_schedule_of_a_veterinarian(self):
+        vet = Veterinarian(name="Dr. Test", monday_hours="09:00-12:00", saturday_hours="10-14")
+        schedule = WeeklySchedule.from_veterinarian(vet)
+        monday = date(2026, 10, 19)
+        self.assertEqual(schedule.intervals(monday), ((540, 720),))
+        self.assertEqual(schedule.intervals(monday + timedelta(days=5)), ((600, 840),))
+        self.assertEqual(schedule.intervals(monday + timedelta(days=6)), ())
+        self.assertEqual(schedule.mask(monday), ((1 << 180) - 1) << 540)
+
+    @override_settings(DEFAULT_WORKING_HOURS="08:30-17:30")
+    def test_empty_schedule_uses_clinic_hours(self):
+        schedule = WeeklySchedule.from_veterinarian(Veterinarian(name="Dr. Test"))
+        self.assertEqual(set(schedule.days), {((510, 1050),)})
+
+
+@local_caches
+class AvailabilitySearchTests(TestCase):
+    """Free slots of several vets over several days from the booking bitmaps"""
+
+    def setUp(self):
+        cache.clear()
+        self.early = Veterinarian.objects.create(name="Dr. Erken", specialty="Genel", monday_hours="09:00-10:00")
+        self.late = Veterinarian.objects.create(name="Dr. Geç", specialty="Genel", monday_hours="10:00-11:00")
+        today = timezone.localdate()
+        self.monday = today + timedelta(days=7 - today.weekday())
+        self.tuesday = self.monday + timedelta(days=1)
+
+    def book(self, vet, slot):
+        with self.captureOnCommitCallbacks(execute=True):
+            Appointment.objects.create(
+                veterinarian=vet, date=self.monday, time=slot, pet_name="Pamuk", pet_type="Kedi", pet_age="2",
+                owner_name="Ayşe Yılmaz", owner_email="ayse@example.com", owner_phone="05550000000",
+            )
+
+    def test_search_over_vets_and_days(self):
+        self.book(self.early, time(9))
+        result = search_availability([self.early.pk, self.late.pk, 0], [self.monday, self.tuesday])
+        self.assertEqual(result, {
+            self.early.pk: {self.monday: ["09:30"], self.tuesday: []},
+            self.late.pk: {self.monday: ["10:00", "10:30"], self.tuesday: []},
+        })
+
+    def test_earliest_slot(self):
+        vets, days = [self.late.pk, self.early.pk], [self.tuesday, self.monday]
+        self.assertEqual(earliest_slot(vets, days), (self.early.pk, self.monday, "09:00"))
+        self.book(self.early, time(9))
+        self.book(self.early, time(9, 30))
+        self.assertEqual(earliest_slot(vets, days), (self.late.pk, self.monday, "10:00"))
+        self.assertIsNone(earliest_slot([self.early.pk], days))
+
+    def test_free_slots_skip_booked_minutes(self):
+        schedule = WeeklySchedule([((540, 720),)] * 7)
+        booked = span_mask(600, 645)
+        # The 45 minute booking shifts the next start to its end
+        self.assertEqual(list(free_slots(schedule, self.monday, booked, 30)), [540, 570, 645, 660, 690])
+        self.assertEqual(list(free_slots(schedule, self.monday, booked, 30, buffer=15)), [540, 645, 660, 690])
+
+
+@local_caches
+class AppointmentBookingRaceTests(TransactionTestCase):
+    """Concurrent submissions of the same slot book it exactly once"""
+
+    def setUp(self):
+        cache.clear()
+        self.vet = Veterinarian.objects.create(
+            name="Dr. Test", specialty="Genel", **{f"{day}_hours": "7/24" for day in DAYS}
+        )
+        self.day = timezone.localdate() + timedelta(days=7)
+        self.service = Service.objects.create(slug="muayene", title="Muayene", short_description="")
+
+    def payload(self, slot="10:00", **extra):
+        return {
+            "veterinarian": self.vet.pk,
+            "pet_name": "Pamuk",
+            "pet_type": "Kedi",
+            "pet_age": "2",
+            "owner_name": "Ayşe Yılmaz",
+            "owner_email": "ayse@example.com",
+            "owner_phone": "05550000000",
+            "date": self.day.isoformat(),
+            "time": slot,
+            "service": self.service.pk,
+            **extra,
+        }
+
+    def test_concurrent_bookings_of_one_slot(self):
+        threads = 8
+        barrier = threading.Barrier(threads)
+        responses = []
+        lock = threading.Lock()
+
+        def book(index):
+            try:
+                client = APIClient()
+                barrier.wait()
+                response = client.post("/api/appointments/", self.payload(owner_name=f"Sahip {index}"), format="json")
+                with lock:
+                    responses.append(response)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=book, args=(index,)) for index in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        codes = sorted(response.status_code for response in responses)
+        self.assertEqual(codes, [201] + [409] * (threads - 1))
+        self.assertEqual(
+            Appointment.objects.filter(veterinarian=self.vet, date=self.day, status__in=["pending", "confirmed"]).count(), 1
+        )
+
+    def test_conflict_lists_alternatives(self):
+        client = APIClient()
+        self.assertEqual(client.post("/api/appointments/", self.payload(), format="json").status_code, 201)
+
+        response = client.post("/api/appointments/", self.payload(), format="json")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["code"], "taken")
+        times = [alternative["time"] for alternative in response.data["alternatives"]]
+        self.assertTrue(times)
+        self.assertNotIn("10:00", times)
+
+    def test_unique_active_slot_constraint(self):
+        fields = self.payload()
+        fields.update(veterinarian=self.vet, date=self.day, time=time(10), service=self.service)
+        Appointment.objects.create(**fields)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Appointment.objects.create(**fields)
+        # Cancelled appointments keep their slot without blocking it
+        Appointment.objects.create(**dict(fields, status="cancelled"))
+        Appointment.objects.create(**dict(fields, status="cancelled"))
+
+    def test_hold_reserves_slot_until_redeemed(self):
+        client = APIClient()
+        response = client.post(
+            "/api/appointments/holds/", {"veterinarian": self.vet.pk, "date": self.day.isoformat(), "time": "10:00"}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        token = response.data["token"]
+
+        slots = client.get(f"/api/appointments/available_slots/?date={self.day.isoformat()}&veterinarian={self.vet.pk}")
+        self.assertNotIn("10:00", slots.data["available_slots"])
+        self.assertEqual(client.post("/api/appointments/", self.payload(), format="json").status_code, 409)
+
+        response = client.post("/api/appointments/", self.payload(hold_token=token), format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(SlotHold.objects.filter(token=token).exists())
+
+    def test_expired_hold_frees_slot(self):
+        client = APIClient()
+        client.post(
+            "/api/appointments/holds/", {"veterinarian": self.vet.pk, "date": self.day.isoformat(), "time": "10:00"}, format="json"
+        )
+        later = timezone.now() + timedelta(minutes=settings.SLOT_HOLD_MINUTES, seconds=1)
+        with mock.patch("django.utils.timezone.now", return_value=later):
+            slots = client.get(f"/api/appointments/available_slots/?date={self.day.isoformat()}&veterinarian={self.vet.pk}")
+            self.assertIn("10:00", slots.data["available_slots"])
+            self.assertEqual(client.post("/api/appointments/", self.payload(), format="json").status_code, 201)
+
+    def test_service_duration_packs_slots(self):
+        client = APIClient()
+        check_up = Service.objects.create(slug="check-up", title="Check-Up", short_description="", duration_minutes=45, buffer_minutes=15)
+        surgery = Service.objects.create(slug="cerrahi", title="Cerrahi", short_description="", duration_minutes=90)
+        self.assertEqual(client.post("/api/appointments/", self.payload(service=check_up.pk), format="json").status_code, 201)
+
+        url = f"/api/appointments/available_slots/?date={self.day.isoformat()}&veterinarian={self.vet.pk}"
+        slots = client.get(url).data["available_slots"]
+        # 10:00-10:45 and the 15 minute buffer are taken, the next booking starts right after
+        self.assertIn("09:30", slots)
+        self.assertNotIn("10:30", slots)
+        self.assertIn("11:00", slots)
+        surgery_slots = client.get(f"{url}&service={surgery.pk}").data["available_slots"]
+        self.assertIn("08:30", surgery_slots)
+        self.assertNotIn("09:00", surgery_slots)
+
+        response = client.post("/api/appointments/", self.payload("09:00", service=surgery.pk), format="json")
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(all(alternative["time"] != "09:00" for alternative in response.data["alternatives"]))
+
+    def test_service_length_change_reindexes_days(self):
+        client = APIClient()
+        self.assertEqual(client.post("/api/appointments/", self.payload(), format="json").status_code, 201)
+        url = f"/api/appointments/available_slots/?date={self.day.isoformat()}&veterinarian={self.vet.pk}"
+        self.assertIn("10:30", client.get(url).data["available_slots"])
+
+        self.service.duration_minutes = 60
+        self.service.save()
+        self.assertNotIn("10:30", client.get(url).data["available_slots"])
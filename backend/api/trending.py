@@ -0,0 +1,118 @@
+"""
+Trending blog posts: exponentially decayed view scores with an incremental top-K
+
+A view counts for exp(-ln 2 * age / half_life): with the default 3 day half
+life, last week's spike is worth an eighth of today's. Scores are kept
+relative to a reference time t0, i.e. a view at time t adds exp(lambda *
+(t - t0)), so decaying everything to now is a common factor that never has to
+be applied to rank. New views only add to their post's score.
+
+The shared cache holds the top candidates with their scores. Every flush of
+the view counter (see view_counter.py) adds its counts and trims the table to
+its capacity, so /api/blog/trending/ reads a ready list instead of sorting
+the blog table. The table is rebuilt from the daily rollups
+(BlogPostDailyViews) when it is missing, when a concurrent update could not
+take the lock, and every day to reset t0.
+"""
+import math
+import time
+from datetime import datetime, time as dt_time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import BlogPostDailyViews
+
+SECONDS_PER_DAY = 86400
+
+
+class TrendingTracker:
+    """Top-K of blog posts by decayed view score, maintained in the shared cache"""
+
+    def __init__(self, name, size=None, half_life_days=None, window_days=None):
+        self.key = f'petkey:trending:{name}'
+        self._size = size
+        self._half_life_days = half_life_days
+        self._window_days = window_days
+
+    @property
+    def size(self):
+        return self._size or getattr(settings, 'TRENDING_SIZE', 10)
+
+    @property
+    def half_life_days(self):
+        return self._half_life_days or getattr(settings, 'TRENDING_HALF_LIFE_DAYS', 3)
+
+    @property
+    def window_days(self):
+        return self._window_days or getattr(settings, 'TRENDING_WINDOW_DAYS', 30)
+
+    @property
+    def capacity(self):
+        # Keep spare candidates so that a post dropping out of the top can come back
+        return self.size * 4
+
+    @property
+    def decay_rate(self):
+        return math.log(2) / (self.half_life_days * SECONDS_PER_DAY)
+
+    def _weight(self, timestamp, t0):
+        return math.exp(self.decay_rate * (timestamp - t0))
+
+    def _trim(self, scores):
+        if len(scores) <= self.capacity:
+            return scores
+        return dict(sorted(scores.items(), key=lambda item: item[1], reverse=True)[:self.capacity])
+
+    def rebuild(self):
+        """Recompute the table from the daily rollups of the window"""
+        now = time.time()
+        since = timezone.localdate() - timedelta(days=self.window_days - 1)
+        rows = (
+            BlogPostDailyViews.objects.filter(date__gte=since, post__status='published')
+            .values_list('post_id', 'date', 'views')
+        )
+        scores = {}
+        tz = timezone.get_current_timezone()
+        for pk, day, views in rows:
+            # A day's views are taken to happen at its midpoint (capped at now)
+            midpoint = datetime.combine(day, dt_time(12), tzinfo=tz).timestamp()
+            scores[pk] = scores.get(pk, 0.0) + views * self._weight(min(midpoint, now), now)
+        table = {'t0': now, 'scores': self._trim(scores)}
+        cache.set(self.key, table, SECONDS_PER_DAY)
+        return table
+
+    def add(self, counts, timestamp=None):
+        """Add fresh view counts ({post_id: views}) to the table"""
+        timestamp = timestamp or time.time()
+        lock_key = f'{self.key}:lock'
+        if not cache.add(lock_key, 1, 10):
+            # Another worker is updating: let the next read rebuild from the rollups
+            cache.delete(self.key)
+            return
+        try:
+            table = cache.get(self.key)
+            if table is None or timestamp - table['t0'] > SECONDS_PER_DAY:
+                # Rebuilt from the rollups, which already include these counts
+                self.rebuild()
+                return
+            scores = table['scores']
+            weight = self._weight(timestamp, table['t0'])
+            for pk, views in counts.items():
+                scores[pk] = scores.get(pk, 0.0) + views * weight
+            table['scores'] = self._trim(scores)
+            cache.set(self.key, table, SECONDS_PER_DAY)
+        finally:
+            cache.delete(lock_key)
+
+    def top(self, limit=None):
+        """Post ids ordered by decayed score, best first"""
+        table = cache.get(self.key)
+        if table is None:
+            table = self.rebuild()
+        ranked = sorted(table['scores'].items(), key=lambda item: item[1], reverse=True)
+        return [pk for pk, score in ranked[:self.size if limit is None else limit]]
+
+
+blog_trending = TrendingTracker('blog')
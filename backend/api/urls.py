@@ -16,8 +16,16 @@ from .views import (
     GoogleReviewViewSet,
     HomePageViewSet,
     SiteSettingsViewSet,
+    PublicBlogPostViewSet,
+    PublicServiceViewSet,
+    PublicVeterinarianViewSet,
+    PublicGalleryImageViewSet,
+    PublicGoogleReviewViewSet,
+    BootstrapViewSet,
+    PageBundleViewSet,
     sitemap_xml
 )
+from .feeds import blog_feed
 from .auth_views import (
     login_view,
     logout_view,
@@ -44,9 +52,22 @@ router.register(r'seo-settings', SEOSettingsViewSet, basename='seosettings')
 router.register(r'google-reviews', GoogleReviewViewSet, basename='googlereview')
 router.register(r'homepage', HomePageViewSet, basename='homepage')
 router.register(r'site-settings', SiteSettingsViewSet, basename='sitesettings')
+router.register(r'bootstrap', BootstrapViewSet, basename='bootstrap')
+router.register(r'page-bundle', PageBundleViewSet, basename='page-bundle')
+
+# Anonymous read-only namespace, safe for CDN / reverse proxy caching
+public_router = DefaultRouter()
+public_router.register(r'blog', PublicBlogPostViewSet, basename='public-blogpost')
+public_router.register(r'services', PublicServiceViewSet, basename='public-service')
+public_router.register(r'veterinarians', PublicVeterinarianViewSet, basename='public-veterinarian')
+public_router.register(r'gallery', PublicGalleryImageViewSet, basename='public-galleryimage')
+public_router.register(r'google-reviews', PublicGoogleReviewViewSet, basename='public-googlereview')
 
 # The API URLs are now determined automatically by the router
 urlpatterns = [
+    path('public/', include(public_router.urls)),
+    # Before the router, whose format suffix routes would read feed.rss as slug "feed"
+    path('blog/feed.<str:kind>', blog_feed, name='blog-feed'),
     path('', include(router.urls)),
     # Authentication endpoints (CSRF exempt for cross-origin)
     path('auth/login/', csrf_exempt(login_view), name='login'),
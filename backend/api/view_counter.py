@@ -0,0 +1,281 @@
+"""
+Write-behind view counter for blog posts
+
+Reading a post used to run `views += 1; save()` in the request: a
+synchronous UPDATE holding a row lock on the hottest rows, which also lost
+increments between concurrent readers. Reads now only bump an in-memory
+counter. A background thread of each worker flushes the counters every
+VIEW_COUNTER_FLUSH_SECONDS as batched `F('views') + n` updates, and the
+remaining counts are flushed when the worker exits (gunicorn worker_exit
+hook). A crashed worker loses at most one interval of views.
+
+Unique readers are counted next to the raw views: each read adds a salted
+visitor fingerprint to a HyperLogLog sketch of the post and day, merged into
+BlogPostReaderSketch on flush. A sketch has a fixed size whatever the
+traffic, and daily sketches merge into weekly and monthly unique counts.
+
+The same flush adds the counts to daily rollups (BlogPostDailyViews) and to
+the trending table (see trending.py). The counts are not part of the
+BlogPost version stamp: a flush only bumps BLOG_VIEWS, which stamps the
+payloads ranked by views, so edits-only caches survive the traffic.
+"""
+import hashlib
+import hmac
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache_utils import bump_model_version
+from .hyperloglog import HyperLogLog
+from .models import BlogPost, BlogPostDailyViews, BlogPostReaderSketch
+from .trending import blog_trending
+
+logger = logging.getLogger(__name__)
+
+# Version stamp of the view counts, bumped on every flush
+BLOG_VIEWS = 'blog-views'
+
+BOT_USER_AGENT = re.compile(r'bot|crawl|spider|slurp|preview|monitor|curl|wget|python-requests|headless', re.IGNORECASE)
+
+
+def client_ip(request):
+    """First address of X-Forwarded-For (set by the Render proxy), else the peer address"""
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    if forwarded:
+        return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def reader_fingerprint(request):
+    """
+    Salted, non-reversible visitor fingerprint, or None for bots
+
+    The raw IP and user agent are never stored; only their HMAC enters the
+    sketches, and only as register ranks.
+    """
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    if not user_agent or BOT_USER_AGENT.search(user_agent):
+        return None
+    salt = getattr(settings, 'READER_FINGERPRINT_SALT', '') or settings.SECRET_KEY
+    raw = f'{client_ip(request)}|{user_agent}'.encode('utf-8')
+    return hmac.new(salt.encode('utf-8'), raw, hashlib.sha256).hexdigest()
+
+
+class ViewCounter:
+    """Per-process buffer of view increments, flushed periodically"""
+
+    def __init__(self, model, field='views', sketch_model=None, rollup_model=None, trending=None, interval=None):
+        self.model = model
+        self.field = field
+        # Daily unique reader sketches, a model with post, date and registers
+        self.sketch_model = sketch_model
+        # Daily view totals, a model with post, date and views
+        self.rollup_model = rollup_model
+        self.trending = trending
+        self._interval = interval
+        self._counts = Counter()
+        self._daily = Counter()
+        self._sketches = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    @property
+    def interval(self):
+        if self._interval is not None:
+            return self._interval
+        return getattr(settings, 'VIEW_COUNTER_FLUSH_SECONDS', 30)
+
+    def record(self, pk, count=1, fingerprint=None):
+        """Count views of an object (and its reader, when given) without touching the database"""
+        today = timezone.localdate()
+        with self._lock:
+            self._counts[pk] += count
+            self._daily[(pk, today)] += count
+            if fingerprint and self.sketch_model is not None:
+                key = (pk, today)
+                if key not in self._sketches:
+                    self._sketches[key] = HyperLogLog()
+                self._sketches[key].add(fingerprint)
+        if self.interval <= 0:
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def pending(self, pk):
+        """Views recorded by this worker and not flushed yet"""
+        with self._lock:
+            return self._counts.get(pk, 0)
+
+    def clear(self):
+        """Drop the buffered counts without writing them"""
+        with self._lock:
+            self._counts, self._daily, self._sketches = Counter(), Counter(), {}
+
+    def flush(self):
+        """
+        Write the buffered counts, one UPDATE per distinct increment
+
+        Returns:
+            int: Number of views written
+        """
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            daily, self._daily = self._daily, Counter()
+            sketches, self._sketches = self._sketches, {}
+        if counts:
+            # Drop the counts of posts deleted since; their rows would fail the foreign keys forever
+            try:
+                existing = set(self.model.objects.filter(pk__in=list(counts)).values_list('pk', flat=True))
+            except DatabaseError as e:
+                logger.warning(f'View counter flush failed, retrying later: {str(e)}')
+                with self._lock:
+                    self._counts.update(counts)
+                    self._daily.update(daily)
+                    for key, sketch in sketches.items():
+                        self._sketches.setdefault(key, HyperLogLog()).merge(sketch)
+                return 0
+            counts = Counter({pk: count for pk, count in counts.items() if pk in existing})
+            daily = Counter({key: count for key, count in daily.items() if key[0] in existing})
+            sketches = {key: sketch for key, sketch in sketches.items() if key[0] in existing}
+        if sketches:
+            self._flush_sketches(sketches)
+        if not counts:
+            return 0
+
+        by_increment = defaultdict(list)
+        for pk, count in counts.items():
+            by_increment[count].append(pk)
+
+        try:
+            with transaction.atomic():
+                for count, pks in by_increment.items():
+                    self.model.objects.filter(pk__in=pks).update(**{self.field: F(self.field) + count})
+                if self.rollup_model is not None:
+                    self._flush_rollups(daily)
+        except DatabaseError as e:
+            # Put the counts back, the next flush retries them
+            logger.warning(f'View counter flush failed, retrying later: {str(e)}')
+            with self._lock:
+                self._counts.update(counts)
+                self._daily.update(daily)
+            return 0
+
+        if self.trending is not None:
+            self.trending.add(counts)
+        # Only the view-ranked payloads are stamped with the counts
+        bump_model_version(BLOG_VIEWS)
+        return sum(counts.values())
+
+    def _flush_rollups(self, daily):
+        """Add the counts to the daily rows, creating the ones of a new day"""
+        for (pk, day), count in daily.items():
+            updated = self.rollup_model.objects.filter(post_id=pk, date=day).update(views=F('views') + count)
+            if not updated:
+                try:
+                    with transaction.atomic():
+                        self.rollup_model.objects.create(post_id=pk, date=day, views=count)
+                except IntegrityError:
+                    # Another worker created the row in between
+                    self.rollup_model.objects.filter(post_id=pk, date=day).update(views=F('views') + count)
+
+    def _flush_sketches(self, sketches):
+        """Merge buffered sketches into the stored daily ones"""
+        try:
+            with transaction.atomic():
+                for (pk, day), sketch in sketches.items():
+                    stored, created = self.sketch_model.objects.select_for_update().get_or_create(
+                        post_id=pk, date=day, defaults={'registers': sketch.to_bytes()}
+                    )
+                    if not created:
+                        merged = HyperLogLog.from_bytes(bytes(stored.registers)).merge(sketch)
+                        stored.registers = merged.to_bytes()
+                        stored.save(update_fields=['registers', 'updated_at'])
+        except DatabaseError as e:
+            logger.warning(f'Reader sketch flush failed, retrying later: {str(e)}')
+            with self._lock:
+                for key, sketch in sketches.items():
+                    if key in self._sketches:
+                        sketch.merge(self._sketches[key])
+                    self._sketches[key] = sketch
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            # Started lazily so that each forked gunicorn worker runs its own
+            self._flusher = threading.Thread(target=self._run, name='view-counter-flush', daemon=True)
+            self._flusher.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f'View counter flush failed: {str(e)}')
+            finally:
+                connection.close()
+
+
+blog_view_counter = ViewCounter(
+    BlogPost,
+    sketch_model=BlogPostReaderSketch,
+    rollup_model=BlogPostDailyViews,
+    trending=blog_trending,
+)
+
+
+READER_WINDOWS = {'day': 1, 'week': 7, 'month': 30}
+
+
+def unique_reader_counts(post_ids, timeout=300):
+    """
+    Estimated unique readers of posts over trailing windows of days
+
+    Daily sketches are merged per window. Results are cached for a few
+    minutes, so a list of posts costs at most one query.
+
+    Returns:
+        dict: {post_id: {'day': n, 'week': n, 'month': n}}
+    """
+    today = timezone.localdate()
+    keys = {pk: f'petkey:readers:{pk}:{today.isoformat()}' for pk in post_ids}
+    cached = cache.get_many(list(keys.values()))
+    result = {pk: cached[key] for pk, key in keys.items() if key in cached}
+
+    missing = [pk for pk in post_ids if pk not in result]
+    if missing:
+        since = today - timedelta(days=max(READER_WINDOWS.values()) - 1)
+        sketches = defaultdict(list)
+        rows = (
+            BlogPostReaderSketch.objects.filter(post_id__in=missing, date__gte=since)
+            .values_list('post_id', 'date', 'registers')
+        )
+        for pk, day, registers in rows:
+            sketches[pk].append((day, HyperLogLog.from_bytes(bytes(registers))))
+
+        fresh = {}
+        for pk in missing:
+            counts = {}
+            for name, days in READER_WINDOWS.items():
+                start = today - timedelta(days=days - 1)
+                merged = HyperLogLog()
+                for day, sketch in sketches[pk]:
+                    if day >= start:
+                        merged.merge(sketch)
+                counts[name] = merged.count()
+            result[pk] = fresh[keys[pk]] = counts
+        cache.set_many(fresh, timeout)
+
+    return result
@@ -1,17 +1,26 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, AllowAny
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from .models import Veterinarian, BlogPost, Appointment, ContactMessage, GalleryImage, PageContent, Service, AboutPage, ServicesPage, ContactPage, SEOSettings, GoogleReview, HomePage, SiteSettings
+from django.db import connection
+from django.conf import settings
+from django.db.models import Count, Max, Q, Sum
+from .models import Veterinarian, BlogPost, Appointment, ContactMessage, GalleryImage, PageContent, Service, AboutPage, ServicesPage, ContactPage, SEOSettings, GoogleReview, HomePage, SiteSettings, Tag, BlogPostRelated
 from .serializers import (
     VeterinarianSerializer,
     BlogPostSerializer,
+    BlogPostCardSerializer,
     BlogPostListSerializer,
     AppointmentSerializer,
     ContactMessageSerializer,
@@ -24,32 +33,143 @@ from .serializers import (
     SEOSettingsSerializer,
     GoogleReviewSerializer,
     HomePageSerializer,
-    SiteSettingsSerializer
+    SiteSettingsSerializer,
+    SlotHoldSerializer,
+)
+from .cache_utils import CollectionCache, get_model_version, get_models_version, missing_blog_slugs, response_cache_key, single_flight
+from .facets import blog_facets, filter_blog_posts
+from .related import related_posts
+from .scheduling import (
+    ACTIVE_STATUSES, SlotUnavailable, alternative_slots, available_slots, earliest_slot, release_hold, reserve_slot,
+    search_availability, working_hours,
 )
+from .search import FullTextSearchFilter, SearchSnippetMixin
+from .trending import blog_trending
+from .view_counter import BLOG_VIEWS, blog_view_counter, reader_fingerprint
 from .email_utils import send_appointment_confirmation, send_contact_confirmation
+from django.http import Http404
+from .http_cache import (
+    CacheControlMixin,
+    ConditionalGetMixin,
+    instance_validators,
+    make_etag,
+    queryset_validators,
+    NO_STORE_POLICY,
+    PUBLIC_CONTENT_POLICY,
+    PUBLIC_READ_POLICY,
+    PUBLIC_UNCACHED_POLICY,
+    SESSION_DEPENDENT_POLICY,
+)
+
+
+# Query result caches of the public collection endpoints, invalidated by the
+# version stamps of the models listed (see signals.py)
+active_services_cache = CollectionCache('services-active', [Service])
+active_veterinarians_cache = CollectionCache('veterinarians-active', [Veterinarian])
+active_reviews_cache = CollectionCache('google-reviews-active', [GoogleReview])
+gallery_cache = CollectionCache('gallery', [GalleryImage])
+gallery_categories_cache = CollectionCache('gallery-categories', [GalleryImage])
+blog_categories_cache = CollectionCache('blog-categories', [BlogPost])
+blog_tags_cache = CollectionCache('blog-tags', [BlogPost, Tag])
+blog_facets_cache = CollectionCache('blog-facets', [BlogPost, Tag, Veterinarian])
+
+
+def build_tag_cloud():
+    # published_count is maintained on save (Tag.refresh_counts), no join needed
+    return [
+        {'name': name, 'slug': slug, 'count': count}
+        for name, slug, count in Tag.objects.filter(published_count__gt=0)
+        .order_by('-published_count', 'name').values_list('name', 'slug', 'published_count')
+    ]
 
 
-class VeterinarianViewSet(viewsets.ModelViewSet):
+class VeterinarianViewSet(CacheControlMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Veterinarian model - Public read, auth write"""
+    cache_policy = PUBLIC_CONTENT_POLICY
     queryset = Veterinarian.objects.all()
     serializer_class = VeterinarianSerializer
     permission_classes = [AllowAny]  # Allow anyone to create/update for now (should be restricted in production)
     lookup_field = 'slug'  # Use slug instead of pk for lookups
 
+    def get_validators(self):
+        if self.action == 'active':
+            return queryset_validators(Veterinarian.objects.filter(is_active=True))
+        return super().get_validators()
+
     @action(detail=False, methods=['get'])
     def active(self, request):
         """Get only active veterinarians"""
-        active_vets = self.queryset.filter(is_active=True)
-        serializer = self.get_serializer(active_vets, many=True)
+        def build():
+            active_vets = self.queryset.filter(is_active=True)
+            return self.get_serializer(active_vets, many=True).data
+
+        return Response(active_veterinarians_cache.get(request, build))
+
+
+class BlogPostReadMixin:
+    """Reads shared by /api/blog/ and /api/public/blog/: list validators, counted post detail, related posts"""
+
+    def list_validators(self):
+        # List bodies also carry the view counts, the unique readers and the author names
+        etag, _ = queryset_validators(
+            self.filter_queryset(self.get_queryset()), views=Sum('views'), author_updated_at=Max('author__updated_at')
+        )
+        # A view counter flush changes the unique readers without touching any row; it bumps BLOG_VIEWS.
+        # Last-Modified can't tell, so revalidations go through the ETag only.
+        return make_etag(etag, get_model_version(BLOG_VIEWS)), None
+
+    def retrieve(self, request, *args, **kwargs):
+        """Increment views when retrieving"""
+        # Unknown slugs are remembered so repeated probes skip the database.
+        # Drafts are visible to admins, so only anonymous lookups use it.
+        anonymous = not request.user.is_authenticated
+        slug = kwargs.get(self.lookup_field)
+        if anonymous and missing_blog_slugs.is_missing(slug):
+            raise Http404
+        try:
+            instance = self.get_object()
+        except Http404:
+            if anonymous:
+                missing_blog_slugs.mark_missing(slug)
+            raise
+        # Write-behind: the read itself never touches the row (see view_counter.py)
+        blog_view_counter.record(instance.pk, fingerprint=reader_fingerprint(request))
+        data = self.get_serializer(instance).data
+        data['views'] = instance.views + blog_view_counter.pending(instance.pk)
+        return Response(data)
+
+    @action(detail=True, methods=['get'])
+    def related(self, request, slug=None):
+        """Precomputed similar posts, most similar first (?limit=, at most RELATED_POSTS_SIZE)"""
+        try:
+            limit = min(int(request.query_params.get('limit', related_posts.size)), related_posts.size)
+        except ValueError:
+            limit = related_posts.size
+        # One query through the (post, rank) index, keyed by the slug of the source post
+        posts = (
+            BlogPost.objects.filter(status='published', incoming_related_links__post__slug=slug)
+            .select_related('author').prefetch_related('normalized_tags').defer('content')
+            .order_by('incoming_related_links__rank')[:max(limit, 0)]
+        )
+        serializer = BlogPostListSerializer(posts, many=True, context={'request': request})
         return Response(serializer.data)
 
 
-class BlogPostViewSet(viewsets.ModelViewSet):
+class BlogPostViewSet(BlogPostReadMixin, SearchSnippetMixin, CacheControlMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for BlogPost - Public reads published, auth manages all"""
+    cache_policy = SESSION_DEPENDENT_POLICY
+    cache_policies = {
+        'featured': PUBLIC_CONTENT_POLICY,
+        'trending': PUBLIC_CONTENT_POLICY,
+        'categories': PUBLIC_CONTENT_POLICY,
+        'tags': PUBLIC_CONTENT_POLICY,
+        'facets': PUBLIC_CONTENT_POLICY,
+        'related': PUBLIC_CONTENT_POLICY,
+    }
     queryset = BlogPost.objects.all()
     permission_classes = [AllowAny]  # Allow anyone to create/update for now (should be restricted in production)
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'content', 'excerpt', 'tags', 'category']
+    # ?search= is ranked full-text search (see search.py), applied after the ordering
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     ordering_fields = ['published_at', 'created_at', 'views']
     ordering = ['-published_at']
     lookup_field = 'slug'
@@ -60,48 +180,90 @@ class BlogPostViewSet(viewsets.ModelViewSet):
         return BlogPostSerializer
 
     def get_queryset(self):
-        queryset = BlogPost.objects.all()
+        queryset = BlogPost.objects.select_related('author').prefetch_related('normalized_tags')
         if not self.request.user.is_authenticated:
             queryset = queryset.filter(status='published')
+        if self.action == 'list':
+            # The list serializer uses the precomputed fields, never the body
+            queryset = queryset.defer('content')
+        return filter_blog_posts(queryset, self.request.query_params).order_by('-published_at', '-created_at')
 
-        category = self.request.query_params.get('category', None)
-        if category:
-            queryset = queryset.filter(category__iexact=category)
-
-        tag = self.request.query_params.get('tag', None)
-        if tag:
-            queryset = queryset.filter(tags__icontains=tag)
-
-        author_id = self.request.query_params.get('author', None)
-        if author_id:
-            queryset = queryset.filter(author_id=author_id)
-
-        return queryset.order_by('-published_at', '-created_at')
+    def get_validators(self):
+        if self.action == 'list':
+            return self.list_validators()
+        if self.action in ('featured', 'trending'):
+            # The ranking only changes on an edit or a view counter flush
+            return make_etag(
+                'blog', self.action, self.request.query_params.get('limit', ''), get_models_version([BlogPost, BLOG_VIEWS])
+            ), None
+        if self.action in ('categories', 'tags'):
+            return queryset_validators(BlogPost.objects.filter(status='published'))
+        if self.action == 'facets':
+            return make_etag('blog-facets', get_models_version(blog_facets_cache.models)), None
+        if self.action == 'related':
+            return make_etag(
+                'blog-related', self.kwargs.get(self.lookup_field), self.request.query_params.get('limit', ''),
+                get_models_version([BlogPost, BlogPostRelated, BLOG_VIEWS])
+            ), None
+        # retrieve counts a view on every read, so it is never answered with 304
+        return None
+
+    def trending_posts(self, limit):
+        """Published posts of the precomputed trending list, best first"""
+        ids = blog_trending.top(limit)
+        posts = (
+            BlogPost.objects.filter(pk__in=ids, status='published')
+            .select_related('author').prefetch_related('normalized_tags').defer('content').in_bulk()
+        )
+        return [posts[pk] for pk in ids if pk in posts]
 
-    def retrieve(self, request, *args, **kwargs):
-        """Increment views when retrieving"""
-        instance = self.get_object()
-        instance.views += 1
-        instance.save(update_fields=['views'])
-        serializer = self.get_serializer(instance)
+    @action(detail=False, methods=['get'])
+    def featured(self, request):
+        """Get the trending posts, topped up with the most viewed ones"""
+        featured_posts = self.trending_posts(5)
+        if len(featured_posts) < 5:
+            # Not enough recent views yet (new site, empty rollups)
+            featured_posts += (
+                BlogPost.objects.filter(status='published').exclude(pk__in=[post.pk for post in featured_posts])
+                .select_related('author').prefetch_related('normalized_tags').defer('content')
+                .order_by('-views')[:5 - len(featured_posts)]
+            )
+        serializer = BlogPostListSerializer(featured_posts, many=True, context={'request': request})
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
-    def featured(self, request):
-        """Get most viewed published posts"""
-        featured_posts = BlogPost.objects.filter(status='published').order_by('-views')[:5]
-        serializer = BlogPostListSerializer(featured_posts, many=True)
+    def trending(self, request):
+        """Get posts ranked by exponentially decayed recent views (?limit=, at most TRENDING_SIZE)"""
+        try:
+            limit = max(min(int(request.query_params.get('limit', blog_trending.size)), blog_trending.size), 1)
+        except ValueError:
+            limit = blog_trending.size
+        serializer = BlogPostListSerializer(self.trending_posts(limit), many=True, context={'request': request})
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def categories(self, request):
         """Get all unique categories"""
-        categories = BlogPost.objects.filter(status='published').values_list('category', flat=True).distinct()
-        return Response(list(categories))
+        def build():
+            categories = BlogPost.objects.filter(status='published').values_list('category', flat=True).distinct()
+            return list(categories)
 
+        return Response(blog_categories_cache.get(request, build))
 
-class AppointmentViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def tags(self, request):
+        """Tag cloud: tags with published posts and their counts"""
+        return Response(blog_tags_cache.get(request, build_tag_cloud))
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Category, tag, author and month counts of the published posts, under the active filters"""
+        return Response(blog_facets_cache.get(request, lambda: blog_facets(request.query_params)))
+
+
+class AppointmentViewSet(CacheControlMixin, viewsets.ModelViewSet):
     """ViewSet for Appointment - Anyone creates, auth manages"""
+    cache_policy = NO_STORE_POLICY
     queryset = Appointment.objects.all()
     serializer_class = AppointmentSerializer
     filter_backends = [filters.OrderingFilter]
@@ -136,6 +298,14 @@ class AppointmentViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def handle_exception(self, exc):
+        """A slot taken by a concurrent booking is a 409 Conflict, with free slots to pick instead"""
+        if isinstance(exc, SlotUnavailable):
+            code = status.HTTP_409_CONFLICT if exc.code == 'taken' else status.HTTP_400_BAD_REQUEST
+            alternatives = alternative_slots(exc.vet_id, exc.day, exc.time, service=exc.service) if exc.vet_id else []
+            return Response({'error': str(exc), 'code': exc.code, 'alternatives': alternatives}, status=code)
+        return super().handle_exception(exc)
+
     @action(detail=True, methods=['patch'])
     def update_status(self, request, pk=None):
         """Update appointment status"""
@@ -145,8 +315,16 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         if new_status not in dict(Appointment.STATUS_CHOICES):
             return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
 
+        reactivated = appointment.status not in ACTIVE_STATUSES and new_status in ACTIVE_STATUSES
         appointment.status = new_status
-        appointment.save()
+        if reactivated:
+            # The slot may have been booked by someone else since the cancellation
+            reserve_slot(
+                appointment.veterinarian_id, appointment.date, appointment.time, appointment.save,
+                exclude=appointment.pk, service=appointment.service,
+            )
+        else:
+            appointment.save()
         serializer = self.get_serializer(appointment)
         return Response(serializer.data)
 
@@ -156,30 +334,118 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         # Send confirmation email to customer
         send_appointment_confirmation(appointment)
 
+    def requested_service(self, request):
+        """The Service of ?service= (its id), whose duration the free slots must fit; None without one"""
+        service_id = request.query_params.get('service', '').strip()
+        if not service_id:
+            return None
+        try:
+            return Service.objects.only('id', 'duration_minutes', 'buffer_minutes').get(pk=int(service_id))
+        except (ValueError, Service.DoesNotExist):
+            raise ValidationError({'error': 'Invalid service'})
+
     @action(detail=False, methods=['get'])
     def available_slots(self, request):
-        """Get available time slots for date and veterinarian"""
+        """Get the free slots of a veterinarian on a date, within their working hours (?service= for its duration)"""
         date = request.query_params.get('date')
         vet_id = request.query_params.get('veterinarian')
 
         if not date or not vet_id:
             return Response({'error': 'Date and veterinarian required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        booked_times = Appointment.objects.filter(
-            date=date, veterinarian_id=vet_id, status__in=['pending', 'confirmed']
-        ).values_list('time', flat=True)
-
-        all_slots = []
-        for hour in range(9, 18):
-            for minute in [0, 30]:
-                all_slots.append(f"{hour:02d}:{minute:02d}")
+        try:
+            day = parse_date(date)
+            vet_id = int(vet_id)
+        except ValueError:
+            day = None
+        if day is None:
+            return Response({'error': 'Invalid date or veterinarian'}, status=status.HTTP_400_BAD_REQUEST)
 
-        available_slots = [s for s in all_slots if s not in [t.strftime('%H:%M') for t in booked_times]]
-        return Response({'available_slots': available_slots})
+        try:
+            slots = available_slots(vet_id, day, self.requested_service(request))
+        except Veterinarian.DoesNotExist:
+            raise Http404
+        return Response({'available_slots': slots, 'working_hours': working_hours(vet_id, day)})
+
+    def availability_scope(self, request):
+        """
+        Vets and days of an availability query
+
+        ?date_from= (default today), ?date_to= (default a week on, at most
+        AVAILABILITY_MAX_DAYS), ?veterinarians=1,2 and/or ?specialty= (active vets only).
+        ?service= makes the slots fit that service's duration.
+        """
+        today = timezone.localdate()
+        try:
+            date_from = parse_date(request.query_params.get('date_from', '')) or today
+            date_to = parse_date(request.query_params.get('date_to', '')) or date_from + timedelta(days=6)
+            vet_ids = [int(pk) for pk in request.query_params.get('veterinarians', '').split(',') if pk.strip()]
+        except ValueError:
+            raise ValidationError({'error': 'Invalid date range or veterinarians'})
+        date_from = max(date_from, today)
+        max_days = getattr(settings, 'AVAILABILITY_MAX_DAYS', 31)
+        if date_to < date_from or (date_to - date_from).days >= max_days:
+            raise ValidationError({'error': f'date_to must be within {max_days} days of date_from'})
+
+        vets = Veterinarian.objects.filter(is_active=True)
+        if vet_ids:
+            vets = vets.filter(pk__in=vet_ids)
+        specialty = request.query_params.get('specialty', '').strip()
+        if specialty:
+            vets = vets.filter(Q(specialty__icontains=specialty) | Q(expertise_areas__icontains=specialty))
+        vets = list(vets.only('id', 'name', 'specialty').order_by('name'))
+        days = [date_from + timedelta(days=offset) for offset in range((date_to - date_from).days + 1)]
+        return vets, days
 
+    @action(detail=False, methods=['get'])
+    def availability(self, request):
+        """Free slots of several veterinarians over a date range, from the booking bitmaps"""
+        vets, days = self.availability_scope(request)
+        free = search_availability([vet.pk for vet in vets], days, self.requested_service(request))
+        return Response({
+            'date_from': days[0],
+            'date_to': days[-1],
+            'veterinarians': [
+                {
+                    'id': vet.pk,
+                    'name': vet.name,
+                    'specialty': vet.specialty,
+                    'days': {day.isoformat(): slots for day, slots in free.get(vet.pk, {}).items()},
+                }
+                for vet in vets
+            ],
+        })
 
-class ContactMessageViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def earliest_slot(self, request):
+        """Earliest free slot with any of the matching veterinarians in the date range"""
+        vets, days = self.availability_scope(request)
+        found = earliest_slot([vet.pk for vet in vets], days, self.requested_service(request))
+        if found is None:
+            return Response({'slot': None})
+        vet_id, day, time = found
+        names = {vet.pk: vet.name for vet in vets}
+        return Response({'slot': {'veterinarian': vet_id, 'veterinarian_name': names[vet_id], 'date': day, 'time': time}})
+
+    @action(detail=False, methods=['post'], url_path='holds')
+    def hold(self, request):
+        """Hold a slot while the booking form is filled in; the token is sent back with the booking"""
+        serializer = SlotHoldSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['delete'], url_path=r'holds/(?P<token>[\w-]+)')
+    def release(self, request, token=None):
+        """Give a held slot back"""
+        if not release_hold(token):
+            raise Http404
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ContactMessageViewSet(CacheControlMixin, viewsets.ModelViewSet):
     """ViewSet for ContactMessage - Anyone creates, auth manages"""
+    cache_policy = NO_STORE_POLICY
     queryset = ContactMessage.objects.all()
     serializer_class = ContactMessageSerializer
     filter_backends = [filters.OrderingFilter]
@@ -263,8 +529,10 @@ class ContactMessageViewSet(viewsets.ModelViewSet):
         return Response({'status': 'Message permanently deleted'}, status=status.HTTP_204_NO_CONTENT)
 
 
-class GalleryImageViewSet(viewsets.ModelViewSet):
+class GalleryImageViewSet(CacheControlMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for GalleryImage - Public read, auth write"""
+    cache_policy = SESSION_DEPENDENT_POLICY
+    cache_policies = {'categories': PUBLIC_CONTENT_POLICY}
     queryset = GalleryImage.objects.filter(is_active=True)
     serializer_class = GalleryImageSerializer
     permission_classes = [AllowAny]  # Allow anyone to create/update for now (should be restricted in production)
@@ -283,18 +551,42 @@ class GalleryImageViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(category=category)
         return queryset
 
+    def get_validators(self):
+        if self.action == 'categories':
+            return queryset_validators(self.queryset)
+        return super().get_validators()
+
+    def list(self, request, *args, **kwargs):
+        # Admins also see inactive images, so only anonymous lists are shared
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+
+        def build():
+            return super(GalleryImageViewSet, self).list(request, *args, **kwargs).data
+
+        return Response(gallery_cache.get(request, build))
+
     @action(detail=False, methods=['get'])
     def categories(self, request):
         """Get all categories with counts"""
-        categories = []
-        for code, name in GalleryImage.CATEGORY_CHOICES:
-            count = self.queryset.filter(category=code).count()
-            categories.append({'code': code, 'name': name, 'count': count})
-        return Response(categories)
+        def build():
+            # One grouped query instead of a COUNT per category
+            counts = dict(
+                self.queryset.values_list('category')
+                .annotate(count=Count('pk'))
+                .order_by()
+            )
+            return [
+                {'code': code, 'name': name, 'count': counts.get(code, 0)}
+                for code, name in GalleryImage.CATEGORY_CHOICES
+            ]
+
+        return Response(gallery_categories_cache.get(request, build))
 
 
-class PageContentViewSet(viewsets.ModelViewSet):
+class PageContentViewSet(CacheControlMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for PageContent - Public read, auth update"""
+    cache_policy = PUBLIC_CONTENT_POLICY
     queryset = PageContent.objects.all()
     serializer_class = PageContentSerializer
     permission_classes = [AllowAny]  # Allow anyone to create/update for now (should be restricted in production)
@@ -303,6 +595,11 @@ class PageContentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return PageContent.objects.all().order_by('page_name')
 
+    def get_validators(self):
+        if self.action == 'by_name':
+            return queryset_validators(PageContent.objects.filter(page_name=self.kwargs['page_name']))
+        return super().get_validators()
+
     @action(detail=False, methods=['get'], url_path='by-name/(?P<page_name>[^/.]+)')
     def by_name(self, request, page_name=None):
         """Get page content by name"""
@@ -313,8 +610,10 @@ class PageContentViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Page not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
-class ServiceViewSet(viewsets.ModelViewSet):
+class ServiceViewSet(CacheControlMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Service - Public read active services, auth manages all"""
+    cache_policy = SESSION_DEPENDENT_POLICY
+    cache_policies = {'active': PUBLIC_CONTENT_POLICY, 'all': PUBLIC_CONTENT_POLICY}
     queryset = Service.objects.all()
     serializer_class = ServiceSerializer
     permission_classes = [AllowAny]  # Allow anyone to create/update for now (should be restricted in production)
@@ -334,12 +633,21 @@ class ServiceViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(is_active=True)
         return queryset.order_by('order', 'title')
 
+    def get_validators(self):
+        if self.action == 'active':
+            return queryset_validators(Service.objects.filter(is_active=True))
+        if self.action == 'all':
+            return queryset_validators(Service.objects.all())
+        return super().get_validators()
+
     @action(detail=False, methods=['get'])
     def active(self, request):
         """Get only active services"""
-        active_services = Service.objects.filter(is_active=True).order_by('order', 'title')
-        serializer = self.get_serializer(active_services, many=True)
-        return Response(serializer.data)
+        def build():
+            active_services = Service.objects.filter(is_active=True).order_by('order', 'title')
+            return self.get_serializer(active_services, many=True).data
+
+        return Response(active_services_cache.get(request, build))
 
     @action(detail=False, methods=['get'])
     def all(self, request):
@@ -349,8 +657,9 @@ class ServiceViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class AboutPageViewSet(viewsets.ModelViewSet):
+class AboutPageViewSet(CacheControlMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for About Page - Single instance, public read, auth write"""
+    cache_policy = PUBLIC_CONTENT_POLICY
     queryset = AboutPage.objects.all()
     serializer_class = AboutPageSerializer
     permission_classes = [AllowAny]  # Allow anyone to read/update for now
@@ -362,6 +671,9 @@ class AboutPageViewSet(viewsets.ModelViewSet):
         # Always return the singleton instance
         return AboutPage.objects.all()
 
+    def get_validators(self):
+        return instance_validators(AboutPage.get_instance())
+
     def list(self, request, *args, **kwargs):
         """Override list to return single instance"""
         instance = AboutPage.get_instance()
@@ -375,8 +687,9 @@ class AboutPageViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ServicesPageViewSet(viewsets.ModelViewSet):
+class ServicesPageViewSet(CacheControlMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Services Page - Single instance, public read, auth write"""
+    cache_policy = PUBLIC_CONTENT_POLICY
     queryset = ServicesPage.objects.all()
     serializer_class = ServicesPageSerializer
     permission_classes = [AllowAny]  # Allow anyone to read/update for now
@@ -388,6 +701,9 @@ class ServicesPageViewSet(viewsets.ModelViewSet):
         # Always return the singleton instance
         return ServicesPage.objects.all()
 
+    def get_validators(self):
+        return instance_validators(ServicesPage.get_instance())
+
     def list(self, request, *args, **kwargs):
         """Override list to return single instance"""
         instance = ServicesPage.get_instance()
@@ -401,8 +717,9 @@ class ServicesPageViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ContactPageViewSet(viewsets.ModelViewSet):
+class ContactPageViewSet(CacheControlMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Contact Page - Single instance, public read, auth write"""
+    cache_policy = PUBLIC_CONTENT_POLICY
     queryset = ContactPage.objects.all()
     serializer_class = ContactPageSerializer
     permission_classes = [AllowAny]  # Allow anyone to read/update for now
@@ -414,6 +731,9 @@ class ContactPageViewSet(viewsets.ModelViewSet):
         # Always return the singleton instance
         return ContactPage.objects.all()
 
+    def get_validators(self):
+        return instance_validators(ContactPage.get_instance())
+
     def list(self, request, *args, **kwargs):
         """Override list to return array with single instance for compatibility"""
         instance = ContactPage.get_instance()
@@ -428,8 +748,9 @@ class ContactPageViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class SEOSettingsViewSet(viewsets.ModelViewSet):
+class SEOSettingsViewSet(CacheControlMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for SEO Settings - Public read, auth write"""
+    cache_policy = PUBLIC_CONTENT_POLICY
     queryset = SEOSettings.objects.all()
     serializer_class = SEOSettingsSerializer
     permission_classes = [AllowAny]  # Allow anyone to read/update for now
@@ -439,9 +760,20 @@ class SEOSettingsViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return SEOSettings.objects.all().order_by('page_name')
 
+    def get_validators(self):
+        if self.action == 'all_settings':
+            return queryset_validators(SEOSettings.objects.all())
+        return super().get_validators()
+
     @action(detail=False, methods=['get'])
     def all_settings(self, request):
         """Get all SEO settings in a structured format"""
+        data = single_flight(response_cache_key(request), self.build_all_settings, get_models_version([SEOSettings]))
+        return Response(data)
+
+    @staticmethod
+    def build_all_settings():
+        """SEO settings of every page keyed by page name, in the frontend's camelCase"""
         all_seo = SEOSettings.objects.all()
         result = {}
         for seo in all_seo:
@@ -463,7 +795,7 @@ class SEOSettingsViewSet(viewsets.ModelViewSet):
                     'googleAnalyticsId': seo.google_analytics_id or '',
                     'googleSearchConsoleId': seo.google_search_console_id or ''
                 })
-        return Response(result)
+        return result
 
     @action(detail=False, methods=['post'])
     def bulk_update(self, request):
@@ -543,7 +875,7 @@ def sitemap_xml(request):
         xml += '  </url>\n'
 
     # Blog posts
-    blog_posts = BlogPost.objects.filter(status='published').order_by('-published_at')
+    blog_posts = BlogPost.objects.filter(status='published').only('slug', 'updated_at').order_by('-published_at')
     for post in blog_posts:
         lastmod = post.updated_at.strftime('%Y-%m-%d') if post.updated_at else datetime.now().strftime('%Y-%m-%d')
         xml += '  <url>\n'
@@ -578,8 +910,9 @@ def sitemap_xml(request):
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class GoogleReviewViewSet(viewsets.ModelViewSet):
+class GoogleReviewViewSet(CacheControlMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Google Reviews"""
+    cache_policy = PUBLIC_CONTENT_POLICY
     queryset = GoogleReview.objects.all().order_by('order', '-created_at')
     serializer_class = GoogleReviewSerializer
     permission_classes = [AllowAny]
@@ -593,29 +926,52 @@ class GoogleReviewViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(is_active=True)
         return queryset.order_by('order', '-created_at')
 
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('active_only') != 'true':
+            return super().list(request, *args, **kwargs)
+
+        def build():
+            return super(GoogleReviewViewSet, self).list(request, *args, **kwargs).data
 
-class HomePageViewSet(viewsets.ModelViewSet):
+        return Response(active_reviews_cache.get(request, build))
+
+
+class HomePageViewSet(CacheControlMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for HomePage - Only one instance"""
+    cache_policy = PUBLIC_CONTENT_POLICY
     queryset = HomePage.objects.all()
     serializer_class = HomePageSerializer
     permission_classes = [AllowAny]
     authentication_classes = []  # Disable authentication for this viewset
 
+    def get_validators(self):
+        if self.action == 'content':
+            return instance_validators(HomePage.get_instance())
+        return super().get_validators()
+
     @action(detail=False, methods=['get'])
     def content(self, request):
         """Get the homepage content (always returns the single instance)"""
-        homepage = HomePage.get_instance()
-        serializer = self.get_serializer(homepage)
-        return Response(serializer.data)
+        def build():
+            return self.get_serializer(HomePage.get_instance()).data
+
+        data = single_flight(response_cache_key(request), build, get_models_version([HomePage]))
+        return Response(data)
 
 
-class SiteSettingsViewSet(viewsets.ModelViewSet):
+class SiteSettingsViewSet(CacheControlMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Site Settings - Only one instance"""
+    cache_policy = PUBLIC_CONTENT_POLICY
     queryset = SiteSettings.objects.all()
     serializer_class = SiteSettingsSerializer
     permission_classes = [AllowAny]
     authentication_classes = []
 
+    def get_validators(self):
+        if self.action == 'get_settings':
+            return instance_validators(SiteSettings.get_instance())
+        return super().get_validators()
+
     @action(detail=False, methods=['get'])
     def get_settings(self, request):
         """Get the site settings (always returns the single instance)"""
@@ -632,3 +988,308 @@ class SiteSettingsViewSet(viewsets.ModelViewSet):
             serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=400)
+
+
+# Public read-only API
+# These viewsets never authenticate, so their responses do not depend on the
+# session and can be stored by any shared cache in front of gunicorn.
+
+class PublicReadOnlyViewSet(CacheControlMixin, ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    """Base class for the anonymous /api/public/ namespace"""
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    cache_policy = PUBLIC_READ_POLICY
+
+
+class PublicBlogPostViewSet(BlogPostReadMixin, SearchSnippetMixin, PublicReadOnlyViewSet):
+    """Published blog posts only"""
+    # Every read of a post counts a view, so the detail always reaches the origin
+    cache_policies = {'retrieve': PUBLIC_UNCACHED_POLICY}
+    # ?search= is ranked full-text search (see search.py), applied after the ordering
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
+    ordering_fields = ['published_at', 'created_at', 'views']
+    ordering = ['-published_at']
+    lookup_field = 'slug'
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return BlogPostListSerializer
+        return BlogPostSerializer
+
+    def get_queryset(self):
+        queryset = BlogPost.objects.filter(status='published').select_related('author').prefetch_related('normalized_tags')
+        if self.action == 'list':
+            queryset = queryset.defer('content')
+        return filter_blog_posts(queryset, self.request.query_params).order_by('-published_at', '-created_at')
+
+    def get_validators(self):
+        if self.action == 'list':
+            return self.list_validators()
+        if self.action in ('categories', 'tags'):
+            return queryset_validators(self.get_queryset())
+        if self.action == 'facets':
+            return make_etag('blog-facets', get_models_version(blog_facets_cache.models)), None
+        if self.action == 'related':
+            return make_etag(
+                'blog-related', self.kwargs.get(self.lookup_field), self.request.query_params.get('limit', ''),
+                get_models_version([BlogPost, BlogPostRelated, BLOG_VIEWS])
+            ), None
+        # retrieve counts a view on every read, so it is never answered with 304
+        return None
+
+    @action(detail=False, methods=['get'])
+    def categories(self, request):
+        """Get all unique categories"""
+        def build():
+            categories = BlogPost.objects.filter(status='published').values_list('category', flat=True).distinct()
+            return list(categories)
+
+        return Response(blog_categories_cache.get(request, build))
+
+    @action(detail=False, methods=['get'])
+    def tags(self, request):
+        """Tag cloud: tags with published posts and their counts"""
+        return Response(blog_tags_cache.get(request, build_tag_cloud))
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Category, tag, author and month counts of the published posts, under the active filters"""
+        return Response(blog_facets_cache.get(request, lambda: blog_facets(request.query_params)))
+
+
+class PublicServiceViewSet(PublicReadOnlyViewSet):
+    """Active services only"""
+    serializer_class = ServiceSerializer
+    pagination_class = None
+    lookup_field = 'slug'
+
+    def get_queryset(self):
+        return Service.objects.filter(is_active=True).order_by('order', 'title')
+
+
+class PublicVeterinarianViewSet(PublicReadOnlyViewSet):
+    """Active veterinarians only"""
+    serializer_class = VeterinarianSerializer
+    pagination_class = None
+    lookup_field = 'slug'
+
+    def get_queryset(self):
+        return Veterinarian.objects.filter(is_active=True)
+
+
+class PublicGalleryImageViewSet(PublicReadOnlyViewSet):
+    """Active gallery images only"""
+    serializer_class = GalleryImageSerializer
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['order', 'created_at']
+    ordering = ['order', '-created_at']
+
+    def get_queryset(self):
+        queryset = GalleryImage.objects.filter(is_active=True)
+
+        category = self.request.query_params.get('category', None)
+        if category:
+            queryset = queryset.filter(category=category)
+        return queryset
+
+    def get_validators(self):
+        if self.action == 'categories':
+            return queryset_validators(GalleryImage.objects.filter(is_active=True))
+        return super().get_validators()
+
+    @action(detail=False, methods=['get'])
+    def categories(self, request):
+        """Get all categories with counts"""
+        def build():
+            counts = dict(
+                GalleryImage.objects.filter(is_active=True)
+                .values_list('category')
+                .annotate(count=Count('pk'))
+                .order_by()
+            )
+            return [
+                {'code': code, 'name': name, 'count': counts.get(code, 0)}
+                for code, name in GalleryImage.CATEGORY_CHOICES
+            ]
+
+        return Response(gallery_categories_cache.get(request, build))
+
+
+class PublicGoogleReviewViewSet(PublicReadOnlyViewSet):
+    """Active Google reviews only"""
+    serializer_class = GoogleReviewSerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        return GoogleReview.objects.filter(is_active=True).order_by('order', '-created_at')
+
+
+class BootstrapViewSet(CacheControlMixin, ConditionalGetMixin, viewsets.ViewSet):
+    """
+    Everything the layout shell needs in one request: site settings (Header,
+    Footer, ChatBot), the active services menu and the SEO map (SEOContext)
+
+    The payload is one cached snapshot; its ETag is derived from the version
+    stamps of the three models, so a revalidation costs no database query.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    cache_policy = PUBLIC_CONTENT_POLICY
+    models = [SiteSettings, Service, SEOSettings]
+
+    def get_validators(self):
+        return make_etag('bootstrap', get_models_version(self.models)), None
+
+    def get_surrogate_keys(self):
+        return ['site-settings', 'services', 'seo']
+
+    def list(self, request):
+        def build():
+            context = {'request': request}
+            active_services = Service.objects.filter(is_active=True).order_by('order', 'title')
+            return {
+                'site_settings': SiteSettingsSerializer(SiteSettings.get_instance(), context=context).data,
+                'services': ServiceSerializer(active_services, many=True, context=context).data,
+                'seo': SEOSettingsViewSet.build_all_settings(),
+            }
+
+        version = get_models_version(self.models)
+        return Response(single_flight(response_cache_key(request), build, version))
+
+
+# Shared pool for the independent queries of a page bundle. Each task closes
+# its own database connection, worker threads never keep one open.
+page_bundle_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='page-bundle')
+
+
+def fetch_concurrently(**tasks):
+    """
+    Run independent builders in parallel and return their results by name
+
+    Falls back to running them in order inside a transaction (and so in
+    tests): other threads use their own connections and would not see its
+    uncommitted rows.
+    """
+    if connection.in_atomic_block or len(tasks) < 2:
+        return {name: task() for name, task in tasks.items()}
+
+    def run(task):
+        try:
+            return task()
+        finally:
+            connection.close()
+
+    futures = {name: page_bundle_executor.submit(run, task) for name, task in tasks.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+class PageBundleViewSet(CacheControlMixin, ConditionalGetMixin, viewsets.ViewSet):
+    """
+    Everything one frontend route needs in a single request
+
+        /api/page-bundle/home/             homepage content, latest posts, active reviews
+        /api/page-bundle/service/<slug>/   the service and its page content
+        /api/page-bundle/vet/<slug>/       the veterinarian and their published posts
+
+    Each bundle is cached as one unit, keyed by the version stamps of every
+    model it reads; the ETag is derived from the same stamps.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    cache_policy = PUBLIC_CONTENT_POLICY
+    bundle_models = {
+        'home': [HomePage, BlogPost, Veterinarian, GoogleReview],
+        'service': [Service, PageContent],
+        'vet': [Veterinarian, BlogPost],
+    }
+    bundle_surrogate_keys = {
+        'home': ['homepage', 'blog', 'google-reviews'],
+        'service': ['services', 'page-{slug}'],
+        'vet': ['veterinarians', 'blog'],
+    }
+    home_post_count = 4
+
+    def get_validators(self):
+        version = get_models_version(self.bundle_models[self.action])
+        return make_etag('page-bundle', self.action, self.kwargs.get('slug', ''), version), None
+
+    def get_surrogate_keys(self):
+        slug = self.kwargs.get('slug', '')
+        return [key.format(slug=slug) for key in self.bundle_surrogate_keys[self.action]]
+
+    def bundle(self, request, build):
+        # An unknown slug is cached as None under the same stamps, so probes
+        # don't rebuild it; creating the row bumps a stamp and drops it
+        version = get_models_version(self.bundle_models[self.action])
+        data = single_flight(response_cache_key(request), build, version)
+        if data is None:
+            raise Http404
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def home(self, request):
+        """Home.jsx: homepage content, latest published posts and active Google reviews"""
+        context = {'request': request}
+
+        def build():
+            return fetch_concurrently(
+                homepage=lambda: HomePageSerializer(HomePage.get_instance(), context=context).data,
+                blog_posts=lambda: BlogPostCardSerializer(
+                    BlogPost.objects.filter(status='published').select_related('author')
+                    .prefetch_related('normalized_tags').defer('content')
+                    .order_by('-published_at', '-created_at')[:self.home_post_count],
+                    many=True, context=context
+                ).data,
+                reviews=lambda: GoogleReviewSerializer(
+                    GoogleReview.objects.filter(is_active=True).order_by('order', '-created_at'),
+                    many=True, context=context
+                ).data,
+            )
+
+        return self.bundle(request, build)
+
+    @action(detail=False, methods=['get'], url_path='service/(?P<slug>[^/.]+)')
+    def service(self, request, slug=None):
+        """ServiceDetail.jsx: the active service and its page content (either may be missing)"""
+        context = {'request': request}
+
+        def build():
+            def get_service():
+                service = Service.objects.filter(slug=slug, is_active=True).first()
+                return ServiceSerializer(service, context=context).data if service else None
+
+            def get_page_content():
+                page = PageContent.objects.filter(page_name=slug).first()
+                return PageContentSerializer(page, context=context).data if page else None
+
+            data = fetch_concurrently(service=get_service, page_content=get_page_content)
+            if data['service'] is None and data['page_content'] is None:
+                return None
+            return data
+
+        return self.bundle(request, build)
+
+    @action(detail=False, methods=['get'], url_path='vet/(?P<slug>[^/.]+)')
+    def vet(self, request, slug=None):
+        """VetProfile.jsx: the veterinarian and their published posts"""
+        context = {'request': request}
+
+        def build():
+            def get_veterinarian():
+                veterinarian = Veterinarian.objects.filter(slug=slug).first()
+                return VeterinarianSerializer(veterinarian, context=context).data if veterinarian else None
+
+            def get_blog_posts():
+                posts = (
+                    BlogPost.objects.filter(author__slug=slug, status='published')
+                    .select_related('author').prefetch_related('normalized_tags').defer('content')
+                    .order_by('-published_at', '-created_at')
+                )
+                return BlogPostCardSerializer(posts, many=True, context=context).data
+
+            data = fetch_concurrently(veterinarian=get_veterinarian, blog_posts=get_blog_posts)
+            if data['veterinarian'] is None:
+                return None
+            return data
+
+        return self.bundle(request, build)
@@ -11,6 +11,13 @@ DJANGO_SETTINGS_MODULE=petkey_api.settings python manage.py collectstatic --no-i
 # Run migrations
 python manage.py migrate
 
+# Index the comma separated blog tags and derived post fields (idempotent)
+python manage.py backfill_tags
+python manage.py backfill_post_fields
+
+# Recompute the related posts with fresh document frequencies
+python manage.py build_related_posts
+
 # Create admin user if doesn't exist
 python manage.py create_admin
 
@@ -0,0 +1,36 @@
+"""
+Gunicorn configuration, loaded automatically from the working directory
+"""
+import os
+
+
+def post_worker_init(worker):
+    """Prime imports, the DB connection and the response caches of each new worker"""
+    if os.environ.get('WARM_CACHE_ON_START', 'True') != 'True':
+        return
+    from django.core.management import call_command
+    try:
+        # Collection endpoints only, in the worker's own thread so its DB
+        # connection stays open for the first real request
+        call_command('warm_cache', quick=True, concurrency=1)
+    except Exception as e:
+        worker.log.warning(f'Cache warm-up failed: {e}')
+
+
+def worker_exit(server, worker):
+    """Write the buffered blog view counts, queued related posts and cache stats before the worker goes away"""
+    from api.cache_utils import flush_stats_counters
+    from api.related import related_refresher
+    from api.view_counter import blog_view_counter
+    try:
+        blog_view_counter.flush()
+    except Exception as e:
+        worker.log.warning(f'View counter flush failed: {e}')
+    try:
+        related_refresher.flush()
+    except Exception as e:
+        worker.log.warning(f'Related posts refresh failed: {e}')
+    try:
+        flush_stats_counters()
+    except Exception as e:
+        worker.log.warning(f'Cache stats flush failed: {e}')
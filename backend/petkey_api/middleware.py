@@ -1,3 +1,17 @@
+import logging
+import re
+import time
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, connection
+from django.http import HttpResponse, JsonResponse
+from django.utils.http import urlencode
+
+from api.degraded import last_good_store
+
+logger = logging.getLogger(__name__)
+
+
 class UTF8Middleware:
     """Middleware to ensure UTF-8 encoding in all responses"""
 
@@ -13,3 +27,86 @@ class UTF8Middleware:
                 response['Content-Type'] = 'application/json; charset=utf-8'
 
         return response
+
+
+class DegradedModeMiddleware:
+    """
+    Serve last-known-good public payloads while the database is unreachable
+
+    Successful anonymous GETs of the paths in DEGRADED_MODE_PATHS are copied
+    to the last-known-good store, keyed by the path and the parameters of
+    DEGRADED_MODE_QUERY_PARAMS. When a view loses the database connection,
+    a breaker opens for DEGRADED_MODE_BREAKER_SECONDS: those GETs are answered
+    from the store with a Warning header, every other request still reaches
+    its view. Other database errors (a locked SQLite file, a failed query)
+    don't open the breaker; they only fall back to the store for public
+    reads.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = [re.compile(pattern) for pattern in settings.DEGRADED_MODE_PATHS]
+        self.query_params = set(settings.DEGRADED_MODE_QUERY_PARAMS)
+        self.breaker_seconds = settings.DEGRADED_MODE_BREAKER_SECONDS
+        self.degraded_until = 0
+
+    def __call__(self, request):
+        if time.monotonic() < self.degraded_until and self.is_public_read(request):
+            return self.degraded_response(request)
+
+        response = self.get_response(request)
+
+        if (response.status_code == 200 and not response.streaming
+                and self.is_public_read(request)
+                and settings.SESSION_COOKIE_NAME not in request.COOKIES):
+            key = self.store_key(request)
+            if key is not None:
+                last_good_store.save(key, response.content, response.get('Content-Type', ''))
+        return response
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, (OperationalError, InterfaceError)):
+            return None
+        if self.connection_lost(exception):
+            logger.error(f'Database unavailable, entering degraded mode: {str(exception)}')
+            self.degraded_until = time.monotonic() + self.breaker_seconds
+        elif not self.is_public_read(request):
+            return None
+        return self.degraded_response(request)
+
+    def connection_lost(self, exception):
+        """Whether the error is a failed or dropped connection rather than a failed query"""
+        if isinstance(exception, InterfaceError) or connection.connection is None:
+            return True
+        return not connection.is_usable()
+
+    def is_public_read(self, request):
+        return request.method in ('GET', 'HEAD') and any(p.match(request.path) for p in self.paths)
+
+    def store_key(self, request):
+        """Canonical path and sorted payload parameters, None for any other parameter"""
+        if not set(request.GET) <= self.query_params:
+            return None
+        params = sorted((name, value) for name in request.GET for value in request.GET.getlist(name))
+        return f'{request.path}?{urlencode(params)}' if params else request.path
+
+    def degraded_response(self, request):
+        retry_after = str(self.breaker_seconds)
+        key = self.store_key(request) if self.is_public_read(request) else None
+        if key is not None:
+            entry = last_good_store.load(key)
+            if entry is not None:
+                body, content_type, stored_at = entry
+                response = HttpResponse(body, content_type=content_type)
+                response['Warning'] = '110 - "Response is Stale", 111 - "Revalidation Failed"'
+                response['Age'] = str(max(0, int(time.time() - stored_at)))
+                response['Cache-Control'] = 'no-cache'
+                return response
+
+        response = JsonResponse(
+            {'error': 'Servis geçici olarak kullanılamıyor, lütfen biraz sonra tekrar deneyin.'},
+            status=503,
+            json_dumps_params={'ensure_ascii': False}
+        )
+        response['Retry-After'] = retry_after
+        return response
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv
 import dj_database_url
 
@@ -63,6 +64,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'petkey_api.middleware.DegradedModeMiddleware',  # Stale-if-error when the DB is down
+    'api.invalidation.InvalidationBatchMiddleware',  # One cache purge wave per write request
     'petkey_api.middleware.UTF8Middleware',  # UTF-8 encoding
 ]
 
@@ -98,15 +101,96 @@ if os.environ.get('DATABASE_URL'):
             conn_health_checks=True,
         )
     }
+    # Fail fast instead of hanging when Postgres restarts or refuses connections
+    if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+        DATABASES['default'].setdefault('OPTIONS', {})['connect_timeout'] = int(os.environ.get('DB_CONNECT_TIMEOUT', '5'))
 else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Writers take the database lock when their transaction begins and wait for it,
+            # instead of failing with "database is locked" when they upgrade a read lock
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 20},
+            # In-memory test databases cannot be shared by the threads of the booking tests
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# The cache must be shared by all gunicorn workers: version stamps of the
+# singleton pages live here. Use Redis when available, a file cache otherwise.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'petkey_cache')),
+        }
+    }
+
+# Degraded read mode: last successful payloads of these public GET endpoints
+# are kept on disk and served while the database is unreachable
+LAST_GOOD_STORE_PATH = os.environ.get('LAST_GOOD_STORE_PATH', os.path.join(tempfile.gettempdir(), 'petkey_last_good.sqlite3'))
+DEGRADED_MODE_BREAKER_SECONDS = int(os.environ.get('DEGRADED_MODE_BREAKER_SECONDS', '15'))
+DEGRADED_MODE_PATHS = [
+    r'^/api/homepage/content/$',
+    r'^/api/site-settings/get_settings/$',
+    r'^/api/services/(active/)?$',
+    r'^/api/veterinarians/(active/|[^/]+/)?$',
+    r'^/api/blog/(featured/|categories/|[^/]+/)?$',
+    r'^/api/seo-settings/all_settings/$',
+    r'^/api/public/',
+]
+# Query parameters that select a different payload; requests with any other
+# parameter are neither stored nor served from the store
+DEGRADED_MODE_QUERY_PARAMS = ['category', 'tag', 'author', 'month', 'page', 'limit', 'ordering', 'active_only']
+# Payloads kept in the store, the least recently stored are dropped first
+DEGRADED_MODE_MAX_ENTRIES = int(os.environ.get('DEGRADED_MODE_MAX_ENTRIES', '500'))
+
+# Cache invalidation backends, called once per batch of model changes
+CACHE_PURGERS = [
+    'api.invalidation.LocalMemoryPurger',
+    'api.invalidation.DjangoCachePurger',
+    'api.invalidation.HttpPurger',
+]
+# Edge cache / reverse proxy receiving HTTP PURGE requests (disabled when empty)
+CACHE_PURGE_URL = os.environ.get('CACHE_PURGE_URL', '')
+CACHE_PURGE_TIMEOUT = int(os.environ.get('CACHE_PURGE_TIMEOUT', '2'))
+
+# Blog post views are buffered in each worker and written in batches
+VIEW_COUNTER_FLUSH_SECONDS = int(os.environ.get('VIEW_COUNTER_FLUSH_SECONDS', '30'))
+# Salt of the unique reader fingerprints (defaults to SECRET_KEY); changing it resets uniqueness
+READER_FINGERPRINT_SALT = os.environ.get('READER_FINGERPRINT_SALT', '')
+# Trending posts: decayed score over the daily view rollups (see api/trending.py)
+TRENDING_SIZE = int(os.environ.get('TRENDING_SIZE', '10'))
+TRENDING_HALF_LIFE_DAYS = float(os.environ.get('TRENDING_HALF_LIFE_DAYS', '3'))
+TRENDING_WINDOW_DAYS = int(os.environ.get('TRENDING_WINDOW_DAYS', '30'))
+# Related posts stored per post (see api/related.py)
+RELATED_POSTS_SIZE = int(os.environ.get('RELATED_POSTS_SIZE', '6'))
+# Saves refresh the related lists in the background, batched over this many seconds (0: synchronously)
+RELATED_POSTS_REFRESH_DELAY = float(os.environ.get('RELATED_POSTS_REFRESH_DELAY', '5'))
+# Blog RSS/Atom feeds (see api/feeds.py); links point at the frontend
+SITE_URL = os.environ.get('SITE_URL', 'https://petkey.com')
+BLOG_FEED_SIZE = int(os.environ.get('BLOG_FEED_SIZE', '20'))
+# Appointment slots (see api/scheduling.py); the default hours apply to vets without any entered
+APPOINTMENT_SLOT_MINUTES = int(os.environ.get('APPOINTMENT_SLOT_MINUTES', '30'))
+DEFAULT_WORKING_HOURS = os.environ.get('DEFAULT_WORKING_HOURS', '09:00-18:00')
+# Longest date range of one availability search
+AVAILABILITY_MAX_DAYS = int(os.environ.get('AVAILABILITY_MAX_DAYS', '31'))
+# How long a slot picked in the booking form stays held for the visitor
+SLOT_HOLD_MINUTES = int(os.environ.get('SLOT_HOLD_MINUTES', '5'))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
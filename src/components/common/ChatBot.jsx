@@ -3,6 +3,7 @@ import { motion, AnimatePresence } from 'framer-motion';
 import { FaTimes, FaPaperPlane, FaRobot, FaStar, FaPhone, FaCalendarAlt, FaSync } from 'react-icons/fa';
 import { useNavigate } from 'react-router-dom';
 import { generateFaqData, findMatchingKeyword } from '../../data/faqData';
+import { getBootstrap } from '../../services/bootstrap';
 
 const ChatBot = () => {
   const [isOpen, setIsOpen] = useState(false);
@@ -26,12 +27,9 @@ const ChatBot = () => {
   useEffect(() => {
     const fetchSettings = async () => {
       try {
-        const response = await fetch(import.meta.env.VITE_API_URL + '/api/site-settings/get_settings/');
-        if (response.ok) {
-          const data = await response.json();
-          setSiteSettings(data);
-          setFaqData(generateFaqData(data));
-        }
+        const { site_settings: data } = await getBootstrap();
+        setSiteSettings(data);
+        setFaqData(generateFaqData(data));
       } catch (error) {
         console.error('Settings fetch error:', error);
       }
@@ -1,6 +1,7 @@
 import { Link } from 'react-router-dom';
 import { useState, useEffect } from 'react';
 import { FaFacebook, FaInstagram, FaTwitter, FaPhone, FaEnvelope, FaMapMarkerAlt, FaClock, FaHeart } from 'react-icons/fa';
+import { getBootstrap } from '../../services/bootstrap';
 
 const Footer = () => {
   const currentYear = new Date().getFullYear();
@@ -25,11 +26,8 @@ const Footer = () => {
   useEffect(() => {
     const fetchSettings = async () => {
       try {
-        const response = await fetch(import.meta.env.VITE_API_URL + '/api/site-settings/get_settings/');
-        if (response.ok) {
-          const data = await response.json();
-          setSiteSettings(data);
-        }
+        const { site_settings } = await getBootstrap();
+        setSiteSettings(site_settings);
       } catch (error) {
         console.error('❌ Footer - Site settings yüklenemedi:', error);
       }
@@ -40,11 +38,8 @@ const Footer = () => {
   useEffect(() => {
     const fetchServices = async () => {
       try {
-        const response = await fetch(import.meta.env.VITE_API_URL + '/api/services/active/');
-        if (response.ok) {
-          const data = await response.json();
-          setServices(data);
-        }
+        const { services: data } = await getBootstrap();
+        setServices(data);
       } catch (error) {
         console.error('❌ Footer - Hizmetler yüklenemedi:', error);
       }
@@ -3,6 +3,7 @@ import { Link, useLocation } from 'react-router-dom';
 import { motion, AnimatePresence } from 'framer-motion';
 import { FaBars, FaTimes, FaPhone, FaChevronDown } from 'react-icons/fa';
 import { services as staticServices } from '../../data/services';
+import { getBootstrap } from '../../services/bootstrap';
 
 const Header = () => {
   const [isOpen, setIsOpen] = useState(false);
@@ -20,11 +21,8 @@ const Header = () => {
   useEffect(() => {
     const fetchSettings = async () => {
       try {
-        const response = await fetch(import.meta.env.VITE_API_URL + '/api/site-settings/get_settings/');
-        if (response.ok) {
-          const data = await response.json();
-          setSiteSettings(data);
-        }
+        const { site_settings } = await getBootstrap();
+        setSiteSettings(site_settings);
       } catch (error) {
         console.error('❌ Header - Site settings yüklenemedi:', error);
       }
@@ -36,8 +34,7 @@ const Header = () => {
   useEffect(() => {
     const fetchServices = async () => {
       try {
-        const response = await fetch(import.meta.env.VITE_API_URL + '/api/services/active/');
-        const data = await response.json();
+        const { services: data } = await getBootstrap();
         console.log('🔍 Header - Fetched services from API:', data.length, 'services');
 
         // Merge database services with static data
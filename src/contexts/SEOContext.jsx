@@ -1,5 +1,6 @@
 import { createContext, useContext, useState, useEffect } from 'react';
 import PropTypes from 'prop-types';
+import { getBootstrap } from '../services/bootstrap';
 
 const SEOContext = createContext();
 
@@ -60,17 +61,12 @@ export const SEOProvider = ({ children }) => {
     loadSEOSettings();
   }, []);
 
-  const loadSEOSettings = async () => {
+  const loadSEOSettings = async (refresh = false) => {
     try {
       console.log('⏳ Loading SEO settings from API...');
-      const response = await fetch(import.meta.env.VITE_API_URL + '/api/seo-settings/all_settings/');
-      if (response.ok) {
-        const data = await response.json();
-        console.log('✅ SEO Settings loaded successfully:', data);
-        setSeoSettings(data);
-      } else {
-        console.error('❌ Failed to fetch SEO settings, status:', response.status);
-      }
+      const { seo: data } = await getBootstrap({ refresh });
+      console.log('✅ SEO Settings loaded successfully:', data);
+      setSeoSettings(data);
     } catch (error) {
       console.error('❌ Error loading SEO settings:', error);
     } finally {
@@ -84,7 +80,7 @@ export const SEOProvider = ({ children }) => {
   };
 
   const refreshSEO = () => {
-    loadSEOSettings();
+    loadSEOSettings(true);
   };
 
   return (
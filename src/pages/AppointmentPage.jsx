@@ -5,6 +5,10 @@ import api from '../services/api';
 import SEO from '../components/common/SEO';
 import { useSEO } from '../contexts/SEOContext';
 
+// YYYY-MM-DD of a local date (toISOString would shift it to UTC, i.e. the previous day in Turkey)
+const toDateString = (date) =>
+  `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}-${String(date.getDate()).padStart(2, '0')}`;
+
 const AppointmentPage = () => {
   const { getSEOForPage } = useSEO();
   const appointmentSEO = getSEOForPage('appointment') || {
@@ -41,6 +45,10 @@ const AppointmentPage = () => {
   const [currentMonth, setCurrentMonth] = useState(new Date());
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [submitStatus, setSubmitStatus] = useState(null);
+  // Free slots offered when the chosen one was booked by someone else meanwhile
+  const [alternatives, setAlternatives] = useState([]);
+  // Hold on the picked slot ({ token, expires_at }), redeemed by the booking
+  const [hold, setHold] = useState(null);
 
   // Veterinarian data (loaded from API)
   const [veterinarians, setVeterinarians] = useState([]);
@@ -64,31 +72,68 @@ const AppointmentPage = () => {
     fetchVeterinarians();
   }, []);
 
-  // Available time slots - 24 hours
-  const timeSlots = [
-    '00:00', '00:30', '01:00', '01:30', '02:00', '02:30',
-    '03:00', '03:30', '04:00', '04:30', '05:00', '05:30',
-    '06:00', '06:30', '07:00', '07:30', '08:00', '08:30',
-    '09:00', '09:30', '10:00', '10:30', '11:00', '11:30',
-    '12:00', '12:30', '13:00', '13:30', '14:00', '14:30',
-    '15:00', '15:30', '16:00', '16:30', '17:00', '17:30',
-    '18:00', '18:30', '19:00', '19:30', '20:00', '20:30',
-    '21:00', '21:30', '22:00', '22:30', '23:00', '23:30'
-  ];
-
-  // Services
-  const services = [
-    'Genel Muayene',
-    'Aşılama',
-    'Kısırlaştırma',
-    'Diş Bakımı',
-    'Kan Tahlili',
-    'Ultrason',
-    'Röntgen',
-    'Cerrahi Operasyon',
-    'Acil Müdahale',
-    'Diğer'
-  ];
+  // Free slots of the selected veterinarian for the displayed month, one request per month
+  const [monthAvailability, setMonthAvailability] = useState({});
+  const [slotsLoading, setSlotsLoading] = useState(false);
+
+  useEffect(() => {
+    if (!appointmentData.veterinarian) {
+      setMonthAvailability({});
+      return;
+    }
+    const year = currentMonth.getFullYear();
+    const month = currentMonth.getMonth();
+    const today = new Date();
+    today.setHours(0, 0, 0, 0);
+    const firstDay = new Date(year, month, 1);
+    let cancelled = false;
+    const fetchAvailability = async () => {
+      try {
+        setSlotsLoading(true);
+        const data = await api.appointments.getAvailability({
+          date_from: toDateString(firstDay > today ? firstDay : today),
+          date_to: toDateString(new Date(year, month + 1, 0)),
+          veterinarians: appointmentData.veterinarian,
+          ...(appointmentData.service ? { service: appointmentData.service } : {}),
+        });
+        const vet = (data.veterinarians || [])[0];
+        if (!cancelled) setMonthAvailability(vet ? vet.days : {});
+      } catch (error) {
+        console.error('Uygun saatler yüklenemedi:', error);
+        if (!cancelled) setMonthAvailability({});
+      } finally {
+        if (!cancelled) setSlotsLoading(false);
+      }
+    };
+    fetchAvailability();
+    return () => {
+      cancelled = true;
+    };
+  }, [appointmentData.veterinarian, appointmentData.service, currentMonth]);
+
+  const timeSlots = monthAvailability[appointmentData.date] || [];
+
+  // Services (loaded from API); the chosen one sets how long the appointment takes
+  const [services, setServices] = useState([]);
+
+  useEffect(() => {
+    const fetchServices = async () => {
+      try {
+        const data = await api.services.getActive();
+        const items = data.results || data;
+        setServices(items.map(s => ({
+          id: String(s.id),
+          title: s.title,
+          duration: s.duration_minutes,
+        })));
+      } catch (error) {
+        console.error('Hizmetler yüklenemedi:', error);
+      }
+    };
+    fetchServices();
+  }, []);
+
+  const selectedService = services.find((s) => s.id === appointmentData.service);
 
   // Generate calendar days for current month
   const generateCalendarDays = () => {
@@ -149,6 +194,40 @@ const AppointmentPage = () => {
     });
   };
 
+  // The slot was taken meanwhile: drop it and send the user back to pick another
+  const handleSlotTaken = (error, date, time) => {
+    setMonthAvailability((days) => ({
+      ...days,
+      [date]: (days[date] || []).filter((slot) => slot !== time),
+    }));
+    setAlternatives((error.data && error.data.alternatives) || []);
+    setAppointmentData((data) => ({ ...data, time: '' }));
+    setAppointmentStep(2);
+    setSubmitStatus('conflict');
+  };
+
+  const selectTime = async (time, date = appointmentData.date) => {
+    const { veterinarian } = appointmentData;
+    setAppointmentData((data) => ({ ...data, date, time }));
+    try {
+      const data = await api.appointments.holdSlot({
+        veterinarian,
+        date,
+        time,
+        service: appointmentData.service || null,
+        replace: hold ? hold.token : '',
+      });
+      setHold(data);
+    } catch (error) {
+      if (error.status === 409) {
+        handleSlotTaken(error, date, time);
+      } else {
+        // Booking still works without a hold, only the slot is not kept meanwhile
+        console.error('Saat ayrılamadı:', error);
+      }
+    }
+  };
+
   const handleAppointmentSubmit = async (e) => {
     e.preventDefault();
     setIsSubmitting(true);
@@ -166,11 +245,13 @@ const AppointmentPage = () => {
         owner_phone: appointmentData.ownerPhone,
         date: appointmentData.date,
         time: appointmentData.time,
-        service: appointmentData.service,
+        service: appointmentData.service || null,
         notes: appointmentData.notes,
+        hold_token: hold ? hold.token : '',
       };
 
       await api.appointments.create(apiData);
+      setHold(null);
       setSubmitStatus('success');
 
       // Reset appointment form
@@ -195,6 +276,10 @@ const AppointmentPage = () => {
       setTimeout(() => setSubmitStatus(null), 5000);
     } catch (error) {
       console.error('Randevu oluşturulamadı:', error);
+      if (error.status === 409) {
+        handleSlotTaken(error, appointmentData.date, appointmentData.time);
+        return;
+      }
       setSubmitStatus('error');
       setTimeout(() => setSubmitStatus(null), 5000);
     } finally {
@@ -217,7 +302,7 @@ const AppointmentPage = () => {
       day: days[date.getDay()],
       date: date.getDate(),
       month: months[date.getMonth()],
-      full: date.toISOString().split('T')[0]
+      full: toDateString(date)
     };
   };
 
@@ -318,6 +403,37 @@ const AppointmentPage = () => {
               </motion.div>
             )}
 
+            {submitStatus === 'conflict' && (
+              <motion.div
+                initial={{ opacity: 0, y: -10 }}
+                animate={{ opacity: 1, y: 0 }}
+                className="mb-6 p-4 bg-yellow-100 border border-yellow-300 text-yellow-800 rounded-xl text-center"
+              >
+                ⚠️ Seçtiğiniz saat az önce başka bir randevuya verildi. Lütfen başka bir saat seçin.
+                {alternatives.length > 0 && (
+                  <div className="mt-3 flex flex-wrap justify-center gap-2">
+                    {alternatives.map((slot) => (
+                      <button
+                        key={`${slot.date}-${slot.time}`}
+                        type="button"
+                        onClick={() => {
+                          const [year, month, day] = slot.date.split('-').map(Number);
+                          setSelectedDate(new Date(year, month - 1, day));
+                          setCurrentMonth(new Date(year, month - 1, 1));
+                          setSubmitStatus(null);
+                          setAlternatives([]);
+                          selectTime(slot.time, slot.date);
+                        }}
+                        className="px-3 py-1 rounded-lg bg-white border border-yellow-400 text-sm font-semibold hover:bg-yellow-50"
+                      >
+                        {slot.date === appointmentData.date ? slot.time : `${slot.date} ${slot.time}`}
+                      </button>
+                    ))}
+                  </div>
+                )}
+              </motion.div>
+            )}
+
             {/* Appointment Form Card */}
             <div className="bg-white rounded-3xl shadow-xl p-8">
               {/* Progress Steps */}
@@ -430,6 +546,26 @@ const AppointmentPage = () => {
                     >
                       <h2 className="text-2xl font-bold text-gray-900 mb-6">Tarih ve Saat Seçin</h2>
 
+                      {/* Service: its duration decides which times are free */}
+                      <div className="mb-6">
+                        <label className="block text-sm font-medium text-gray-700 mb-2">
+                          Randevu Sebebi *
+                        </label>
+                        <select
+                          value={appointmentData.service}
+                          onChange={(e) => setAppointmentData((data) => ({ ...data, service: e.target.value, time: '' }))}
+                          required
+                          className="w-full px-4 py-3 rounded-xl border border-gray-300 focus:ring-2 focus:ring-purple-500 focus:border-transparent transition-all"
+                        >
+                          <option value="">Seçiniz</option>
+                          {services.map((service) => (
+                            <option key={service.id} value={service.id}>
+                              {service.title}{service.duration ? ` (${service.duration} dk)` : ''}
+                            </option>
+                          ))}
+                        </select>
+                      </div>
+
                       {/* Calendar */}
                       <div className="mb-6">
                         <div className="flex items-center justify-between mb-4">
@@ -472,6 +608,7 @@ const AppointmentPage = () => {
                             }
                             const formatted = formatDate(date);
                             const isSelected = appointmentData.date === formatted.full;
+                            const isFull = !slotsLoading && !(monthAvailability[formatted.full] || []).length;
                             return (
                               <motion.button
                                 key={index}
@@ -485,7 +622,9 @@ const AppointmentPage = () => {
                                 className={`p-3 rounded-xl border-2 transition-all ${
                                   isSelected
                                     ? 'border-purple-600 bg-purple-50'
-                                    : 'border-gray-200 hover:border-purple-300'
+                                    : isFull
+                                      ? 'border-gray-100 opacity-40'
+                                      : 'border-gray-200 hover:border-purple-300'
                                 }`}
                               >
                                 <div className="text-xs text-gray-600 font-medium">{formatted.day}</div>
@@ -504,12 +643,17 @@ const AppointmentPage = () => {
                           animate={{ opacity: 1, y: 0 }}
                         >
                           <h3 className="font-semibold text-gray-900 mb-4">Saat Seçin</h3>
+                          {!slotsLoading && timeSlots.length === 0 && (
+                            <p className="text-sm text-gray-500 mb-4">
+                              Bu tarihte uygun saat bulunmuyor, lütfen başka bir gün seçin.
+                            </p>
+                          )}
                           <div className="grid grid-cols-4 md:grid-cols-6 lg:grid-cols-8 gap-3 max-h-96 overflow-y-auto p-2">
                             {timeSlots.map((time) => (
                               <motion.button
                                 key={time}
                                 type="button"
-                                onClick={() => handleAppointmentChange('time', time)}
+                                onClick={() => selectTime(time)}
                                 whileHover={{ scale: 1.05 }}
                                 whileTap={{ scale: 0.95 }}
                                 className={`px-3 py-2 rounded-xl border-2 font-semibold text-sm transition-all ${
@@ -537,7 +681,7 @@ const AppointmentPage = () => {
                         <button
                           type="button"
                           onClick={nextStep}
-                          disabled={!appointmentData.date || !appointmentData.time}
+                          disabled={!appointmentData.service || !appointmentData.date || !appointmentData.time}
                           className="px-8 py-3 bg-gradient-to-r from-purple-600 to-pink-600 text-white rounded-xl font-semibold hover:shadow-lg transition-all disabled:opacity-50 disabled:cursor-not-allowed flex items-center gap-2"
                         >
                           Devam Et
@@ -620,25 +764,6 @@ const AppointmentPage = () => {
                           </div>
                         </div>
 
-                        <div>
-                          <label className="block text-sm font-medium text-gray-700 mb-2">
-                            Randevu Sebebi *
-                          </label>
-                          <select
-                            value={appointmentData.service}
-                            onChange={(e) => handleAppointmentChange('service', e.target.value)}
-                            required
-                            className="w-full px-4 py-3 rounded-xl border border-gray-300 focus:ring-2 focus:ring-purple-500 focus:border-transparent transition-all"
-                          >
-                            <option value="">Seçiniz</option>
-                            {services.map((service) => (
-                              <option key={service} value={service}>
-                                {service}
-                              </option>
-                            ))}
-                          </select>
-                        </div>
-
                         <div>
                           <label className="block text-sm font-medium text-gray-700 mb-2">
                             Ek Notlar
@@ -665,7 +790,7 @@ const AppointmentPage = () => {
                         <button
                           type="button"
                           onClick={nextStep}
-                          disabled={!appointmentData.petName || !appointmentData.petType || !appointmentData.petAge || !appointmentData.service}
+                          disabled={!appointmentData.petName || !appointmentData.petType || !appointmentData.petAge}
                           className="px-8 py-3 bg-gradient-to-r from-purple-600 to-pink-600 text-white rounded-xl font-semibold hover:shadow-lg transition-all disabled:opacity-50 disabled:cursor-not-allowed flex items-center gap-2"
                         >
                           Devam Et
@@ -753,7 +878,7 @@ const AppointmentPage = () => {
                             </div>
                             <div className="flex justify-between">
                               <span className="text-gray-600">Randevu Sebebi:</span>
-                              <span className="font-semibold text-gray-900">{appointmentData.service}</span>
+                              <span className="font-semibold text-gray-900">{selectedService ? selectedService.title : ''}</span>
                             </div>
                           </div>
                         </div>
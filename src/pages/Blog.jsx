@@ -13,6 +13,7 @@ const Blog = () => {
   const [activeCategory, setActiveCategory] = useState('Tümü');
   const [blogPosts, setBlogPosts] = useState([]);
   const [categories, setCategories] = useState(['Tümü']);
+  const [allTags, setAllTags] = useState([]);
   const [loading, setLoading] = useState(true);
   const [searchQuery, setSearchQuery] = useState('');
 
@@ -23,7 +24,7 @@ const Blog = () => {
         setLoading(true);
 
         // Fetch blog posts
-        const postsData = await api.blog.getAll();
+        const postsData = await api.publicBlog.getAll();
         const posts = postsData.results || postsData;
 
         // Transform API data to match component structure
@@ -35,7 +36,7 @@ const Blog = () => {
           content: post.content,
           image: post.featured_image || 'https://images.unsplash.com/photo-1450778869180-41d0601e046e?w=800',
           category: post.category,
-          tags: post.tags ? post.tags.split(',').map(t => t.trim()) : [],
+          tags: post.tag_names || [],
           author: post.author_name || 'Veteriner Hekim',
           date: new Date(post.published_at || post.created_at).toLocaleDateString('tr-TR'),
           views: post.views
@@ -43,9 +44,10 @@ const Blog = () => {
 
         setBlogPosts(transformedPosts);
 
-        // Fetch categories
-        const categoriesData = await api.blog.getCategories();
-        setCategories(['Tümü', ...categoriesData]);
+        // Sidebar categories and tags with their counts
+        const facets = await api.publicBlog.getFacets();
+        setCategories(['Tümü', ...facets.categories.map(c => c.name)]);
+        setAllTags(facets.tags.map(t => t.name));
       } catch (error) {
         console.error('Blog verileri yüklenemedi:', error);
         // Fallback to empty array on error
@@ -58,9 +60,6 @@ const Blog = () => {
     fetchData();
   }, []);
 
-  // Get all unique tags
-  const allTags = [...new Set(blogPosts.flatMap(post => post.tags))];
-
   // Filter posts by category and search
   let filteredPosts = activeCategory === 'Tümü'
     ? blogPosts
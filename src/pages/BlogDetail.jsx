@@ -1,6 +1,6 @@
 import { motion } from 'framer-motion';
 import { useParams, Link } from 'react-router-dom';
-import { FaCalendar, FaUser, FaTag, FaArrowLeft, FaArrowRight } from 'react-icons/fa';
+import { FaCalendar, FaUser, FaTag, FaArrowLeft, FaArrowRight, FaClock } from 'react-icons/fa';
 import { useState, useEffect } from 'react';
 import api from '../services/api';
 import ShareButtons from '../components/common/ShareButtons';
@@ -17,7 +17,7 @@ const BlogDetail = () => {
       try {
         setLoading(true);
         // Fetch post by slug
-        const postData = await api.blog.getBySlug(slug);
+        const postData = await api.publicBlog.getBySlug(slug);
 
         // Transform API data
         const transformedPost = {
@@ -28,31 +28,28 @@ const BlogDetail = () => {
           content: postData.content,
           image: postData.featured_image || 'https://images.unsplash.com/photo-1450778869180-41d0601e046e?w=800',
           category: postData.category,
-          tags: postData.tags ? postData.tags.split(',').map(t => t.trim()) : [],
+          tags: postData.tag_names || [],
           author: postData.author_name || 'Veteriner Hekim',
           date: new Date(postData.published_at || postData.created_at).toLocaleDateString('tr-TR'),
-          views: postData.views
+          views: postData.views,
+          readingTime: postData.reading_time
         };
 
         setPost(transformedPost);
 
-        // Fetch related posts (same category)
-        const allPosts = await api.blog.getAll();
-        const posts = allPosts.results || allPosts;
-        const related = posts
-          .filter(p => p.category === postData.category && p.id !== postData.id)
-          .slice(0, 3)
-          .map(p => ({
-            id: p.id,
-            title: p.title,
-            slug: p.slug,
-            excerpt: p.excerpt,
-            image: p.featured_image || 'https://images.unsplash.com/photo-1450778869180-41d0601e046e?w=800',
-            category: p.category,
-            tags: p.tags ? p.tags.split(',').map(t => t.trim()) : [],
-            author: p.author_name || 'Veteriner Hekim',
-            date: new Date(p.published_at || p.created_at).toLocaleDateString('tr-TR')
-          }));
+        // Related posts are precomputed on the server (TF-IDF similarity)
+        const relatedData = await api.publicBlog.getRelated(slug, 3).catch(() => []);
+        const related = relatedData.map(p => ({
+          id: p.id,
+          title: p.title,
+          slug: p.slug,
+          excerpt: p.excerpt,
+          image: p.featured_image || 'https://images.unsplash.com/photo-1450778869180-41d0601e046e?w=800',
+          category: p.category,
+          tags: p.tag_names || [],
+          author: p.author_name || 'Veteriner Hekim',
+          date: new Date(p.published_at || p.created_at).toLocaleDateString('tr-TR')
+        }));
 
         setRelatedPosts(related);
       } catch (error) {
@@ -149,6 +146,15 @@ const BlogDetail = () => {
               <FaUser className="text-purple-600" />
               <span>{post.author}</span>
             </div>
+            {post.readingTime > 0 && (
+              <>
+                <div className="w-1 h-1 rounded-full bg-gray-400" />
+                <div className="flex items-center gap-2">
+                  <FaClock className="text-purple-600" />
+                  <span>{post.readingTime} dk okuma</span>
+                </div>
+              </>
+            )}
           </motion.div>
 
           {/* Featured Image */}
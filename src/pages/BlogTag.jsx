@@ -17,8 +17,11 @@ const BlogTag = () => {
     const fetchPosts = async () => {
       try {
         setLoading(true);
-        // Fetch all posts
-        const postsData = await api.blog.getAll();
+        // Posts of this tag (indexed lookup) and the tag cloud
+        const [postsData, tagsData] = await Promise.all([
+          api.publicBlog.filterByTag(tag),
+          api.publicBlog.getTags()
+        ]);
         const posts = postsData.results || postsData;
 
         // Transform posts
@@ -29,21 +32,13 @@ const BlogTag = () => {
           excerpt: post.excerpt,
           image: post.featured_image || 'https://images.unsplash.com/photo-1450778869180-41d0601e046e?w=800',
           category: post.category,
-          tags: post.tags ? post.tags.split(',').map(t => t.trim()) : [],
+          tags: post.tag_names || [],
           author: post.author_name || 'Veteriner Hekim',
           date: new Date(post.published_at || post.created_at).toLocaleDateString('tr-TR')
         }));
 
-        // Filter by tag
-        const filtered = transformedPosts.filter(post =>
-          post.tags.some(t => t.toLowerCase().replace(/\s+/g, '-') === tag)
-        );
-
-        setFilteredPosts(filtered);
-
-        // Get all unique tags
-        const uniqueTags = [...new Set(transformedPosts.flatMap(post => post.tags))];
-        setAllTags(uniqueTags);
+        setFilteredPosts(transformedPosts);
+        setAllTags(tagsData.map(t => t.name));
       } catch (error) {
         console.error('Blog yazıları yüklenemedi:', error);
         setFilteredPosts([]);
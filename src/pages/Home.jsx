@@ -102,45 +102,34 @@ const Home = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        // Fetch homepage content
-        const homeResponse = await fetch(import.meta.env.VITE_API_URL + '/api/homepage/content/');
-        const homeData = await homeResponse.json();
-        setHomePageData(homeData);
-
-        // Fetch blog posts
-        const postsData = await api.blog.getAll();
-        const posts = postsData.results || postsData;
-        const transformedPosts = posts.slice(0, 4).map(post => ({
+        // Homepage content, latest posts and reviews in one request
+        const bundle = await api.pageBundles.getHome();
+        setHomePageData(bundle.homepage);
+
+        const transformedPosts = bundle.blog_posts.map(post => ({
           id: post.id,
           title: post.title,
           slug: post.slug,
           excerpt: post.excerpt,
           image: post.featured_image || 'https://images.unsplash.com/photo-1450778869180-41d0601e046e?w=800',
           category: post.category,
-          tags: post.tags ? post.tags.split(',').map(t => t.trim()) : [],
+          tags: post.tag_names || [],
           author: post.author_name || 'Veteriner Hekim',
           date: new Date(post.published_at || post.created_at).toLocaleDateString('tr-TR')
         }));
         setBlogPosts(transformedPosts);
 
-        // Fetch Google reviews
-        const reviewsResponse = await fetch(import.meta.env.VITE_API_URL + '/api/google-reviews/?active_only=true');
-        if (reviewsResponse.ok) {
-          const reviewsData = await reviewsResponse.json();
-          // Handle paginated response from Django REST framework
-          const reviewsArray = reviewsData.results || reviewsData;
-          // Transform API data to match component expectations
-          const transformedReviews = reviewsArray.map(review => ({
-            name: review.name,
-            initial: review.initial,
-            rating: review.rating,
-            date: review.date,
-            text: review.text,
-            verified: review.verified,
-            localGuide: review.local_guide
-          }));
-          setGoogleReviews(transformedReviews);
-        }
+        // Transform API data to match component expectations
+        const transformedReviews = bundle.reviews.map(review => ({
+          name: review.name,
+          initial: review.initial,
+          rating: review.rating,
+          date: review.date,
+          text: review.text,
+          verified: review.verified,
+          localGuide: review.local_guide
+        }));
+        setGoogleReviews(transformedReviews);
       } catch (error) {
         console.error('Veri yüklenirken hata:', error);
       } finally {
@@ -18,30 +18,14 @@ const ServiceDetail = () => {
       try {
         setLoading(true);
 
-        // Fetch service data from API
-        const serviceResponse = await fetch(`${import.meta.env.VITE_API_URL}/api/services/all/`);
-        if (serviceResponse.ok) {
-          const servicesData = await serviceResponse.json();
-          const foundService = servicesData.find(s => s.slug === slug);
-
-          if (foundService) {
-            setService(foundService);
-          } else {
-            // Fallback to static data if not found in API
-            const staticService = staticServices.find(s => s.slug === slug);
-            setService(staticService);
-          }
-        } else {
-          // Fallback to static data if API fails
-          const staticService = staticServices.find(s => s.slug === slug);
-          setService(staticService);
-        }
-
-        // Fetch page content
-        const pageResponse = await fetch(`${import.meta.env.VITE_API_URL}/api/pages/by-name/${slug}/`);
-        if (pageResponse.ok) {
-          const data = await pageResponse.json();
-          setPageContent(data);
+        // Service and its page content in one request
+        const response = await fetch(`${import.meta.env.VITE_API_URL}/api/page-bundle/service/${slug}/`);
+        const bundle = response.ok ? await response.json() : {};
+
+        // Fallback to static data if not found in API
+        setService(bundle.service || staticServices.find(s => s.slug === slug));
+        if (bundle.page_content) {
+          setPageContent(bundle.page_content);
         }
       } catch (error) {
         console.error('Veri yüklenemedi:', error);
@@ -18,7 +18,7 @@ const VetProfile = () => {
   const fetchVet = async () => {
     try {
       setLoading(true);
-      const vetData = await api.veterinarians.getById(slug);
+      const { veterinarian: vetData, blog_posts: blogPosts } = await api.pageBundles.getVet(slug);
 
       // Format API data to match component structure
       // Handle avatar URL - prepend backend URL if it's a relative path
@@ -65,6 +65,7 @@ const VetProfile = () => {
         address: vetData.address || '',
         languages: ['Türkçe'],
         testimonials: [],
+        posts: blogPosts,
       };
 
       setVet(formattedVet);
@@ -52,7 +52,7 @@ const AppointmentsPage = () => {
         date: apt.date,
         time: apt.time,
         status: apt.status,
-        service: apt.service,
+        service: apt.service_title || '',
         notes: apt.notes || ''
       }));
 
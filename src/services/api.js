@@ -16,7 +16,14 @@ const apiCall = async (endpoint, options = {}) => {
     if (!response.ok) {
       const errorData = await response.text();
       console.error('API Error Response:', errorData);
-      throw new Error(`HTTP error! status: ${response.status}`);
+      const error = new Error(`HTTP error! status: ${response.status}`);
+      error.status = response.status;
+      try {
+        error.data = JSON.parse(errorData);
+      } catch (parseError) {
+        error.data = null;
+      }
+      throw error;
     }
 
     // Handle 204 No Content response (common for DELETE operations)
@@ -61,7 +68,14 @@ export const blogAPI = {
   getById: (id) => apiCall(`/blog/${id}/`),
   getBySlug: (slug) => apiCall(`/blog/${slug}/`),
   getFeatured: () => apiCall('/blog/featured/'),
+  getTrending: (limit) => apiCall(`/blog/trending/${limit ? `?limit=${limit}` : ''}`),
   getCategories: () => apiCall('/blog/categories/'),
+  getTags: () => apiCall('/blog/tags/'),
+  getRelated: (slug, limit) => apiCall(`/blog/${slug}/related/${limit ? `?limit=${limit}` : ''}`),
+  getFacets: (params = {}) => {
+    const queryString = new URLSearchParams(params).toString();
+    return apiCall(`/blog/facets/${queryString ? `?${queryString}` : ''}`);
+  },
   search: (query) => apiCall(`/blog/?search=${encodeURIComponent(query)}`),
   filterByCategory: (category) => apiCall(`/blog/?category=${encodeURIComponent(category)}`),
   filterByTag: (tag) => apiCall(`/blog/?tag=${encodeURIComponent(tag)}`),
@@ -82,6 +96,24 @@ export const blogAPI = {
     }),
 };
 
+// Public blog reads: published posts only, cacheable by the browser and the CDN
+export const publicBlogAPI = {
+  getAll: (params = {}) => {
+    const queryString = new URLSearchParams(params).toString();
+    return apiCall(`/public/blog/${queryString ? `?${queryString}` : ''}`);
+  },
+  getBySlug: (slug) => apiCall(`/public/blog/${slug}/`),
+  getCategories: () => apiCall('/public/blog/categories/'),
+  getTags: () => apiCall('/public/blog/tags/'),
+  getRelated: (slug, limit) => apiCall(`/public/blog/${slug}/related/${limit ? `?limit=${limit}` : ''}`),
+  getFacets: (params = {}) => {
+    const queryString = new URLSearchParams(params).toString();
+    return apiCall(`/public/blog/facets/${queryString ? `?${queryString}` : ''}`);
+  },
+  search: (query) => apiCall(`/public/blog/?search=${encodeURIComponent(query)}`),
+  filterByTag: (tag) => apiCall(`/public/blog/?tag=${encodeURIComponent(tag)}`),
+};
+
 // Appointments API
 export const appointmentsAPI = {
   create: (appointmentData) =>
@@ -91,6 +123,25 @@ export const appointmentsAPI = {
     }),
   getAvailableSlots: (date, veterinarianId) =>
     apiCall(`/appointments/available_slots/?date=${date}&veterinarian=${veterinarianId}`),
+  // params: date_from, date_to, veterinarians (comma separated ids), specialty
+  getAvailability: (params = {}) => {
+    const queryString = new URLSearchParams(params).toString();
+    return apiCall(`/appointments/availability/${queryString ? `?${queryString}` : ''}`);
+  },
+  getEarliestSlot: (params = {}) => {
+    const queryString = new URLSearchParams(params).toString();
+    return apiCall(`/appointments/earliest_slot/${queryString ? `?${queryString}` : ''}`);
+  },
+  // Keeps the slot for a few minutes; replace releases the previous hold
+  holdSlot: (holdData) =>
+    apiCall('/appointments/holds/', {
+      method: 'POST',
+      body: JSON.stringify(holdData),
+    }),
+  releaseHold: (token) =>
+    apiCall(`/appointments/holds/${token}/`, {
+      method: 'DELETE',
+    }),
 };
 
 // Contact Messages API
@@ -175,6 +226,7 @@ export const contactPageAPI = {
 // Services API
 export const servicesAPI = {
   getAll: () => apiCall('/services/'),
+  getActive: () => apiCall('/services/active/'),
   getById: (id) => apiCall(`/services/${id}/`),
   create: (serviceData) =>
     apiCall('/services/', {
@@ -192,10 +244,18 @@ export const servicesAPI = {
     }),
 };
 
+// Page bundles: everything one route needs in a single request
+export const pageBundleAPI = {
+  getHome: () => apiCall('/page-bundle/home/'),
+  getService: (slug) => apiCall(`/page-bundle/service/${slug}/`),
+  getVet: (slug) => apiCall(`/page-bundle/vet/${slug}/`),
+};
+
 export default {
   vets: veterinariansAPI,
   veterinarians: veterinariansAPI,
   blog: blogAPI,
+  publicBlog: publicBlogAPI,
   appointments: appointmentsAPI,
   contact: contactAPI,
   gallery: galleryAPI,
@@ -203,4 +263,5 @@ export default {
   aboutPage: aboutPageAPI,
   contactPage: contactPageAPI,
   services: servicesAPI,
+  pageBundles: pageBundleAPI,
 };
@@ -0,0 +1,23 @@
+// Layout bootstrap: site settings, active services and SEO map in one request.
+// Header, Footer, ChatBot and SEOContext share the same in-flight promise.
+let bootstrapPromise = null;
+
+export const getBootstrap = ({ refresh = false } = {}) => {
+  if (!bootstrapPromise || refresh) {
+    bootstrapPromise = fetch(import.meta.env.VITE_API_URL + '/api/bootstrap/')
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        return response.json();
+      })
+      .catch((error) => {
+        // Let the next caller retry instead of caching the failure
+        bootstrapPromise = null;
+        throw error;
+      });
+  }
+  return bootstrapPromise;
+};
+
+export default getBootstrap;